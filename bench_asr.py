@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de ASR do UNIP Face com gravações (sem microfone)
+- Roda os backends do ASRThread (vosk/google) sobre arquivos WAV
+- Vosk: entrega o áudio em blocos, como no microfone, o mais rápido possível
+- Mede carga do modelo, latência após o fim do áudio, fator de tempo real e WER
+- Transcrição esperada opcional: arquivo .txt com o mesmo nome do .wav
+
+Uso:
+    python bench_asr.py --wav-dir gravacoes/ --backends vosk google --out bench_asr.json
+"""
+
+import os, sys, json, time, wave, argparse, platform
+import numpy as np
+import unipface
+
+def read_wav_pcm16(path, rate):
+    """PCM16 mono na taxa `rate` (converte canais/taxa se preciso)."""
+    with wave.open(path, "rb") as w:
+        ch, width, sr = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: só PCM 16 bits")
+    x = np.frombuffer(raw, dtype=np.int16).reshape(-1, ch).mean(axis=1)
+    if sr != rate:
+        n = int(round(len(x) * rate / sr))
+        x = np.interp(np.linspace(0, len(x) - 1, n), np.arange(len(x)), x)
+    return x.astype(np.int16).tobytes(), len(x) / rate
+
+def word_error_rate(ref, hyp):
+    r, h = ref.lower().split(), hyp.lower().split()
+    if not r:
+        return 0.0 if not h else 1.0
+    d = np.arange(len(h) + 1)
+    for i in range(1, len(r) + 1):
+        prev, d[0] = d.copy(), i
+        for j in range(1, len(h) + 1):
+            d[j] = min(prev[j] + 1, d[j - 1] + 1, prev[j - 1] + (r[i - 1] != h[j - 1]))
+    return float(d[len(h)]) / len(r)
+
+def run_vosk(backend, pcm, chunk):
+    step = chunk * 2
+    texts = []
+    first_partial = None
+    t0 = time.perf_counter()
+    for i in range(0, len(pcm), step):
+        partial, final = backend.accept(pcm[i:i + step])
+        if partial and first_partial is None:
+            first_partial = time.perf_counter() - t0
+        if final:
+            texts.append(final)
+    t_end = time.perf_counter()
+    tail = backend.flush()
+    t_done = time.perf_counter()
+    if tail:
+        texts.append(tail)
+    return " ".join(texts), t_done - t0, t_done - t_end, first_partial
+
+def run_google(backend, path):
+    import speech_recognition as sr
+    with sr.AudioFile(path) as src:
+        audio = sr.Recognizer().record(src)
+    t0 = time.perf_counter()
+    text = backend.transcribe(audio)
+    dt = time.perf_counter() - t0
+    return text, dt, dt, None
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 1) if values else None
+
+def bench_backend(kind, files):
+    t0 = time.perf_counter()
+    backend = unipface.make_asr_backend(kind)
+    load_s = time.perf_counter() - t0
+    rows = []
+    for path in files:
+        pcm, dur = read_wav_pcm16(path, unipface.ASR_SAMPLE_RATE)
+        if backend.streaming:
+            text, proc, latency, first = run_vosk(backend, pcm, unipface.ASR_CHUNK)
+        else:
+            text, proc, latency, first = run_google(backend, path)
+        row = {"file": os.path.basename(path), "audio_s": round(dur, 3), "text": text,
+               "latency_ms": round(latency * 1000, 1), "rtf": round(proc / dur, 3) if dur else None,
+               "first_partial_ms": round(first * 1000, 1) if first is not None else None}
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                row["expected"] = f.read().strip()
+            row["wer"] = round(word_error_rate(row["expected"], text), 3)
+        rows.append(row)
+        print(f"[BENCH-ASR] {backend.name} {row['file']}: {row['latency_ms']} ms | '{text}'", file=sys.stderr)
+    lat = [r["latency_ms"] / 1000 for r in rows]
+    wers = [r["wer"] for r in rows if "wer" in r]
+    return {
+        "backend": backend.name,
+        "load_s": round(load_s, 2),
+        "latency_p50_ms": _pct(lat, 50), "latency_p95_ms": _pct(lat, 95),
+        "rtf_mean": round(float(np.mean([r["rtf"] for r in rows if r["rtf"]])), 3) if rows else None,
+        "wer_mean": round(float(np.mean(wers)), 3) if wers else None,
+        "files": rows,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de ASR com gravações WAV")
+    ap.add_argument("--wav-dir", required=True)
+    ap.add_argument("--backends", nargs="+", default=["vosk"], choices=["vosk", "google"])
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    unipface.VERBOSE_LOG = False
+    files = sorted(os.path.join(args.wav_dir, f) for f in os.listdir(args.wav_dir)
+                   if f.lower().endswith(".wav"))
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "processor": platform.processor(), "files": len(files)},
+        "results": [bench_backend(kind, files) for kind in args.backends],
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
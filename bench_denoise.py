@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da supressão de ruído em fluxo (noise_suppression.py)
+- Passa cada gravação pelo NoiseSuppressor em blocos, como na captura
+- Mede o tempo por bloco, o fator de tempo real e a latência adicionada
+  (atraso fixo da STFT + p95 do processamento de um bloco)
+- Com --asr, transcreve com e sem o filtro e compara o WER (<nome>.txt ao lado)
+- Gravações ruidosas em --wav-dir, ou limpas + --noise misturadas em cada --snr
+
+Uso:
+    python bench_denoise.py --wav-dir ruidosas/ --asr whisper:small.en --out bench_denoise.json
+    python bench_denoise.py --wav-dir limpas/ --noise arena.wav --snr 0 5 10 --asr vosk
+"""
+
+import os, sys, json, time, argparse, platform
+import numpy as np
+from noise_suppression import NoiseSuppressor, NoiseProfile
+from bench_asr import read_wav_pcm16, word_error_rate
+from bench_endpoint import make_asr
+
+RATE = 16000
+
+def mix(x, noise, snr_db):
+    n = np.resize(noise, len(x)).astype(np.float32)
+    xs = x.astype(np.float32)
+    gain = np.sqrt((xs @ xs) / max(n @ n, 1e-9) / 10 ** (snr_db / 10))
+    return np.clip(xs + gain * n, -32768, 32767).astype(np.int16)
+
+def denoise(x, block, profile_path):
+    profile = NoiseProfile().load(profile_path) if profile_path else None
+    ns = NoiseSuppressor(profile)
+    out, times = [], []
+    for i in range(0, len(x), block):
+        t0 = time.perf_counter()
+        out.append(ns.process(x[i:i + block]))
+        times.append(time.perf_counter() - t0)
+    out.append(ns.process(np.zeros(ns.latency_samples, np.int16)))   # esvazia o atraso
+    y = np.concatenate(out)[ns.latency_samples:ns.latency_samples + len(x)]
+    return y, times, ns.latency_samples
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)), 2) if len(values) else None
+
+def run_case(name, clips, block, asr, profile_path):
+    rows, all_times, audio_s = [], [], 0.0
+    latency_samples = 0
+    for fname, x, ref in clips:
+        y, times, latency_samples = denoise(x, block, profile_path)
+        all_times += times
+        audio_s += len(x) / RATE
+        row = {"file": fname}
+        if asr:
+            row["text_raw"], row["text_denoised"] = asr(x), asr(y)
+            if ref is not None:
+                row["wer_raw"] = round(word_error_rate(ref, row["text_raw"]), 3)
+                row["wer_denoised"] = round(word_error_rate(ref, row["text_denoised"]), 3)
+        rows.append(row)
+    block_ms = np.asarray(all_times) * 1000
+    wr = [r["wer_raw"] for r in rows if "wer_raw" in r]
+    wd = [r["wer_denoised"] for r in rows if "wer_denoised" in r]
+    summary = {
+        "case": name,
+        "block_ms": round(block / RATE * 1000, 1),
+        "proc_p50_ms": _pct(block_ms, 50), "proc_p95_ms": _pct(block_ms, 95),
+        "proc_max_ms": round(float(block_ms.max()), 2) if len(block_ms) else None,
+        "added_latency_ms": round(latency_samples / RATE * 1000 + (_pct(block_ms, 95) or 0), 2),
+        "rtf": round(float(block_ms.sum() / 1000 / audio_s), 4) if audio_s else None,
+        "wer_raw": round(float(np.mean(wr)), 3) if wr else None,
+        "wer_denoised": round(float(np.mean(wd)), 3) if wd else None,
+    }
+    print(f"[BENCH-NS] {name}: latência +{summary['added_latency_ms']} ms | RTF {summary['rtf']} | "
+          f"WER {summary['wer_raw']} -> {summary['wer_denoised']}", file=sys.stderr)
+    return {**summary, "files": rows}
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark da supressão de ruído em fluxo")
+    ap.add_argument("--wav-dir", required=True)
+    ap.add_argument("--noise", default="", help="WAV de ruído para misturar (gravações limpas)")
+    ap.add_argument("--snr", nargs="+", type=float, default=[0, 5, 10])
+    ap.add_argument("--block-ms", type=int, default=100)
+    ap.add_argument("--profile", default="", help="perfil de ruído salvo (.npy)")
+    ap.add_argument("--asr", default="none", help="none, vosk, google ou whisper[:modelo]")
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    clips = []
+    for f in sorted(os.listdir(args.wav_dir)):
+        if not f.lower().endswith(".wav"):
+            continue
+        path = os.path.join(args.wav_dir, f)
+        pcm, _ = read_wav_pcm16(path, RATE)
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        ref = None
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as fh:
+                ref = fh.read().strip()
+        clips.append((f, np.frombuffer(pcm, dtype=np.int16), ref))
+
+    asr = make_asr(args.asr)
+    block = RATE * args.block_ms // 1000
+    if args.noise:
+        noise = np.frombuffer(read_wav_pcm16(args.noise, RATE)[0], dtype=np.int16)
+        cases = [(f"snr {snr:g} dB", [(f, mix(x, noise, snr), ref) for f, x, ref in clips])
+                 for snr in args.snr]
+    else:
+        cases = [("gravações", clips)]
+    results = [run_case(name, c, block, asr, args.profile) for name, c in cases]
+    report = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                       "processor": platform.processor(), "files": len(clips), "asr": args.asr},
+              "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
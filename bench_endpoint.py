@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência de fim de fala → transcrição, antes e depois do VAD (vad.py)
+- "antes": o algoritmo do Recognizer.listen() do SpeechRecognition (limiar de
+  energia calibrado por 1 s de ruído, pause_threshold e phrase_time_limit fixos)
+- "depois": vad.Endpointer com um ou mais valores de fim de fala (--end-ms)
+- Comandos gravados (WAV); o fim real da fala vem de <nome>.json
+  ({"speech_end_s": 1.23}) ou é estimado pela energia
+- Opcional: transcreve o trecho cortado (--asr) e soma o tempo do ASR; com
+  <nome>.txt ao lado mede também o WER (frases cortadas aparecem aqui)
+
+Uso:
+    python bench_endpoint.py --wav-dir comandos/ --asr vosk --out bench_endpoint.json
+"""
+
+import os, sys, json, math, time, argparse, platform
+import numpy as np
+import vad
+from bench_asr import read_wav_pcm16, word_error_rate
+
+RATE = 16000
+SR_CHUNK = 1024        # sr.Microphone padrão
+
+def rms(x):
+    x = x.astype(np.float32)
+    return float(np.sqrt(np.dot(x, x) / max(1, len(x))))
+
+def quiet_tail(x, seconds, frame=320):
+    """Ruído de fundo da própria gravação (o quadro mais baixo, repetido)."""
+    levels = vad.frame_levels_db(x, frame)
+    k = int(np.argmin(levels))
+    return np.resize(x[k * frame:(k + 1) * frame], int(seconds * RATE))
+
+def true_speech_end(path, x):
+    meta = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(meta):
+        with open(meta, encoding="utf-8") as f:
+            return float(json.load(f)["speech_end_s"])
+    levels = vad.frame_levels_db(x, 160)
+    voiced = np.flatnonzero(levels > levels.max() - 30.0)
+    return (voiced[-1] + 1) * 160 / RATE
+
+def sr_listen(x, noise, pause_s, phrase_limit_s):
+    """Mesmo laço do Recognizer.listen(), após adjust_for_ambient_noise(duration=1)."""
+    spb = SR_CHUNK / RATE
+    threshold = 300.0
+    damping = 0.15 ** spb
+    for i in range(0, int(RATE) - SR_CHUNK + 1, SR_CHUNK):
+        threshold = threshold * damping + rms(noise[i:i + SR_CHUNK]) * 1.5 * (1 - damping)
+    pause_count_max = math.ceil(pause_s / spb)
+    chunks = [x[i:i + SR_CHUNK] for i in range(0, len(x) - SR_CHUNK + 1, SR_CHUNK)]
+    k = 0
+    while k < len(chunks) and rms(chunks[k]) <= threshold:
+        k += 1
+    start, pause = k, 0
+    for k in range(start, len(chunks)):
+        if phrase_limit_s and (k + 1 - start) * spb > phrase_limit_s:
+            break
+        pause = 0 if rms(chunks[k]) > threshold else pause + 1
+        if pause > pause_count_max:
+            break
+    return (k + 1) * SR_CHUNK
+
+def vad_listen(x, end_ms, max_s):
+    ep = vad.Endpointer(RATE, end_ms=end_ms, max_s=max_s)
+    for i in range(0, len(x), 1600):
+        if ep.push(x[i:i + 1600]):
+            return ep.closed_at
+    return len(x)
+
+def make_asr(kind):
+    if kind == "none":
+        return None
+    if kind.startswith("whisper"):
+        import whisper
+        model = whisper.load_model(kind.partition(":")[2] or "small.en")
+        return lambda pcm: model.transcribe(pcm.astype(np.float32) / 32768.0,
+                                            fp16=False, temperature=0.0)["text"].strip()
+    import unipface
+    import speech_recognition as sr
+    backend = unipface.make_asr_backend(kind)
+    if backend.streaming:
+        def run(pcm):
+            backend.accept(pcm.tobytes())
+            return backend.flush()
+        return run
+    return lambda pcm: backend.transcribe(sr.AudioData(pcm.tobytes(), RATE, 2))
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+def bench(files, name, endpoint, asr):
+    rows = []
+    for path in files:
+        pcm, _ = read_wav_pcm16(path, RATE)
+        x = np.frombuffer(pcm, dtype=np.int16)
+        end_true = true_speech_end(path, x)
+        noise = quiet_tail(x, 1.0)
+        stream = np.concatenate((x, quiet_tail(x, 12.0)))
+        closed = endpoint(stream, noise)
+        row = {"file": os.path.basename(path),
+               "speech_end_s": round(end_true, 3),
+               "endpoint_ms": round((closed / RATE - end_true) * 1000, 1),
+               "truncated": closed / RATE < end_true - 0.05}
+        if asr:
+            t0 = time.perf_counter()
+            row["text"] = asr(stream[:closed])
+            row["asr_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            row["to_transcript_ms"] = round(row["endpoint_ms"] + row["asr_ms"], 1)
+            ref = os.path.splitext(path)[0] + ".txt"
+            if os.path.exists(ref):
+                with open(ref, encoding="utf-8") as f:
+                    row["wer"] = round(word_error_rate(f.read().strip(), row["text"]), 3)
+        rows.append(row)
+    ep = [r["endpoint_ms"] for r in rows if not r["truncated"]]
+    tt = [r["to_transcript_ms"] for r in rows if "to_transcript_ms" in r]
+    wers = [r["wer"] for r in rows if "wer" in r]
+    summary = {"config": name,
+               "endpoint_p50_ms": _pct(ep, 50), "endpoint_p95_ms": _pct(ep, 95),
+               "to_transcript_p50_ms": _pct(tt, 50), "to_transcript_p95_ms": _pct(tt, 95),
+               "truncated": sum(r["truncated"] for r in rows),
+               "wer_mean": round(float(np.mean(wers)), 3) if wers else None}
+    print(f"[BENCH-EP] {name}: fim de fala p50 {summary['endpoint_p50_ms']} ms | "
+          f"até a transcrição p50 {summary['to_transcript_p50_ms']} ms | "
+          f"cortadas {summary['truncated']}", file=sys.stderr)
+    return {**summary, "files": rows}
+
+def main():
+    ap = argparse.ArgumentParser(description="Latência de fim de fala, antes/depois do VAD")
+    ap.add_argument("--wav-dir", required=True)
+    ap.add_argument("--pause", type=float, default=0.8, help="pause_threshold do 'antes'")
+    ap.add_argument("--phrase-limit", type=float, default=10, help="phrase_time_limit do 'antes'")
+    ap.add_argument("--end-ms", nargs="+", type=int, default=[300, vad.VAD_END_MS, 500])
+    ap.add_argument("--max-s", type=float, default=20)
+    ap.add_argument("--asr", default="none", help="none, vosk, google ou whisper[:modelo]")
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    files = sorted(os.path.join(args.wav_dir, f) for f in os.listdir(args.wav_dir)
+                   if f.lower().endswith(".wav"))
+    asr = make_asr(args.asr)
+    results = [bench(files, f"antes: pause {args.pause}s, limite {args.phrase_limit}s",
+                     lambda x, noise: sr_listen(x, noise, args.pause, args.phrase_limit), asr)]
+    for end_ms in args.end_ms:
+        results.append(bench(files, f"VAD: fim de fala {end_ms} ms",
+                             lambda x, noise, e=end_ms: vad_listen(x, e, args.max_s), asr))
+    report = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                       "files": len(files), "asr": args.asr},
+              "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
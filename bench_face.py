@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark headless do render do UNIP Face
+- Roda com o driver de vídeo "dummy" do SDL (sem monitor)
+- Mede draw_expression(), o quadro completo do main() sem cache
+  (superfície sobreamostrada + draw + smoothscale + blit) e o quadro com cache (blit)
+- Todas as expressões × resoluções × OVERSAMPLE × FACE_SCALE
+- Saída em JSON (p50/p95/p99 em ms e quadros por núcleo)
+
+Uso:
+    python bench_face.py --frames 30 --out bench_antes.json
+"""
+
+import os, sys, json, time, argparse, platform
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import unipface
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+ALL_EXPRESSIONS = list(unipface.EXPRESSION_KEYFRAMES)
+
+def _stats(wall, cpu):
+    ms = np.asarray(wall) * 1000.0
+    cpu_total = float(sum(cpu))
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        # quantos quadros um núcleo inteiro de CPU consegue produzir por segundo
+        "frames_per_core": round(len(ms) / cpu_total, 1) if cpu_total > 0 else None,
+    }
+
+def _measure(fn, frames, warmup=2):
+    for _ in range(warmup):
+        fn()
+    wall, cpu = [], []
+    for _ in range(frames):
+        t0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall.append(time.perf_counter() - t0)
+        cpu.append(time.process_time() - c0)
+    return _stats(wall, cpu)
+
+def bench_case(screen, name, oversample, face_scale, frames):
+    unipface.OVERSAMPLE = oversample
+    unipface.FACE_SCALE = face_scale
+    w, h = screen.get_size()
+    hi_size = (int(w * oversample), int(h * oversample))
+    hi = pygame.Surface(hi_size)
+
+    def draw_only():
+        unipface.draw_expression(hi, name)
+
+    def full_frame():
+        # mesmo caminho que o main() fazia a cada quadro antes do cache
+        surf = pygame.Surface(hi_size)
+        unipface.draw_expression(surf, name)
+        pygame.transform.smoothscale(surf, (w, h), screen)
+        pygame.display.flip()
+
+    sprites = unipface.FaceSpriteCache()
+    def cached_frame():
+        screen.blit(sprites.get(name, (w, h)), (0, 0))
+        pygame.display.flip()
+
+    return {
+        "draw_expression": _measure(draw_only, frames),
+        "full_frame": _measure(full_frame, frames),
+        "cached_frame": _measure(cached_frame, frames),
+    }
+
+def run(resolutions, expressions, oversamples, face_scales, frames):
+    pygame.init()
+    results = []
+    try:
+        for res in resolutions:
+            screen = pygame.display.set_mode(RESOLUTIONS[res])
+            for osf in oversamples:
+                for fs in face_scales:
+                    for name in expressions:
+                        r = bench_case(screen, name, osf, fs, frames)
+                        results.append({"resolution": res, "oversample": osf,
+                                        "face_scale": fs, "expression": name, **r})
+                        print(f"[BENCH] {res} os={osf} scale={fs} {name}: "
+                              f"full p50={r['full_frame']['p50_ms']}ms "
+                              f"cache p50={r['cached_frame']['p50_ms']}ms", file=sys.stderr)
+    finally:
+        pygame.quit()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "frames": frames,
+        },
+        "results": results,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark headless do render do UNIP Face")
+    ap.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    ap.add_argument("--expressions", nargs="+", default=ALL_EXPRESSIONS, choices=ALL_EXPRESSIONS)
+    ap.add_argument("--oversample", nargs="+", type=float, default=[1.0, 1.25, 1.5])
+    ap.add_argument("--face-scale", nargs="+", type=float, default=[0.8, 1.3, 1.7])
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    report = run(args.resolutions, args.expressions, args.oversample, args.face_scale, args.frames)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark do motor de intenções (intent_engine.py)
+- Tabelas sintéticas com 10, 100, 1000... intenções (a real de intents.json
+  entra como primeiro caso)
+- Compara o motor compilado (trie de palavras) com a cadeia linear antiga
+  (um `in` por frase, na ordem da tabela)
+- Mede o tempo de compilação, o tempo por frase (p50/p95 em µs) e o acerto
+  (intenção plantada na frase, ou nenhuma) com frases que casam e que não
+  casam (o pior caso da cadeia: percorre tudo)
+
+Uso:
+    python bench_intents.py --intents 10 100 1000 --out bench_intents.json
+"""
+
+import os, sys, json, time, random, argparse, platform
+import numpy as np
+from intent_engine import IntentEngine, normalizar
+
+SILABAS = ["ba", "ca", "da", "fe", "ga", "li", "mo", "no", "pa", "ra", "sa", "te", "vi", "zu", "lo", "me"]
+SILABAS_FALA = ["qui", "xo", "nhe", "tro", "bem", "dur", "gos", "fin"]   # conversa sem comando
+
+def palavra(rng, silabas=SILABAS):
+    return "".join(rng.choice(silabas) for _ in range(rng.randint(2, 4)))
+
+def tabela_sintetica(n, seed=0):
+    rng = random.Random(seed)
+    intents = []
+    for i in range(n):
+        frases = [" ".join(palavra(rng) for _ in range(rng.randint(1, 3))) for _ in range(4)]
+        intents.append({"intent": f"intent_{i}", "phrases": frases,
+                        "reply": f"Resposta {i}.", "expression": "happy_open"})
+    return {"slots": {}, "intents": intents}
+
+class CadeiaLinear:
+    """O jeito antigo: testa as frases uma a uma, na ordem."""
+    def __init__(self, table):
+        self.regras = [(spec["intent"], [" ".join(normalizar(f)) for f in spec["phrases"]])
+                       for spec in table["intents"]]
+
+    def parse(self, texto):
+        t = " ".join(normalizar(texto or ""))
+        for nome, frases in self.regras:
+            if any(f in t for f in frases):
+                return (nome, {})
+        return (None, {})
+
+def frases_de_teste(table, n, seed=1):
+    """[(frase, intenção esperada ou None)]: metade com um comando no meio da fala."""
+    rng = random.Random(seed)
+    vocabulario = [palavra(rng, SILABAS_FALA) for _ in range(300)]
+    frases = []
+    for i in range(n):
+        fala = [rng.choice(vocabulario) for _ in range(6)]
+        esperada = None
+        if i % 2 == 0:
+            spec = rng.choice(table["intents"])
+            alvo = rng.choice(spec["phrases"]).replace("[", "").replace("]", "")
+            fala.insert(rng.randint(0, len(fala)), alvo.format(room="cozinha"))
+            esperada = spec["intent"]
+        frases.append((" ".join(fala), esperada))
+    return frases
+
+def medir(parse, frases, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        for f, _ in frases:
+            t0 = time.perf_counter()
+            parse(f)
+            tempos.append(time.perf_counter() - t0)
+    us = np.asarray(tempos) * 1e6
+    acerto = np.mean([parse(f)[0] == esperada for f, esperada in frases])
+    return {"p50_us": round(float(np.percentile(us, 50)), 2),
+            "p95_us": round(float(np.percentile(us, 95)), 2),
+            "acerto": round(float(acerto), 3)}
+
+def rodar(nome, table, frases, repeticoes):
+    t0 = time.perf_counter()
+    motor = IntentEngine(table)
+    compilar_ms = (time.perf_counter() - t0) * 1000
+    cadeia = CadeiaLinear(table)
+    linha = {"caso": nome, "intents": len(table["intents"]), "frases_compiladas": motor.n_frases,
+             "compilar_ms": round(compilar_ms, 2),
+             "motor": medir(motor.parse, frases, repeticoes),
+             "cadeia": medir(cadeia.parse, frases, repeticoes)}
+    print(f"[BENCH-NLU] {nome}: {linha['intents']} intenções | motor p50 {linha['motor']['p50_us']} µs"
+          f" | cadeia p50 {linha['cadeia']['p50_us']} µs | compilação {linha['compilar_ms']} ms"
+          f" | acerto {linha['motor']['acerto']} x {linha['cadeia']['acerto']}",
+          file=sys.stderr)
+    return linha
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmark do motor de intenções")
+    ap.add_argument("--tabela", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json"))
+    ap.add_argument("--intents", nargs="+", type=int, default=[10, 100, 1000])
+    ap.add_argument("--frases", type=int, default=200)
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    with open(args.tabela, encoding="utf-8") as f:
+        real = json.load(f)
+    results = [rodar("intents.json", real, frases_de_teste(real, args.frases), args.repeticoes)]
+    for n in args.intents:
+        table = tabela_sintetica(n)
+        results.append(rodar(f"sintética {n}", table, frases_de_teste(table, args.frases), args.repeticoes))
+
+    report = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                       "processor": platform.processor(), "frases": args.frases},
+              "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
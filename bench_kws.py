@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do detector leve de wake word (keyword_spotter.py) com gravações
+- Positivos: WAVs que contêm a palavra (cada um deve disparar uma vez)
+- Negativos: WAVs sem a palavra (fala qualquer, ruído da arena); conta alarmes falsos
+- Áudio entregue em blocos, como no microfone, para vários limiares
+- Mede taxa de detecção, alarmes falsos por hora e custo de CPU (fator de tempo real)
+
+Uso:
+    python bench_kws.py --templates palavras_chave --keyword start \\
+        --positives gravacoes/start --negatives gravacoes/fundo --out bench_kws.json
+"""
+
+import os, sys, json, time, argparse, platform
+import numpy as np
+import keyword_spotter as kws
+
+def list_wavs(d):
+    if not d:
+        return []
+    return sorted(os.path.join(d, f) for f in os.listdir(d) if f.lower().endswith(".wav"))
+
+def stream_clip(spotter, x, chunk, keyword):
+    """Entrega `x` em blocos; retorna (detecções, segundos de CPU)."""
+    spotter.reset()
+    hits = []
+    c0 = time.process_time()
+    for i in range(0, len(x), chunk):
+        hit = spotter.push(x[i:i + chunk])
+        if hit and hit[0] == keyword:
+            hits.append({"t_s": round((i + chunk) / spotter.rate, 2), "distance": round(hit[1], 3)})
+    return hits, time.process_time() - c0
+
+def run(spotter, keyword, positives, negatives, chunk, threshold):
+    spotter.threshold = threshold
+    # meio segundo de silêncio no fim: a palavra pode estar colada ao fim do arquivo
+    tail = np.zeros(spotter.rate // 2, np.float32)
+    detected, audio_s, cpu_s, pos_rows = 0, 0.0, 0.0, []
+    for path in positives:
+        x = np.concatenate((kws.read_wav(path, spotter.rate), tail))
+        hits, cpu = stream_clip(spotter, x, chunk, keyword)
+        detected += bool(hits)
+        audio_s += len(x) / spotter.rate
+        cpu_s += cpu
+        pos_rows.append({"file": os.path.basename(path), "hits": hits})
+    false_alarms, neg_s, neg_rows = 0, 0.0, []
+    for path in negatives:
+        x = kws.read_wav(path, spotter.rate)
+        hits, cpu = stream_clip(spotter, x, chunk, keyword)
+        false_alarms += len(hits)
+        neg_s += len(x) / spotter.rate
+        cpu_s += cpu
+        neg_rows.append({"file": os.path.basename(path), "audio_s": round(len(x) / spotter.rate, 1),
+                         "hits": hits})
+    audio_s += neg_s
+    return {
+        "threshold": threshold,
+        "detection_rate": round(detected / len(positives), 3) if positives else None,
+        "false_alarms": false_alarms,
+        "false_alarms_per_hour": round(false_alarms * 3600 / neg_s, 2) if neg_s else None,
+        "rtf": round(cpu_s / audio_s, 4) if audio_s else None,
+        "positives": pos_rows,
+        "negatives": neg_rows,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark do detector leve de wake word")
+    ap.add_argument("--templates", default="palavras_chave", help="pasta com <palavra>/*.wav")
+    ap.add_argument("--keyword", required=True)
+    ap.add_argument("--positives", default="")
+    ap.add_argument("--negatives", default="")
+    ap.add_argument("--thresholds", nargs="+", type=float,
+                    default=[0.12, 0.16, kws.KWS_THRESHOLD, 0.24, 0.28])
+    ap.add_argument("--chunk-ms", type=int, default=100)
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    spotter = kws.KeywordSpotter.from_dir(args.templates)
+    if args.keyword not in spotter.templates:
+        sys.exit(f"sem exemplos de '{args.keyword}' em {args.templates}")
+    positives, negatives = list_wavs(args.positives), list_wavs(args.negatives)
+    chunk = spotter.rate * args.chunk_ms // 1000
+    results = []
+    for th in args.thresholds:
+        r = run(spotter, args.keyword, positives, negatives, chunk, th)
+        results.append(r)
+        print(f"[BENCH-KWS] limiar {th}: detecção {r['detection_rate']} | "
+              f"alarmes falsos/h {r['false_alarms_per_hour']} | RTF {r['rtf']}", file=sys.stderr)
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "processor": platform.processor(), "keyword": args.keyword,
+                 "templates": len(spotter.templates[args.keyword]),
+                 "positives": len(positives), "negatives": len(negatives)},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
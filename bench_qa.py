@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do QA do whisper_speech.py (sem Whisper e sem microfone)
+- Perguntas fixas em JSONL: {"pergunta": "...", "resposta": "..." ou ["...", "..."]}
+- Contextos em .txt (parágrafos separados por linha em branco)
+- Compara o caminho antigo (pipeline sobre todos os contextos juntos) com a
+  base indexada (qa_context.ContextStore: BM25 + top-k trechos pré-tokenizados)
+- A base cresce com parágrafos de distração (--paragrafos 3 30 300) para ver
+  se a latência acompanha o tamanho do conhecimento
+- Latência p50/p95 por pergunta e acerto (exato normalizado / F1)
+- Com --int8, mede também o modelo quantizado (quantizar_qa.py) nos dois
+  caminhos e quantas respostas ficam iguais às do fp32
+
+Uso:
+    python bench_qa.py --contextos contextos.txt --perguntas perguntas.jsonl --paragrafos 3 30 300
+    python bench_qa.py --contextos contextos.txt --perguntas perguntas.jsonl --paragrafos 3 --int8
+"""
+
+import os, sys, json, copy, time, random, argparse, platform
+import numpy as np
+from qa_context import ContextStore
+from quantizar_qa import ARQUIVO_INT8, carregar_modelo_qa, quantizar
+from eval_whisper_speech import normalizar_resposta, resposta_f1
+
+def ler_paragrafos(path):
+    with open(path, encoding="utf-8") as f:
+        return [p.strip() for p in f.read().split("\n\n") if p.strip()]
+
+def ler_perguntas(path):
+    perguntas = []
+    with open(path, encoding="utf-8") as f:
+        for l in f:
+            if l.strip():
+                d = json.loads(l)
+                resp = d.get("resposta") or []
+                perguntas.append((d["pergunta"], [resp] if isinstance(resp, str) else resp))
+    return perguntas
+
+def distratores(base, n, seed=0):
+    """Parágrafos sem sentido com o vocabulário da base (só volume para o índice)."""
+    rng = random.Random(seed)
+    palavras = " ".join(base).split()
+    return [" ".join(rng.choice(palavras) for _ in range(rng.randint(60, 140))) + "."
+            for _ in range(n)]
+
+def carregar_modelo(pasta):
+    from transformers import pipeline, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(pasta)
+    model, _ = carregar_modelo_qa(pasta, usar_int8=False)
+    return tokenizer, model, pipeline("question-answering", model=model, tokenizer=tokenizer)
+
+def carregar_int8(pasta, model, tokenizer):
+    """O qa_int8.pt da pasta, ou quantiza uma cópia do fp32 na hora."""
+    from transformers import pipeline
+    q, variante = carregar_modelo_qa(pasta)
+    origem = ARQUIVO_INT8
+    if variante != "int8":
+        q, origem = quantizar(copy.deepcopy(model)), "quantizado na hora"
+    return q, pipeline("question-answering", model=q, tokenizer=tokenizer), origem
+
+def medir(responder, perguntas, repeticoes, respostas=None):
+    tempos, exatas, f1s = [], [], []
+    for pergunta, esperadas in perguntas:
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            r = responder(pergunta)
+            tempos.append(time.perf_counter() - t0)
+        if respostas is not None:
+            respostas.append(normalizar_resposta(r["answer"]))
+        if esperadas:
+            exatas.append(any(normalizar_resposta(r["answer"]) == normalizar_resposta(e) for e in esperadas))
+            f1s.append(max(resposta_f1(e, r["answer"]) for e in esperadas))
+    ms = np.asarray(tempos) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "exata": round(float(np.mean(exatas)), 3) if exatas else None,
+            "f1": round(float(np.mean(f1s)), 3) if f1s else None}
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark do QA: pipeline inteiro x base indexada")
+    ap.add_argument("--modelo", default=os.path.abspath("modelo_qa_offline"))
+    ap.add_argument("--contextos", required=True)
+    ap.add_argument("--perguntas", required=True)
+    ap.add_argument("--distratores", default="", help=".txt com parágrafos extras (padrão: sintéticos)")
+    ap.add_argument("--paragrafos", nargs="+", type=int, default=[3, 30, 300])
+    ap.add_argument("--pipeline-ate", type=int, default=100,
+                    help="não roda o caminho antigo acima deste número de parágrafos (lento)")
+    ap.add_argument("--repeticoes", type=int, default=3)
+    ap.add_argument("--int8", action="store_true", help="compara também o modelo quantizado")
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    base = ler_paragrafos(args.contextos)
+    perguntas = ler_perguntas(args.perguntas)
+    extras = ler_paragrafos(args.distratores) if args.distratores else distratores(base, max(args.paragrafos))
+    tokenizer, model, qa_pipeline = carregar_modelo(args.modelo)
+    if args.int8:
+        model_int8, pipeline_int8, origem_int8 = carregar_int8(args.modelo, model, tokenizer)
+
+    results = []
+    for n in args.paragrafos:
+        contextos = base + extras[:max(0, n - len(base))]
+        t0 = time.perf_counter()
+        store = ContextStore(contextos, tokenizer, model)
+        fp32 = []
+        linha = {"paragrafos": len(contextos), "trechos": len(store.trechos),
+                 "indexacao_ms": round((time.perf_counter() - t0) * 1000, 1),
+                 "indexado": medir(store.responder, perguntas, args.repeticoes, fp32)}
+        junto = " ".join(contextos)
+        if len(contextos) <= args.pipeline_ate:
+            linha["pipeline"] = medir(lambda q: qa_pipeline(question=q, context=junto),
+                                      perguntas, args.repeticoes)
+        if args.int8:
+            int8 = []
+            store_int8 = ContextStore(contextos, tokenizer, model_int8)
+            linha["indexado_int8"] = medir(store_int8.responder, perguntas, args.repeticoes, int8)
+            linha["indexado_int8"]["iguais_fp32"] = round(
+                float(np.mean([a == b for a, b in zip(fp32, int8)])), 3) if fp32 else None
+            if len(contextos) <= args.pipeline_ate:
+                linha["pipeline_int8"] = medir(lambda q: pipeline_int8(question=q, context=junto),
+                                               perguntas, args.repeticoes)
+        results.append(linha)
+        print(f"[BENCH-QA] {linha['paragrafos']} parágrafos: indexado p50 {linha['indexado']['p50_ms']} ms"
+              f" | pipeline p50 {linha.get('pipeline', {}).get('p50_ms')} ms"
+              + (f" | int8 p50 {linha['indexado_int8']['p50_ms']} ms"
+                 f" (iguais ao fp32: {linha['indexado_int8']['iguais_fp32']})" if args.int8 else ""),
+              file=sys.stderr)
+
+    report = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                       "processor": platform.processor(), "modelo": args.modelo,
+                       "perguntas": len(perguntas),
+                       "int8": origem_int8 if args.int8 else None},
+              "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
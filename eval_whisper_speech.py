@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Avaliação em lote do whisper_speech.py (sem microfone)
+- Cada amostra passa pelas mesmas etapas do loop principal: palavra de
+  ativação (detector leve + confirmação com Whisper, ou só Whisper),
+  fim da fala (VAD), transcrição (Whisper) e resposta (QA)
+- Pool de processos: cada processo importa o whisper_speech uma vez
+  (modelos residentes) e os núcleos de CPU são divididos entre eles
+- Saída: JSON (resumo + amostras) e CSV (uma linha por amostra), com
+  latência por etapa, WER da pergunta e acerto da resposta
+
+Entrada: uma pasta ou um manifesto (.jsonl / .csv)
+    pasta:      <nome>.wav            pergunta falada
+                <nome>.txt            pergunta esperada (opcional)
+                <nome>.resposta.txt   respostas aceitas, uma por linha (opcional)
+                <nome>.ativacao.wav   palavra de ativação falada (opcional)
+    manifesto:  campos audio, pergunta, resposta ("a|b" para várias), ativacao
+                (caminhos relativos ao manifesto)
+
+Uso:
+    python eval_whisper_speech.py --dados avaliacao/ --processos 2 --saida resultados/eval
+"""
+
+import os, io, csv, sys, json, time, string, argparse, platform, contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+RATE = 16000
+SILENCIO_FINAL_S = 1.0     # silêncio após a gravação, para o VAD fechar a frase
+
+# ===================== DADOS =====================
+def _ler_texto(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip()
+
+def carregar_amostras(dados):
+    amostras = []
+    if os.path.isdir(dados):
+        for f in sorted(os.listdir(dados)):
+            if not f.lower().endswith(".wav") or f.lower().endswith(".ativacao.wav"):
+                continue
+            base = os.path.join(dados, f[:-4])
+            resposta = _ler_texto(base + ".resposta.txt")
+            amostras.append({
+                "id": f[:-4],
+                "audio": base + ".wav",
+                "pergunta": _ler_texto(base + ".txt"),
+                "respostas": [l.strip() for l in resposta.splitlines() if l.strip()] if resposta else [],
+                "ativacao": base + ".ativacao.wav" if os.path.exists(base + ".ativacao.wav") else None,
+            })
+        return amostras
+    raiz = os.path.dirname(os.path.abspath(dados))
+    with open(dados, encoding="utf-8", newline="") as f:
+        linhas = ([json.loads(l) for l in f if l.strip()] if dados.endswith(".jsonl")
+                  else list(csv.DictReader(f)))
+    for i, l in enumerate(linhas):
+        resposta = l.get("resposta") or []
+        if isinstance(resposta, str):
+            resposta = [r.strip() for r in resposta.split("|") if r.strip()]
+        amostras.append({
+            "id": l.get("id") or os.path.splitext(os.path.basename(l["audio"]))[0] or str(i),
+            "audio": os.path.join(raiz, l["audio"]),
+            "pergunta": l.get("pergunta") or None,
+            "respostas": resposta,
+            "ativacao": os.path.join(raiz, l["ativacao"]) if l.get("ativacao") else None,
+        })
+    return amostras
+
+# ===================== MÉTRICAS =====================
+def normalizar(texto):
+    texto = (texto or "").lower()
+    texto = texto.translate(str.maketrans("", "", string.punctuation))
+    return " ".join(texto.split())
+
+def normalizar_resposta(texto):
+    return " ".join(w for w in normalizar(texto).split() if w not in ("a", "an", "the"))
+
+def word_error_rate(ref, hyp):
+    r, h = normalizar(ref).split(), normalizar(hyp).split()
+    if not r:
+        return 0.0 if not h else 1.0
+    d = np.arange(len(h) + 1)
+    for i in range(1, len(r) + 1):
+        prev, d[0] = d.copy(), i
+        for j in range(1, len(h) + 1):
+            d[j] = min(prev[j] + 1, d[j - 1] + 1, prev[j - 1] + (r[i - 1] != h[j - 1]))
+    return float(d[len(h)]) / len(r)
+
+def resposta_f1(esperada, obtida):
+    e, o = normalizar_resposta(esperada).split(), normalizar_resposta(obtida).split()
+    comum = sum(min(e.count(w), o.count(w)) for w in set(e))
+    if not e or not o or not comum:
+        return float(e == o)
+    p, r = comum / len(o), comum / len(e)
+    return 2 * p * r / (p + r)
+
+def pontuar(row, amostra):
+    if amostra["pergunta"]:
+        row["wer"] = round(word_error_rate(amostra["pergunta"], row["transcricao"]), 3)
+    if amostra["respostas"]:
+        for campo, resp in (("", row["resposta"]), ("_oraculo", row.get("resposta_oraculo"))):
+            if resp is None:
+                continue
+            row["resposta_exata" + campo] = any(normalizar_resposta(resp) == normalizar_resposta(e)
+                                                for e in amostra["respostas"])
+            row["resposta_f1" + campo] = round(max(resposta_f1(e, resp) for e in amostra["respostas"]), 3)
+    return row
+
+# ===================== PROCESSO DE TRABALHO =====================
+_ws = None
+
+def _iniciar_processo(threads):
+    global _ws
+    os.environ["WHISPER_THREADS_CPU"] = str(threads)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import whisper_speech
+        whisper_speech.criar_inicializacao(servicos=False).wait_all()
+    _ws = whisper_speech
+
+def _ativacao(ws, x):
+    """(detectou, texto ouvido) para a gravação da palavra de ativação."""
+    if ws.spotter:
+        ws.spotter.reset()
+        x = np.concatenate((x, np.zeros(int(RATE * SILENCIO_FINAL_S), np.float32)))
+        hit = None
+        for i in range(0, len(x), 1600):
+            hit = ws.spotter.push(x[i:i + 1600]) or hit
+        if not hit or hit[0] != ws.palavrachave.lower():
+            return False, ""
+        if not ws.KWS_CONFIRMAR_COM_WHISPER:
+            return True, ws.palavrachave.lower()
+    texto = ws.whisper_pool.transcrever(ws.MODELO_WHISPER_ATIVACAO, x).lower()
+    return ws.palavrachave.lower() in texto, texto
+
+def _fim_da_fala(ws, x):
+    """Trecho que o VAD entregaria ao Whisper e a latência de fim de fala (ms)."""
+    import vad
+    pcm = (np.clip(x, -1, 1) * 32767).astype(np.int16)
+    pcm = np.concatenate((pcm, np.zeros(int(RATE * SILENCIO_FINAL_S), np.int16)))
+    ep = vad.Endpointer(RATE, end_ms=ws.VAD_FIM_DE_FALA_MS, max_s=ws.VAD_PERGUNTA_MAX_S)
+    for i in range(0, len(pcm), 1600):
+        if ep.push(pcm[i:i + 1600]):
+            break
+    if ep.speech_start is None:
+        return x, None
+    ini = max(0, ep.speech_start - int(vad.VAD_PRE_ROLL_MS * RATE / 1000))
+    fim = ep.closed_at or len(pcm)
+    return pcm[ini:fim].astype(np.float32) / 32768.0, (fim - ep.speech_end) * 1000 / RATE
+
+def avaliar_amostra(amostra):
+    from keyword_spotter import read_wav
+    ws = _ws
+    row = {"id": amostra["id"]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        if amostra["ativacao"]:
+            t0 = time.perf_counter()
+            row["ativacao_detectada"], row["ativacao_texto"] = _ativacao(ws, read_wav(amostra["ativacao"]))
+            row["ativacao_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        x = read_wav(amostra["audio"])
+        trecho, vad_ms = _fim_da_fala(ws, x)
+        row["vad_ms"] = round(vad_ms, 1) if vad_ms is not None else None
+
+        t0 = time.perf_counter()
+        row["transcricao"] = ws.whisper_pool.transcrever(ws.MODELO_WHISPER_PERGUNTA, trecho)
+        row["asr_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        # sem cache: cada amostra mede o QA de verdade (qa_ms e acerto não dependem da ordem)
+        t0 = time.perf_counter()
+        row["resposta"] = (ws.responder_com_base_no_contexto(ws.contextos_gerais, row["transcricao"],
+                                                             usar_cache=False)
+                           if row["transcricao"].strip() else "")
+        row["qa_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        row["total_ms"] = round((row["vad_ms"] or 0) + row["asr_ms"] + row["qa_ms"], 1)
+
+        # QA com a pergunta certa: separa erro de transcrição de erro de resposta
+        if amostra["pergunta"] and amostra["respostas"]:
+            row["resposta_oraculo"] = ws.responder_com_base_no_contexto(ws.contextos_gerais,
+                                                                        amostra["pergunta"],
+                                                                        usar_cache=False)
+    return row
+
+# ===================== RELATÓRIO =====================
+def _pct(values, q):
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+def resumir(rows):
+    def col(k):
+        return [r[k] for r in rows if r.get(k) is not None]
+    def media(k):
+        v = col(k)
+        return round(float(np.mean(v)), 3) if v else None
+    resumo = {"amostras": len(rows)}
+    for etapa in ("ativacao_ms", "vad_ms", "asr_ms", "qa_ms", "total_ms"):
+        v = col(etapa)
+        resumo[etapa] = {"p50": _pct(v, 50), "p95": _pct(v, 95), "max": max(v) if v else None}
+    resumo.update({
+        "ativacao_taxa": media("ativacao_detectada"),
+        "wer": media("wer"),
+        "resposta_exata": media("resposta_exata"),
+        "resposta_f1": media("resposta_f1"),
+        "resposta_exata_oraculo": media("resposta_exata_oraculo"),
+    })
+    return resumo
+
+CSV_CAMPOS = ["id", "ativacao_detectada", "ativacao_ms", "vad_ms", "asr_ms", "qa_ms", "total_ms",
+              "wer", "resposta_exata", "resposta_f1", "resposta_exata_oraculo",
+              "transcricao", "resposta", "resposta_oraculo", "ativacao_texto"]
+
+def main():
+    ap = argparse.ArgumentParser(description="Avaliação em lote do whisper_speech.py")
+    ap.add_argument("--dados", required=True, help="pasta de WAVs ou manifesto .jsonl/.csv")
+    ap.add_argument("--processos", type=int, default=1)
+    ap.add_argument("--saida", default="eval_whisper", help="prefixo dos arquivos .json e .csv")
+    args = ap.parse_args()
+
+    amostras = carregar_amostras(args.dados)
+    if not amostras:
+        sys.exit(f"nenhuma amostra em {args.dados}")
+    threads = max(1, (os.cpu_count() or 2) // max(1, args.processos))
+    t0 = time.perf_counter()
+    if args.processos <= 1:
+        _iniciar_processo(threads)
+        carga_s = time.perf_counter() - t0
+        rows = [avaliar_amostra(a) for a in amostras]
+    else:
+        ctx = multiprocessing.get_context("spawn")   # torch não gosta de fork com threads
+        with ProcessPoolExecutor(args.processos, mp_context=ctx, initializer=_iniciar_processo,
+                                 initargs=(threads,)) as pool:
+            rows = list(pool.map(avaliar_amostra, amostras))
+        carga_s = None
+    total_s = time.perf_counter() - t0
+    rows = [pontuar(r, a) for r, a in zip(rows, amostras)]
+    for r in rows:
+        print(f"[EVAL] {r['id']}: asr {r['asr_ms']} ms | qa {r['qa_ms']} ms | wer {r.get('wer')} | "
+              f"'{r['transcricao']}' -> '{r['resposta']}'", file=sys.stderr)
+
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "processor": platform.processor(), "processos": args.processos,
+                 "threads_por_processo": threads, "dados": args.dados,
+                 "carga_s": round(carga_s, 2) if carga_s is not None else None,
+                 "total_s": round(total_s, 2)},
+        "resumo": resumir(rows),
+        "amostras": rows,
+    }
+    pasta = os.path.dirname(args.saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(args.saida + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(args.saida + ".csv", "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_CAMPOS, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    print(json.dumps(report["resumo"], indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geometria dos traços do rosto (NumPy)
+- Avalia pontos de Bézier/retas em lote, sem laço por ponto
+- Monta o contorno do traço grosso como UM polígono com pontas arredondadas
+- Preenche com uma única chamada anti-aliased (gfxdraw)
+"""
+
+import math
+import numpy as np
+from pygame import gfxdraw
+
+CURVE_SEGMENTS = 48   # segmentos da curva (antes: 181 círculos carimbados)
+CAP_SEGMENTS   = 12   # segmentos de cada ponta arredondada
+
+def quad_bezier_points(p0, p1, p2, steps=CURVE_SEGMENTS):
+    """Pontos (steps+1, 2) da Bézier quadrática p0→p2 com controle p1."""
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    P = np.asarray((p0, p1, p2), dtype=float)
+    return (1 - t)**2 * P[0] + 2*(1 - t)*t * P[1] + t**2 * P[2]
+
+def line_points(x1, y1, x2, y2):
+    return np.array(((x1, y1), (x2, y2)), dtype=float)
+
+def _arc(center, radius, a0, a1, n):
+    # pontos internos do arco (sem as extremidades, que já estão nas laterais)
+    a = np.linspace(a0, a1, n + 1)[1:-1]
+    return center + radius * np.column_stack((np.cos(a), np.sin(a)))
+
+def stroke_outline(points, radius, cap_segments=CAP_SEGMENTS):
+    """
+    Contorno fechado de um traço de raio `radius` ao longo de `points`:
+    lateral esquerda → ponta final → lateral direita (volta) → ponta inicial.
+    """
+    pts = np.asarray(points, dtype=float)
+    tan = np.gradient(pts, axis=0)
+    norm = np.hypot(tan[:, 0], tan[:, 1])
+    if not norm.any():
+        return _arc(pts[0], radius, 0.0, 2 * math.pi, 2 * cap_segments + 1)
+    tan /= np.where(norm > 0, norm, 1.0)[:, None]
+    nrm = np.column_stack((-tan[:, 1], tan[:, 0]))
+
+    left  = pts + radius * nrm
+    right = pts - radius * nrm
+    a_end   = math.atan2(nrm[-1, 1], nrm[-1, 0])
+    a_start = math.atan2(nrm[0, 1], nrm[0, 0])
+    cap_end   = _arc(pts[-1], radius, a_end, a_end - math.pi, cap_segments)
+    cap_start = _arc(pts[0], radius, a_start + math.pi, a_start, cap_segments)
+    return np.concatenate((left, cap_end, right[::-1], cap_start))
+
+def fill_polygon_aa(surf, poly, color):
+    pts = [tuple(p) for p in np.rint(poly).astype(int).tolist()]
+    gfxdraw.filled_polygon(surf, pts, color)
+    gfxdraw.aapolygon(surf, pts, color)
+
+def stroke_points(surf, points, width, color):
+    """Desenha o traço grosso (com pontas redondas) que passa por `points`."""
+    rad = max(1, int(round(width / 2)))
+    fill_polygon_aa(surf, stroke_outline(points, rad), color)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de intenções do UNIP Face, a partir de uma tabela declarativa (intents.json)
+- Cada intenção: frases, resposta e expressão; frases aceitam [palavra opcional]
+  e {slot} (valores em "slots", ex.: os cômodos do navigate)
+- Tudo é expandido e compilado UMA vez num trie de palavras: o casamento custa
+  O(palavras do texto × maior frase), não importa quantas intenções existam
+- Texto e frases passam pela mesma normalização (caixa, acentos, pontuação)
+- Erros comuns do ASR: índice de variantes pré-calculado (explícitas da tabela
+  + letra faltando em palavras longas do vocabulário, estilo SymSpell). Letra
+  trocada/invertida fica de fora: vira palavra comum em comando (cheia → chega)
+- Empate entre intenções: vale a ordem da tabela (como a antiga cadeia de ifs)
+"""
+
+import re, json, itertools, unicodedata
+from collections import defaultdict
+
+VARIANT_MIN_LEN = 6        # só palavras longas ganham variantes automáticas
+VARIANT_MEMO    = 4096     # palavras já corrigidas (o vocabulário falado se repete)
+
+_NAO_PALAVRA = re.compile(r"[^\w\s]+", re.UNICODE)
+_FIM = None                # chave do trie que guarda a intenção da frase
+
+def normalizar(texto):
+    t = texto.lower()
+    if not t.isascii():
+        t = "".join(c for c in unicodedata.normalize("NFKD", t) if not unicodedata.combining(c))
+    return _NAO_PALAVRA.sub(" ", t.replace("-", " ")).split()
+
+def _delecoes(palavra):
+    # a 1ª letra fica: sem ela surgem palavras comuns (andou, presente)
+    return {palavra[:i] + palavra[i + 1:] for i in range(1, len(palavra))}
+
+class IntentEngine:
+    """
+    `parse(texto)` → (intenção, slots) ou (None, {});
+    `reply(intenção, slots)` → (frase, expressão) ou (None, None).
+    """
+    def __init__(self, table):
+        self.slots = {nome: list(valores) for nome, valores in table.get("slots", {}).items()}
+        self.intents = {}
+        self._trie = {}
+        self.n_frases = 0
+        for prioridade, spec in enumerate(table["intents"]):
+            nome = spec["intent"]
+            self.intents[nome] = {"reply": spec.get("reply"), "expression": spec.get("expression"),
+                                  "phrases": list(spec["phrases"])}
+            for frase in spec["phrases"]:
+                for tokens, slots in self._expandir(frase):
+                    self._inserir(tokens, (prioridade, nome, slots))
+        self._indexar_variantes(table.get("variants", {}))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ---------- compilação ----------
+    def _expandir(self, frase):
+        """'vá para [a] {room}' → [(('va','para','a','cozinha'), {'room': 'cozinha'}), ...]"""
+        opcoes = []
+        for parte in frase.split():
+            if parte.startswith("{") and parte.endswith("}"):
+                slot = parte[1:-1]
+                opcoes.append([(tuple(normalizar(v)), {slot: v}) for v in self.slots[slot]])
+            elif parte.startswith("[") and parte.endswith("]"):
+                opcoes.append([(tuple(normalizar(parte[1:-1])), {}), ((), {})])
+            else:
+                opcoes.append([(tuple(normalizar(parte)), {})])
+        for combinacao in itertools.product(*opcoes):
+            tokens = tuple(t for toks, _ in combinacao for t in toks)
+            slots = {k: v for _, s in combinacao for k, v in s.items()}
+            if tokens:
+                yield tokens, slots
+
+    def _inserir(self, tokens, entrada):
+        no = self._trie
+        for t in tokens:
+            no = no.setdefault(t, {})
+        atual = no.get(_FIM)
+        if atual is None or entrada[0] < atual[0]:
+            no[_FIM] = entrada
+        self.n_frases += 1
+
+    def _vocabulario(self):
+        pilha, vocab = [self._trie], set()
+        while pilha:
+            no = pilha.pop()
+            for t, filho in no.items():
+                if t is not _FIM:
+                    vocab.add(t)
+                    pilha.append(filho)
+        return vocab
+
+    def _indexar_variantes(self, explicitas):
+        self.vocab = self._vocabulario()
+        self._variantes = {}
+        for canonica, variantes in explicitas.items():
+            alvo = normalizar(canonica)
+            for v in variantes:
+                origem = normalizar(v)
+                if len(origem) == 1 and len(alvo) == 1:
+                    self._variantes[origem[0]] = alvo[0]
+        # deleções das palavras do vocabulário: o token com uma letra faltando
+        self._delecoes = defaultdict(set)
+        for palavra in self.vocab:
+            if len(palavra) >= VARIANT_MIN_LEN:
+                for d in _delecoes(palavra):
+                    self._delecoes[d].add(palavra)
+        self._memo = {}
+
+    def _corrigir(self, token):
+        v = self._variantes.get(token)
+        if v is not None or token in self.vocab or len(token) < VARIANT_MIN_LEN - 1:
+            return v or token
+        # só letra faltando; a mais, trocada ou invertida costuma ser outra
+        # palavra (chega -> chegar, cheia, chego; quarto -> quanto)
+        candidatas = self._delecoes.get(token, ())
+        return next(iter(candidatas)) if len(candidatas) == 1 else token
+
+    # ---------- uso ----------
+    def tokens(self, texto):
+        memo = self._memo
+        saida = []
+        for t in normalizar(texto or ""):
+            c = memo.get(t)
+            if c is None:
+                if len(memo) >= VARIANT_MEMO:
+                    memo.clear()
+                c = memo[t] = self._corrigir(t)
+            saida.append(c)
+        return saida
+
+    def parse(self, texto):
+        toks = self.tokens(texto)
+        melhor = None
+        for i in range(len(toks)):
+            no = self._trie
+            for t in toks[i:]:
+                no = no.get(t)
+                if no is None:
+                    break
+                fim = no.get(_FIM)
+                if fim is not None and (melhor is None or fim[0] < melhor[0]):
+                    melhor = fim
+        if melhor is None:
+            return (None, {})
+        return (melhor[1], dict(melhor[2]))
+
+    def reply(self, intent, slots):
+        spec = self.intents.get(intent)
+        if spec is None or spec["reply"] is None:
+            return (None, None)
+        valores = {nome: "" for nome in self.slots}
+        valores.update(slots)
+        return (spec["reply"].format(**valores), spec["expression"])
+
+    def known_replies(self):
+        """Todas as respostas possíveis (com cada valor de slot), sem repetição."""
+        frases = []
+        for nome, spec in self.intents.items():
+            usados = sorted({s for f in spec["phrases"] for s in re.findall(r"\{(\w+)\}", f)})
+            combinacoes = itertools.product(*(self.slots[s] for s in usados)) if usados else [()]
+            for valores in combinacoes:
+                frase = self.reply(nome, dict(zip(usados, valores)))[0]
+                if frase and frase not in frases:
+                    frases.append(frase)
+        return frases
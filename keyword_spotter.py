@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detector de palavra de ativação leve (keyword spotting), só NumPy
+- MFCC (log-mel + DCT) calculados incrementalmente sobre o fluxo do microfone
+- Cada palavra tem alguns exemplos gravados (templates), comparados por DTW
+  de subsequência com a janela mais recente de áudio
+- Portão de energia: em silêncio nenhum DTW é calculado
+- O reconhecedor pesado (Whisper/Google/Vosk) só recebe áudio após uma detecção
+
+Templates: uma pasta por palavra, com WAVs curtos de exemplos
+    palavras_chave/start/01.wav, palavras_chave/start/02.wav, ...
+"""
+
+import os, wave
+from functools import lru_cache
+import numpy as np
+
+SAMPLE_RATE = 16000
+WIN_MS      = 25
+HOP_MS      = 10
+N_FFT       = 512
+N_MELS      = 40
+N_MFCC      = 13
+
+KWS_THRESHOLD   = 0.20    # distância média por quadro (cosseno) para disparar
+KWS_STEP_MS     = 100     # de quanto em quanto áudio novo roda o DTW
+KWS_REFRACTORY_MS = 1500  # ignora novas detecções logo após uma
+KWS_GATE_DB     = 12.0    # só compara se houver som este tanto acima do ruído
+KWS_AUDIO_S     = 2.5     # áudio recente guardado para o reconhecedor pesado
+
+# ===================== FEATURES =====================
+@lru_cache(maxsize=4)
+def _mel_filterbank(rate, n_fft, n_mels):
+    def hz_to_mel(f): return 2595.0 * np.log10(1.0 + f / 700.0)
+    def mel_to_hz(m): return 700.0 * (10 ** (m / 2595.0) - 1.0)
+    mels = np.linspace(hz_to_mel(60.0), hz_to_mel(rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / rate).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        lo, c, hi = bins[m - 1], bins[m], bins[m + 1]
+        if c > lo: fb[m - 1, lo:c] = (np.arange(lo, c) - lo) / (c - lo)
+        if hi > c: fb[m - 1, c:hi] = (hi - np.arange(c, hi)) / (hi - c)
+    return fb
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n_in, n_out):
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2.0 / n_in)).astype(np.float32)
+
+@lru_cache(maxsize=4)
+def _window(win):
+    return np.hanning(win).astype(np.float32)
+
+def frame_signal(x, win, hop):
+    """Quadros (n, win) como view (sem cópia) sobre `x`."""
+    n = 1 + (len(x) - win) // hop
+    if n <= 0:
+        return np.zeros((0, win), dtype=x.dtype)
+    return np.lib.stride_tricks.as_strided(
+        x, shape=(n, win), strides=(x.strides[0] * hop, x.strides[0]), writeable=False)
+
+def mfcc_frames(x, rate=SAMPLE_RATE):
+    """(mfcc (n, N_MFCC), energia em dB por quadro (n,)) de um sinal float32."""
+    win, hop = rate * WIN_MS // 1000, rate * HOP_MS // 1000
+    frames = frame_signal(np.ascontiguousarray(x, dtype=np.float32), win, hop)
+    if not len(frames):
+        return np.zeros((0, N_MFCC), np.float32), np.zeros(0, np.float32)
+    spec = np.abs(np.fft.rfft(frames * _window(win), n=N_FFT)) ** 2
+    mel = np.log(spec @ _mel_filterbank(rate, N_FFT, N_MELS).T + 1e-10)
+    energy_db = 10 * np.log10(spec.sum(axis=1) / win + 1e-12)
+    return mel @ _dct_matrix(N_MELS, N_MFCC).T, energy_db.astype(np.float32)
+
+def _unit(feats):
+    # sem c0 (volume); normaliza para comparar por cosseno
+    f = feats[:, 1:]
+    return f / (np.linalg.norm(f, axis=1, keepdims=True) + 1e-8)
+
+def subsequence_dtw(cost):
+    """
+    DTW de subsequência (template em qualquer ponto do fluxo), passos
+    (1,1), (1,2), (2,1): cada linha depende só das anteriores → vetorizado
+    por linha. Retorna o custo médio por quadro para cada quadro final.
+    """
+    T, N = cost.shape
+    prev2 = None
+    prev = cost[0].copy()
+    for i in range(1, T):
+        best = np.full(N, np.inf, dtype=cost.dtype)
+        best[1:] = prev[:-1]
+        best[2:] = np.minimum(best[2:], prev[:-2])
+        if prev2 is not None:
+            best[1:] = np.minimum(best[1:], prev2[:-1])
+        prev2, prev = prev, cost[i] + best
+    return prev / T
+
+def read_wav(path, rate=SAMPLE_RATE):
+    """WAV PCM16 → float32 mono em [-1, 1] na taxa `rate`."""
+    with wave.open(path, "rb") as w:
+        ch, sr = w.getnchannels(), w.getframerate()
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: só PCM 16 bits")
+        x = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    x = x.reshape(-1, ch).mean(axis=1) / 32768.0
+    if sr != rate:
+        n = int(round(len(x) * rate / sr))
+        x = np.interp(np.linspace(0, len(x) - 1, n), np.arange(len(x)), x)
+    return x.astype(np.float32)
+
+# ===================== DETECTOR =====================
+class KeywordSpotter:
+    """
+    Recebe blocos PCM16 (bytes) ou float32 em `push()`; devolve
+    (palavra, distância) quando uma palavra é detectada, senão None.
+    """
+    def __init__(self, rate=SAMPLE_RATE, threshold=KWS_THRESHOLD):
+        self.rate = rate
+        self.threshold = threshold
+        self.templates = {}           # palavra -> [features normalizadas]
+        self._hop = rate * HOP_MS // 1000
+        self._max_frames = 1
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros(0, np.float32)       # amostras ainda não enquadradas
+        self._feats = np.zeros((0, N_MFCC - 1), np.float32)
+        self._energy = np.zeros(0, np.float32)
+        self._floor_db = None
+        self._since_check = 0
+        self._since_hit = 10 ** 9
+        self._candidate = None
+        self._audio = np.zeros(int(self.rate * KWS_AUDIO_S), np.float32)
+
+    # ----- templates -----
+    def enroll(self, keyword, audio):
+        """Adiciona um exemplo gravado (float32) da palavra."""
+        feats, energy = mfcc_frames(audio, self.rate)
+        keep = energy > energy.max() - 35.0           # corta silêncio nas pontas
+        idx = np.flatnonzero(keep)
+        if len(idx) < 5:
+            return
+        feats = feats[idx[0]:idx[-1] + 1]
+        self.templates.setdefault(keyword, []).append(_unit(feats).astype(np.float32))
+        self._max_frames = max(self._max_frames, int(len(feats) * 1.6) + 2)
+
+    @classmethod
+    def from_dir(cls, path, palavras=None, **kwargs):
+        """
+        Uma subpasta por palavra-chave, com os WAV de exemplo. `palavras`: só
+        essas (nome da pasta sem diferença de caixa), registradas com o nome dado;
+        outras palavras da pasta compartilhada não disparam nem causam refratário.
+        """
+        spotter = cls(**kwargs)
+        alvo = {p.lower(): p for p in palavras} if palavras is not None else None
+        if os.path.isdir(path):
+            for pasta in sorted(os.listdir(path)):
+                kdir = os.path.join(path, pasta)
+                if not os.path.isdir(kdir):
+                    continue
+                keyword = pasta if alvo is None else alvo.get(pasta.lower())
+                if keyword is None:
+                    continue
+                for name in sorted(os.listdir(kdir)):
+                    if name.lower().endswith(".wav"):
+                        spotter.enroll(keyword, read_wav(os.path.join(kdir, name), spotter.rate))
+        return spotter
+
+    def __bool__(self):
+        return bool(self.templates)
+
+    # ----- fluxo -----
+    def recent_audio(self):
+        """Últimos KWS_AUDIO_S segundos (float32), para confirmar com o reconhecedor pesado."""
+        return self._audio.copy()
+
+    def push(self, chunk):
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            x = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        else:
+            x = np.asarray(chunk, dtype=np.float32)
+        n = len(x)
+        if n >= len(self._audio):
+            self._audio[:] = x[-len(self._audio):]
+        else:
+            self._audio[:-n] = self._audio[n:]
+            self._audio[-n:] = x
+
+        buf = np.concatenate((self._pending, x))
+        feats, energy = mfcc_frames(buf, self.rate)
+        used = len(feats) * self._hop
+        self._pending = buf[used:]
+        if not len(feats):
+            return None
+
+        self._feats = np.concatenate((self._feats, _unit(feats)))[-self._max_frames:]
+        self._energy = np.concatenate((self._energy, energy))[-self._max_frames:]
+
+        # piso de ruído: acompanha rápido para baixo, devagar para cima
+        e_min = float(energy.min())
+        if self._floor_db is None or e_min < self._floor_db:
+            self._floor_db = e_min
+        else:
+            self._floor_db += 0.002 * len(feats) * (e_min - self._floor_db)
+
+        self._since_check += len(feats)
+        self._since_hit += len(feats)
+        if self._since_check * HOP_MS < KWS_STEP_MS:
+            return None
+        recent = self._since_check
+        self._since_check = 0
+        if self._since_hit * HOP_MS < KWS_REFRACTORY_MS:
+            return None
+        if self._energy.max() < self._floor_db + KWS_GATE_DB:
+            return self._fire()                           # silêncio: nada a comparar
+
+        best = None
+        for keyword, temps in self.templates.items():
+            for tpl in temps:
+                if len(self._feats) < len(tpl) // 2:
+                    continue
+                cost = 1.0 - tpl @ self._feats.T          # (T, N) distância cosseno
+                score = float(subsequence_dtw(cost)[-recent:].min())
+                if best is None or score < best[1]:
+                    best = (keyword, score)
+        # espera o custo parar de cair: a palavra terminou e o áudio está completo
+        if best is not None and best[1] <= self.threshold and (
+                self._candidate is None or best[1] < self._candidate[1]):
+            self._candidate = best
+            return None
+        return self._fire()
+
+    def _fire(self):
+        hit, self._candidate = self._candidate, None
+        if hit is not None:
+            self._since_hit = 0
+        return hit
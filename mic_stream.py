@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microfone persistente com buffer circular
+- Um único stream do microfone fica aberto o programa inteiro (thread próprio)
+- As amostras vão para um buffer circular PCM16 pré-alocado (sem alocar por bloco)
+- Piso de ruído estimado continuamente (percentil do RMS dos últimos segundos);
+  o energy_threshold dos Recognizers anexados acompanha o ambiente, sem a pausa
+  de adjust_for_ambient_noise() a cada frase
+- Leitores independentes: cada um tem sua posição no buffer, e pode começar
+  no passado (pre-roll), ex.: o áudio logo antes/depois da wake word
+- Supressão de ruído opcional por leitor (source(denoise=True)); o perfil de
+  ruído é do microfone, compartilhado entre os leitores
+
+Uso:
+    mic = MicStream(rate=16000).start()
+    mic.attach(recognizer)
+    audio = recognizer.listen(mic.source(), timeout=5)
+"""
+
+import threading, time
+import numpy as np
+import speech_recognition as sr
+from noise_suppression import NoiseProfile, NoiseSuppressor
+
+MIC_RING_SECONDS  = 30       # quanto áudio fica disponível para leitura
+NOISE_WINDOW_S    = 5.0      # janela do estimador de ruído
+NOISE_PERCENTILE  = 20       # percentil do RMS por bloco tomado como piso
+NOISE_MARGIN      = 2.0      # energy_threshold = piso × margem
+NOISE_UPDATE_S    = 0.5      # de quanto em quanto o limiar é recalculado
+MIN_ENERGY        = 50       # limiar mínimo (sala muito silenciosa)
+
+class MicStream:
+    def __init__(self, device_index=None, rate=16000, chunk=1600, seconds=MIC_RING_SECONDS,
+                 energy=MIN_ENERGY):
+        self.rate = rate
+        self.chunk = chunk
+        self.energy_threshold = float(energy)    # até a primeira estimativa do ruído
+        self.noise_floor = 0.0
+        self._ring = np.zeros(int(rate * seconds), dtype=np.int16)
+        self._scratch = np.zeros(chunk, dtype=np.float32)
+        n_levels = max(1, int(NOISE_WINDOW_S * rate / chunk))
+        self._levels = np.zeros(n_levels, dtype=np.float32)   # RMS por bloco (circular)
+        self._n_levels = 0
+        self._update_every = max(1, int(NOISE_UPDATE_S * rate / chunk))
+        self._written = 0                # total de amostras já escritas (posição absoluta)
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._recognizers = []
+        self.noise_profile = NoiseProfile()
+        self._mic = sr.Microphone(device_index=device_index, sample_rate=rate, chunk_size=chunk)
+        self._thread = threading.Thread(target=self._run, name="mic-stream", daemon=True)
+
+    # ----- ciclo de vida -----
+    def start(self):
+        self._mic.__enter__()
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._closed.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        try:
+            self._mic.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def attach(self, recognizer):
+        """O limiar do Recognizer passa a seguir o piso de ruído deste stream."""
+        recognizer.dynamic_energy_threshold = False
+        recognizer.energy_threshold = self.energy_threshold
+        self._recognizers.append(recognizer)
+
+    # ----- captura -----
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                data = self._mic.stream.read(self.chunk)
+            except Exception as e:
+                print("[MIC] Captura erro:", e)
+                time.sleep(0.1)
+                continue
+            x = np.frombuffer(data, dtype=np.int16)
+            self._write(x)
+            self._update_noise(x)
+
+    def _write(self, x):
+        cap, n = len(self._ring), len(x)
+        if n > cap:
+            x, n = x[-cap:], cap
+        i = self._written % cap
+        first = min(n, cap - i)
+        self._ring[i:i + first] = x[:first]
+        self._ring[:n - first] = x[first:]
+        with self._cond:
+            self._written += n
+            self._cond.notify_all()
+
+    def _update_noise(self, x):
+        s = self._scratch[:len(x)]
+        np.copyto(s, x, casting="unsafe")
+        self._levels[self._n_levels % len(self._levels)] = np.sqrt(np.dot(s, s) / max(1, len(s)))
+        self._n_levels += 1
+        if self._n_levels % self._update_every:
+            return
+        filled = self._levels[:min(self._n_levels, len(self._levels))]
+        self.noise_floor = float(np.percentile(filled, NOISE_PERCENTILE))
+        self.energy_threshold = max(float(MIN_ENERGY), self.noise_floor * NOISE_MARGIN)
+        for r in self._recognizers:
+            r.energy_threshold = self.energy_threshold
+
+    @property
+    def noise_floor_db(self):
+        """Piso de ruído em dB (escala PCM16), para o VAD; None antes da 1ª estimativa."""
+        return 20 * np.log10(self.noise_floor) if self.noise_floor > 0 else None
+
+    # ----- leitura -----
+    def position(self):
+        """Posição absoluta (em amostras) do fim do áudio já capturado."""
+        with self._cond:
+            return self._written
+
+    def read_at(self, start, n, timeout=None):
+        """
+        `n` amostras a partir da posição absoluta `start` (bloqueia até existirem).
+        Retorna (int16 array, início real): se o leitor ficou para trás mais que o
+        buffer, pula para o áudio mais antigo ainda disponível.
+        """
+        cap = len(self._ring)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._written >= start + n or self._closed.is_set(),
+                                       timeout=timeout):
+                raise TimeoutError("microfone sem áudio")
+            if self._closed.is_set() and self._written < start + n:
+                raise OSError("microfone fechado")
+            start = max(start, self._written - cap + self.chunk)   # folga: bloco sendo escrito
+            i = start % cap
+            first = min(n, cap - i)
+            out = np.empty(n, dtype=np.int16)
+            out[:first] = self._ring[i:i + first]
+            out[first:] = self._ring[:n - first]
+        return out, start
+
+    def recent(self, seconds, end=None):
+        """Últimos `seconds` de áudio até `end` (padrão: agora), float32 em [-1, 1]."""
+        end = self.position() if end is None else end
+        n = min(int(seconds * self.rate), end, len(self._ring))
+        pcm, _ = self.read_at(end - n, n)
+        return pcm.astype(np.float32) / 32768.0
+
+    def source(self, start=None, pre_roll_s=0.0, denoise=False):
+        """AudioSource para Recognizer.listen()/leitura direta, sem reabrir o microfone."""
+        if start is None:
+            start = self.position()
+        start = max(0, start - int(pre_roll_s * self.rate))
+        if denoise:
+            return RingSource(self, _DenoisedReader(self, start, NoiseSuppressor(self.noise_profile)))
+        return RingSource(self, _RingReader(self, start))
+
+class _RingReader:
+    def __init__(self, mic, start):
+        self.mic = mic
+        self.pos = start
+
+    def read(self, size):
+        pcm, start = self.mic.read_at(self.pos, size)
+        self.pos = start + size
+        return pcm.tobytes()
+
+class _DenoisedReader(_RingReader):
+    """Leitor que passa o áudio pelo supressor de ruído (pos = áudio bruto já lido)."""
+    def __init__(self, mic, start, suppressor):
+        super().__init__(mic, start)
+        self.suppressor = suppressor
+        self._out = np.zeros(0, dtype=np.int16)
+
+    def read(self, size):
+        while len(self._out) < size:
+            pcm, start = self.mic.read_at(self.pos, max(size - len(self._out), self.suppressor.hop))
+            self.pos = start + len(pcm)
+            self._out = np.concatenate((self._out, self.suppressor.process(pcm)))
+        data, self._out = self._out[:size], self._out[size:]
+        return data.tobytes()
+
+class RingSource(sr.AudioSource):
+    """Leitor do MicStream com a interface que o SpeechRecognition espera."""
+    def __init__(self, mic, reader):
+        self.SAMPLE_RATE = mic.rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = mic.chunk
+        self.stream = reader
+        self.denoised = isinstance(reader, _DenoisedReader)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supressão de ruído em fluxo (subtração espectral / Wiener), só NumPy
+- STFT com janela raiz-de-Hann e 50% de sobreposição (reconstrução perfeita),
+  todos os quadros de um bloco processados de uma vez
+- Perfil de ruído (espectro médio) aprendido nos quadros de silêncio e mantido
+  entre frases; pode ser salvo/carregado (ex.: aprendido uma vez na arena)
+- Latência adicionada fixa: NS_FRAME - NS_HOP amostras (16 ms a 16 kHz)
+- Diferente do noisereduce (clip inteiro), funciona bloco a bloco na captura
+"""
+
+import numpy as np
+
+NS_FRAME         = 512      # 32 ms a 16 kHz
+NS_HOP           = 256
+NS_FLOOR_DB      = -15.0    # atenuação máxima por faixa
+NS_OVERSUBTRACT  = 1.5      # quanto do ruído estimado é removido
+NS_PROFILE_ALPHA = 0.05     # velocidade de atualização do perfil (por quadro de ruído)
+NS_NOISE_DB      = 4.0      # quadro "é ruído" se a energia está até isto acima do perfil
+
+class NoiseProfile:
+    """Espectro de potência médio do ruído; compartilhado entre supressores."""
+    def __init__(self, bins=NS_FRAME // 2 + 1):
+        self.power = np.zeros(bins, dtype=np.float32)
+        self.frames = 0
+
+    @property
+    def ready(self):
+        return self.frames > 0
+
+    def update(self, power):
+        """`power`: (n, bins) de quadros considerados ruído."""
+        if not len(power):
+            return
+        if not self.ready:
+            self.power[:] = power.mean(axis=0)
+        else:
+            a = 1.0 - (1.0 - NS_PROFILE_ALPHA) ** len(power)
+            self.power += a * (power.mean(axis=0) - self.power)
+        self.frames += len(power)
+
+    def save(self, path):
+        np.save(path, self.power)
+
+    def load(self, path):
+        self.power[:] = np.load(path)
+        self.frames = max(self.frames, 1)
+        return self
+
+class NoiseSuppressor:
+    """
+    `process(pcm)` recebe PCM16 em blocos de qualquer tamanho e devolve PCM16
+    limpo (atrasado em NS_FRAME - NS_HOP amostras).
+    """
+    def __init__(self, profile=None, frame=NS_FRAME, hop=NS_HOP):
+        assert frame == 2 * hop, "sobreposição de 50%"
+        self.frame, self.hop = frame, hop
+        self.profile = profile or NoiseProfile(frame // 2 + 1)
+        self.window = np.sqrt(np.hanning(frame + 1)[:frame]).astype(np.float32)
+        self.floor = 10 ** (NS_FLOOR_DB / 20)
+        self.reset()
+
+    @property
+    def latency_samples(self):
+        return self.frame - self.hop
+
+    def reset(self):
+        self._pending = np.zeros(self.frame - self.hop, dtype=np.float32)
+        self._tail = np.zeros(self.hop, dtype=np.float32)      # 2ª metade do último quadro
+
+    def process(self, pcm, learn=True):
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+        buf = np.concatenate((self._pending, pcm.astype(np.float32)))
+        n = (len(buf) - self.frame) // self.hop + 1
+        if n <= 0:
+            self._pending = buf
+            return np.zeros(0, dtype=np.int16)
+        frames = np.lib.stride_tricks.as_strided(
+            buf, shape=(n, self.frame), strides=(buf.strides[0] * self.hop, buf.strides[0]),
+            writeable=False)
+        spec = np.fft.rfft(frames * self.window, axis=1)
+        power = spec.real ** 2 + spec.imag ** 2
+
+        if learn:
+            energy = power.sum(axis=1)
+            if self.profile.ready:
+                noise = energy <= self.profile.power.sum() * 10 ** (NS_NOISE_DB / 10)
+            else:
+                noise = energy <= np.percentile(energy, 30)  # sem perfil: os quadros mais baixos
+            self.profile.update(power[noise])
+
+        if self.profile.ready:
+            gain = np.maximum(1.0 - NS_OVERSUBTRACT * self.profile.power / (power + 1e-9), self.floor)
+            spec *= np.sqrt(gain)
+        y = np.fft.irfft(spec, n=self.frame, axis=1).astype(np.float32) * self.window
+
+        # overlap-add vetorizado: cada saída = 1ª metade do quadro k + 2ª metade do k-1
+        prev = np.concatenate((self._tail[None, :], y[:-1, self.hop:]))
+        out = (y[:, :self.hop] + prev).reshape(-1)
+        self._tail = y[-1, self.hop:].copy()
+        self._pending = buf[n * self.hop:]
+        return np.clip(out, -32768, 32767).astype(np.int16)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de respostas do QA do whisper_speech.py
+- A pergunta transcrita é normalizada (caixa, acentos, pontuação, contrações,
+  possessivo): "What's your name?" e "what is your name" viram a mesma chave
+- Busca exata num dict; se falhar, busca aproximada por Jaccard dos termos
+  de conteúdo (sem palavras vazias), via índice invertido termo -> perguntas:
+  "can you tell me the population of vitoria" acha "what is the population
+  of vitoria" (2/3). Termos podem sobrar ou faltar, mas não ser trocados:
+  "the population of X" e "the area of X" são perguntas diferentes
+- LRU limitado; esvaziado sozinho quando a lista de contextos muda
+- Contadores de acertos exatos / aproximados / faltas
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+
+QA_CACHE_ITENS      = 256
+QA_CACHE_MIN_TERMOS = 2      # menos termos de conteúdo que isso: só busca exata
+QA_CACHE_JACCARD    = 0.6    # similaridade mínima (termos em comum / termos no total)
+
+_CONTRACOES = [
+    (re.compile(r"\b(can)'?t\b"), r"\1 not"),
+    (re.compile(r"\bwon'?t\b"), "will not"),
+    (re.compile(r"\b(\w+)n't\b"), r"\1 not"),
+    (re.compile(r"\b(what|who|where|when|how|why|which|it|that|there|here|he|she)'s\b"), r"\1 is"),
+    (re.compile(r"\b(\w+)'re\b"), r"\1 are"),
+    (re.compile(r"\b(\w+)'ll\b"), r"\1 will"),
+    (re.compile(r"\b(\w+)'ve\b"), r"\1 have"),
+    (re.compile(r"\b(\w+)'d\b"), r"\1 would"),
+    (re.compile(r"\bi'm\b"), "i am"),
+    (re.compile(r"\b(\w+)'s\b"), r"\1"),             # possessivo: vitoria's -> vitoria
+]
+_APOSTROFO = re.compile(r"[’`´]")
+_NAO_PALAVRA = re.compile(r"[^\w\s]+", re.UNICODE)
+_HESITACOES = {"um", "uh", "hmm", "er", "please"}
+# palavras que a busca aproximada pode ignorar (pronomes e interrogativos contam)
+_VAZIAS = {"a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+           "of", "in", "on", "at", "to", "for", "about", "and", "or",
+           "can", "could", "would", "will", "you", "tell", "me", "know", "so", "well"}
+
+def termos_de_conteudo(chave):
+    return frozenset(p for p in chave.split() if p not in _VAZIAS)
+
+def normalizar_pergunta(texto):
+    t = unicodedata.normalize("NFKD", _APOSTROFO.sub("'", texto.lower()))
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    for padrao, troca in _CONTRACOES:
+        t = padrao.sub(troca, t)
+    t = _NAO_PALAVRA.sub(" ", t)
+    return " ".join(p for p in t.split() if p not in _HESITACOES)
+
+class AnswerCache:
+    """
+    `buscar(contextos, pergunta)` → resultado guardado (dict do QA) ou None;
+    `guardar(contextos, pergunta, resultado)`.
+    """
+    def __init__(self, max_itens=QA_CACHE_ITENS):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()            # chave normalizada -> (resultado, termos)
+        self._indice = defaultdict(set)        # termo de conteúdo -> chaves
+        self._contextos = None
+        self._lock = threading.Lock()
+        self.exatos = self.aproximados = self.faltas = 0
+
+    def _sincronizar(self, contextos):
+        contextos = tuple(contextos)
+        if contextos != self._contextos:
+            self._contextos = contextos
+            self._itens.clear()
+            self._indice.clear()
+
+    def _remover(self, chave):
+        _, termos = self._itens.pop(chave)
+        for termo in termos:
+            chaves = self._indice[termo]
+            chaves.discard(chave)
+            if not chaves:
+                del self._indice[termo]
+
+    def _aproximada(self, termos):
+        if len(termos) < QA_CACHE_MIN_TERMOS:
+            return None
+        comuns = defaultdict(int)              # candidata -> termos em comum
+        for termo in termos:
+            for chave in self._indice.get(termo, ()):
+                comuns[chave] += 1
+        melhor, melhor_sim = None, QA_CACHE_JACCARD
+        for chave, n in comuns.items():
+            outros = self._itens[chave][1]
+            if n < len(outros) and n < len(termos):
+                continue                       # os dois lados têm termo próprio: troca
+            sim = n / (len(termos) + len(outros) - n)
+            if sim >= melhor_sim and len(outros) >= QA_CACHE_MIN_TERMOS:
+                melhor, melhor_sim = chave, sim
+        return melhor
+
+    def buscar(self, contextos, pergunta):
+        chave = normalizar_pergunta(pergunta)
+        with self._lock:
+            self._sincronizar(contextos)
+            if chave not in self._itens:
+                chave = self._aproximada(termos_de_conteudo(chave))
+                if chave is None:
+                    self.faltas += 1
+                    return None
+                self.aproximados += 1
+            else:
+                self.exatos += 1
+            self._itens.move_to_end(chave)
+            return self._itens[chave][0]
+
+    def guardar(self, contextos, pergunta, resultado):
+        chave = normalizar_pergunta(pergunta)
+        if not chave:
+            return
+        termos = termos_de_conteudo(chave)
+        with self._lock:
+            self._sincronizar(contextos)
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (resultado, termos)
+            for termo in termos:
+                self._indice[termo].add(chave)
+            while len(self._itens) > self.max_itens:
+                self._remover(next(iter(self._itens)))
+
+    def __len__(self):
+        return len(self._itens)
+
+    @property
+    def taxa_acerto(self):
+        total = self.exatos + self.aproximados + self.faltas
+        return (self.exatos + self.aproximados) / total if total else 0.0
+
+    def resumo(self):
+        return (f"{len(self)} perguntas | acertos {self.exatos} exatos + {self.aproximados} aproximados, "
+                f"{self.faltas} faltas ({self.taxa_acerto:.0%})")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base de contextos para o QA do whisper_speech.py
+- Os contextos são divididos em trechos e tokenizados UMA vez (ids + offsets)
+- Índice léxico BM25 em NumPy (listas invertidas com o peso já calculado):
+  a busca custa proporcional às ocorrências dos termos da pergunta
+- Só os top-k trechos vão para o modelo, num único forward em lote; a
+  pergunta é tokenizada e encaixada nos ids já prontos de cada trecho
+- A resposta é o melhor intervalo (início, fim) como no pipeline do
+  transformers: softmax sobre o contexto + CLS (a "sem resposta" fica com parte
+  da probabilidade), score = p(início) × p(fim)
+"""
+
+import re
+from collections import defaultdict
+import numpy as np
+
+QA_TRECHO_PALAVRAS   = 120     # tamanho máximo de um trecho
+QA_TRECHO_SOBREPOSTO = 1       # frases repetidas entre trechos vizinhos
+QA_TOP_K             = 3
+QA_MAX_RESPOSTA      = 15      # tokens (mesmo padrão do pipeline)
+BM25_K1, BM25_B      = 1.5, 0.75
+
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+_FRASE = re.compile(r"(?<=[.!?])\s+")
+
+def termos(texto):
+    return _PALAVRA.findall(texto.lower())
+
+def dividir_em_trechos(texto, max_palavras=QA_TRECHO_PALAVRAS, sobreposto=QA_TRECHO_SOBREPOSTO):
+    frases = [f for f in _FRASE.split(texto.strip()) if f]
+    trechos, atual = [], []
+    for frase in frases:
+        if atual and sum(len(f.split()) for f in atual) + len(frase.split()) > max_palavras:
+            trechos.append(" ".join(atual))
+            atual = atual[-sobreposto:] if sobreposto else []
+        atual.append(frase)
+    if atual:
+        trechos.append(" ".join(atual))
+    return trechos
+
+class BM25Index:
+    def __init__(self, docs):
+        self.n = len(docs)
+        tokens = [termos(d) for d in docs]
+        lens = np.array([len(t) for t in tokens], dtype=np.float32)
+        avg = float(lens.mean()) if self.n else 1.0
+        postings = defaultdict(lambda: ([], []))
+        for i, toks in enumerate(tokens):
+            uniq, tf = np.unique(toks, return_counts=True)
+            for t, c in zip(uniq, tf):
+                postings[t][0].append(i)
+                postings[t][1].append(c)
+        self.postings = {}
+        for t, (ids, tf) in postings.items():
+            ids = np.asarray(ids, dtype=np.int32)
+            tf = np.asarray(tf, dtype=np.float32)
+            idf = np.log(1.0 + (self.n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lens[ids] / max(avg, 1e-6))
+            self.postings[t] = (ids, (idf * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32))
+
+    def search(self, query, k):
+        scores = np.zeros(self.n, dtype=np.float32)
+        for t in set(termos(query)):
+            p = self.postings.get(t)
+            if p is not None:
+                scores[p[0]] += p[1]
+        if not self.n:
+            return []
+        k = min(k, self.n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [int(i) for i in top[np.argsort(-scores[top])]]
+
+class ContextStore:
+    """
+    `responder(pergunta)` → {"answer", "score", "trecho"}; `qa_model` e
+    `tokenizer` são os carregados por carregar_qa() (fp32 ou int8).
+    """
+    def __init__(self, contextos, tokenizer, qa_model, top_k=QA_TOP_K,
+                 max_palavras=QA_TRECHO_PALAVRAS):
+        self.contextos = tuple(contextos)
+        self.tokenizer = tokenizer
+        self.model = qa_model
+        self.top_k = top_k
+        self.trechos = [t for c in contextos for t in dividir_em_trechos(c, max_palavras)]
+        self.index = BM25Index(self.trechos)
+        self._rapido = getattr(tokenizer, "is_fast", False)
+        enc = tokenizer(self.trechos, add_special_tokens=False,
+                        return_offsets_mapping=self._rapido)
+        self.ids = enc["input_ids"]
+        self.offsets = enc["offset_mapping"] if self._rapido else None
+        self._usa_tipos = "token_type_ids" in getattr(tokenizer, "model_input_names", [])
+
+    def _montar(self, q_ids, ctx_ids):
+        # onde o contexto entra na sequência com tokens especiais (vale para BERT, RoBERTa, ...)
+        molde = self.tokenizer.build_inputs_with_special_tokens(q_ids, [-1])
+        ini = molde.index(-1)
+        ids = molde[:ini] + list(ctx_ids) + molde[ini + 1:]
+        tipos = (self.tokenizer.create_token_type_ids_from_sequences(q_ids, list(ctx_ids))
+                 if self._usa_tipos else None)
+        return ids, tipos, ini
+
+    def responder(self, pergunta, top_k=None):
+        import torch
+        escolhidos = self.index.search(pergunta, top_k or self.top_k)
+        if not escolhidos:
+            return {"answer": "", "score": 0.0, "trecho": None}
+        q_ids = self.tokenizer(pergunta, add_special_tokens=False)["input_ids"]
+        limite = getattr(self.tokenizer, "model_max_length", 512)
+        limite = limite if limite and limite < 100000 else 512
+        folga = len(self.tokenizer.build_inputs_with_special_tokens(q_ids, [])) + 1
+        lotes = [self._montar(q_ids, self.ids[i][:max(1, limite - folga)]) for i in escolhidos]
+
+        largura = max(len(ids) for ids, _, _ in lotes)
+        pad = self.tokenizer.pad_token_id or 0
+        input_ids = torch.full((len(lotes), largura), pad, dtype=torch.long)
+        mascara = torch.zeros((len(lotes), largura), dtype=torch.long)
+        tipos = torch.zeros((len(lotes), largura), dtype=torch.long) if self._usa_tipos else None
+        for j, (ids, tt, _) in enumerate(lotes):
+            input_ids[j, :len(ids)] = torch.tensor(ids)
+            mascara[j, :len(ids)] = 1
+            if tipos is not None:
+                tipos[j, :len(tt)] = torch.tensor(tt)
+        entradas = {"input_ids": input_ids, "attention_mask": mascara}
+        if tipos is not None:
+            entradas["token_type_ids"] = tipos
+        with torch.inference_mode():
+            saida = self.model(**entradas)
+        inicio_l = saida.start_logits.float().numpy()
+        fim_l = saida.end_logits.float().numpy()
+
+        melhor = {"answer": "", "score": 0.0, "trecho": None}
+        cls_id = self.tokenizer.cls_token_id
+        for j, i in enumerate(escolhidos):
+            ids, _, ini = lotes[j]
+            n = len(self.ids[i][:max(1, limite - folga)])
+            # como o pipeline: o CLS entra na normalização, mas não na resposta
+            sel = np.arange(ini, ini + n)
+            if cls_id is not None and cls_id in ids[:ini]:
+                sel = np.r_[ids.index(cls_id), sel]
+            k = len(sel) - n
+            s = _softmax(inicio_l[j, sel])[k:]
+            e = _softmax(fim_l[j, sel])[k:]
+            prod = np.triu(np.outer(s, e))               # fim >= início
+            prod = np.tril(prod, QA_MAX_RESPOSTA - 1)    # no máximo QA_MAX_RESPOSTA tokens
+            a, b = np.unravel_index(int(np.argmax(prod)), prod.shape)
+            score = float(prod[a, b])
+            if score > melhor["score"]:
+                melhor = {"answer": self._texto(i, a, b), "score": score, "trecho": i}
+        return melhor
+
+    def _texto(self, i, a, b):
+        if self.offsets is not None:
+            return self.trechos[i][self.offsets[i][a][0]:self.offsets[i][b][1]].strip()
+        return self.tokenizer.decode(self.ids[i][a:b + 1]).strip()
+
+def _softmax(x):
+    x = np.exp(x - x.max())
+    return x / x.sum()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versão int8 do modelo de QA (quantização dinâmica do PyTorch), só CPU
+- Conversão única: as camadas Linear do modelo em modelo_qa_offline/ passam a
+  ter pesos int8 (ativações quantizadas na hora), salvo em <pasta>/qa_int8.pt
+- carregar_modelo_qa(pasta) usa o int8 automaticamente quando o arquivo existe
+  (e é de um modelo com a mesma config); senão, o fp32 de sempre
+- Continua sendo um modelo do transformers: serve para o pipeline e para o
+  qa_context.ContextStore sem mudança
+- Comparação de acerto/latência com o fp32: bench_qa.py --int8
+
+Uso:
+    python quantizar_qa.py --modelo modelo_qa_offline
+"""
+
+import os, json, time, argparse
+import torch
+
+ARQUIVO_INT8 = "qa_int8.pt"
+INFO_INT8    = "qa_int8.json"
+
+def _motor_quantizado():
+    """fbgemm/x86 em PCs, qnnpack em ARM."""
+    motores = torch.backends.quantized.supported_engines
+    for nome in ("x86", "fbgemm", "qnnpack"):
+        if nome in motores:
+            torch.backends.quantized.engine = nome
+            return nome
+    return torch.backends.quantized.engine
+
+def quantizar(model):
+    _motor_quantizado()
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+def _assinatura(config):
+    return {"model_type": config.model_type, "hidden_size": config.hidden_size,
+            "num_hidden_layers": config.num_hidden_layers, "vocab_size": config.vocab_size}
+
+def converter(pasta):
+    from transformers import AutoModelForQuestionAnswering
+    model = AutoModelForQuestionAnswering.from_pretrained(pasta)
+    t0 = time.perf_counter()
+    q = quantizar(model)
+    destino = os.path.join(pasta, ARQUIVO_INT8)
+    torch.save(q, destino)
+    with open(os.path.join(pasta, INFO_INT8), "w", encoding="utf-8") as f:
+        json.dump({"torch": torch.__version__, "motor": torch.backends.quantized.engine,
+                   **_assinatura(model.config)}, f, indent=2)
+    return destino, time.perf_counter() - t0
+
+def carregar_modelo_qa(pasta, usar_int8=True):
+    """(model, "int8" | "fp32"). Cai para o fp32 se o int8 faltar ou não carregar."""
+    from transformers import AutoConfig, AutoModelForQuestionAnswering
+    caminho = os.path.join(pasta, ARQUIVO_INT8)
+    if usar_int8 and os.path.exists(caminho):
+        try:
+            _motor_quantizado()
+            model = torch.load(caminho, weights_only=False)
+            if _assinatura(model.config) != _assinatura(AutoConfig.from_pretrained(pasta)):
+                raise ValueError("qa_int8.pt é de outro modelo; rode quantizar_qa.py de novo")
+            return model.eval(), "int8"
+        except Exception as e:
+            print(f"[AVISO] Modelo int8 ignorado ({e}); usando fp32")
+    return AutoModelForQuestionAnswering.from_pretrained(pasta).eval(), "fp32"
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera a versão int8 do modelo de QA")
+    ap.add_argument("--modelo", default=os.path.abspath("modelo_qa_offline"))
+    args = ap.parse_args()
+    destino, dt = converter(args.modelo)
+    fp32 = sum(os.path.getsize(os.path.join(args.modelo, f)) for f in os.listdir(args.modelo)
+               if f.endswith((".bin", ".safetensors")))
+    print(f"[QA-INT8] {destino}: {os.path.getsize(destino) / 1e6:.1f} MB "
+          f"(fp32 {fp32 / 1e6:.1f} MB), quantizado em {dt:.1f}s")
+
+if __name__ == "__main__":
+    main()
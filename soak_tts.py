@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Soak test do pipeline de áudio do TTS (UNIP Face)
+- Fala milhares de frases pelo TTSEngine real (worker, streaming, cache, mixer)
+- Fonte local: um MP3 gravado, entregue em blocos como o Edge-TTS faria
+- Acompanha descritores de arquivo, arquivos no diretório temporário e RSS
+- Saída em JSON; código de saída 1 se algum recurso crescer além do limite
+
+Uso:
+    python soak_tts.py --mp3 amostra.mp3 --utterances 2000 --out soak.json
+"""
+
+import os, sys, json, time, asyncio, argparse, tempfile
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import unipface
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource   # sem /proc: usa o pico
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def tmp_usage():
+    d = tempfile.gettempdir()
+    files = size = 0
+    for name in os.listdir(d):
+        p = os.path.join(d, name)
+        if os.path.isfile(p):
+            files += 1
+            size += os.path.getsize(p)
+    return files, size
+
+def clip_mp3(data, clip_ms):
+    """Corta o MP3 nos primeiros `clip_ms` de áudio, em fronteira de quadro."""
+    end, dur = 0, 0.0
+    for pos, (length, samples, rate) in unipface._mp3_frames(data):
+        if dur * 1000 >= clip_ms:
+            break
+        end, dur = pos + length, dur + samples / rate
+    return data[:end]
+
+def make_source(data, chunk_bytes):
+    async def source(text):
+        for i in range(0, len(data), chunk_bytes):
+            await asyncio.sleep(0)
+            yield data[i:i + chunk_bytes]
+    return source
+
+def snapshot(i, t0):
+    files, size = tmp_usage()
+    return {"utterance": i, "elapsed_s": round(time.perf_counter() - t0, 1),
+            "fds": open_fds(), "rss_kb": rss_kb(), "tmp_files": files, "tmp_bytes": size}
+
+def run(mp3, utterances, every, clip_ms, chunk_bytes):
+    with open(mp3, "rb") as f:
+        data = clip_mp3(f.read(), clip_ms)
+    unipface.VERBOSE_LOG = False
+    pygame.mixer.pre_init(frequency=unipface.AUDIO_FREQ)
+    pygame.init()
+    tts = unipface.TTSEngine(stream_source=make_source(data, chunk_bytes))
+    clock = pygame.time.Clock()
+    t0 = time.perf_counter()
+    samples = [snapshot(0, t0)]
+    try:
+        for i in range(1, utterances + 1):
+            tts.say(f"frase de teste número {i}")   # texto novo: força síntese a cada vez
+            while tts.busy():
+                tts.iterate()
+                clock.tick(unipface.FPS_TARGET)
+            if i % every == 0 or i == utterances:
+                samples.append(snapshot(i, t0))
+                print(f"[SOAK] {samples[-1]}", file=sys.stderr)
+    finally:
+        pygame.quit()
+    return samples, list(tts.ttfa_ms)
+
+def main():
+    ap = argparse.ArgumentParser(description="Soak test do pipeline de áudio do TTS")
+    ap.add_argument("--mp3", required=True, help="MP3 de exemplo (ex.: saída do Edge-TTS)")
+    ap.add_argument("--utterances", type=int, default=1000)
+    ap.add_argument("--every", type=int, default=100, help="intervalo entre medições")
+    ap.add_argument("--clip-ms", type=int, default=800, help="duração tocada por frase")
+    ap.add_argument("--chunk-bytes", type=int, default=1024)
+    ap.add_argument("--rss-slack-mb", type=float, default=16.0)
+    ap.add_argument("--fd-slack", type=int, default=2)
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    samples, ttfa = run(args.mp3, args.utterances, args.every, args.clip_ms, args.chunk_bytes)
+    # a 1ª medição após o aquecimento serve de base (caches e mixer já alocados)
+    base, last = samples[min(1, len(samples) - 1)], samples[-1]
+    checks = {
+        "tmp_files_growth": last["tmp_files"] - samples[0]["tmp_files"],
+        "fd_growth": (last["fds"] - base["fds"]) if base["fds"] is not None else None,
+        "rss_growth_kb": last["rss_kb"] - base["rss_kb"],
+    }
+    ok = (checks["tmp_files_growth"] <= 0
+          and (checks["fd_growth"] is None or checks["fd_growth"] <= args.fd_slack)
+          and checks["rss_growth_kb"] <= args.rss_slack_mb * 1024)
+    report = {"ok": ok, "checks": checks, "samples": samples,
+              "ttfa_ms_last": [round(x, 1) for x in ttfa[-10:]]}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
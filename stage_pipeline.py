@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Etapas encadeadas por filas limitadas (laço de conversa do whisper_speech.py)
+- Cada Stage é uma thread que consome a própria fila, chama `funcao(item)` e
+  entrega o retorno (se não for None) à etapa seguinte
+- Filas limitadas: uma etapa lenta segura as anteriores (o microfone não
+  para: o áudio continua no buffer circular do MicStream)
+- Itens de uma "geração" antiga (barge-in) são descartados sem processar
+- Etapas que não consomem fila (ex.: a escuta, na thread principal) usam
+  só as métricas, com `registrar()`
+- Métricas por etapa: espera na fila, tempo de processamento (p50/p95),
+  profundidade da fila (média/máx.), processados, descartados e erros
+"""
+
+import sys, time, queue, threading
+import numpy as np
+
+STAGE_QUEUE_MAX = 2
+
+class Stage:
+    """
+    `funcao(item)` → item para a próxima etapa ou None. Os itens são dicts;
+    `item["geracao"]` < `geracao()` ⇒ descartado.
+    """
+    def __init__(self, nome, funcao, proxima=None, maxsize=STAGE_QUEUE_MAX, geracao=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.proxima = proxima
+        self.geracao = geracao or (lambda: 0)
+        self.fila = queue.Queue(maxsize)
+        self.esperas_ms, self.latencias_ms, self.profundidades = [], [], []
+        self.processados = self.descartados = self.erros = 0
+        self.ocupada = False          # processando um item agora
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"etapa-{nome}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, item, timeout=None):
+        """Bloqueia enquanto a fila estiver cheia (contrapressão)."""
+        self.fila.put((time.perf_counter(), item), timeout=timeout)
+        with self._lock:
+            self.profundidades.append(self.fila.qsize())
+
+    def stop(self, wait=True):
+        self.fila.put((time.perf_counter(), None))
+        if wait:
+            self._thread.join()
+
+    def limpar(self):
+        """Esvazia a fila (barge-in); devolve quantos itens saíram."""
+        n = 0
+        while True:
+            try:
+                _, item = self.fila.get_nowait()
+            except queue.Empty:
+                return n
+            if item is None:          # o pedido de parada não se perde
+                self.fila.put((time.perf_counter(), None))
+                return n
+            n += 1
+            with self._lock:
+                self.descartados += 1
+
+    def registrar(self, ms, fila_ms=0.0, profundidade=None):
+        """Métricas de uma etapa sem thread própria."""
+        with self._lock:
+            self.latencias_ms.append(ms)
+            self.esperas_ms.append(fila_ms)
+            if profundidade is not None:
+                self.profundidades.append(profundidade)
+            self.processados += 1
+
+    def _run(self):
+        while True:
+            t_fila, item = self.fila.get()
+            if item is None:
+                break
+            t0 = time.perf_counter()
+            if item.get("geracao", 0) < self.geracao():
+                with self._lock:
+                    self.descartados += 1
+                continue
+            self.ocupada = True
+            try:
+                saida = self.funcao(item)
+            except Exception as e:
+                print(f"[ERRO] etapa '{self.nome}': {e}", file=sys.stderr)
+                with self._lock:
+                    self.erros += 1
+                continue
+            finally:
+                self.ocupada = False
+            t1 = time.perf_counter()
+            item.setdefault("etapas", {})[self.nome] = {"fila_ms": (t0 - t_fila) * 1000,
+                                                        "ms": (t1 - t0) * 1000}
+            with self._lock:
+                self.esperas_ms.append((t0 - t_fila) * 1000)
+                self.latencias_ms.append((t1 - t0) * 1000)
+                self.processados += 1
+            if saida is not None and self.proxima is not None:
+                self.proxima.put(saida)
+
+    def metricas(self):
+        def pct(v, q):
+            return round(float(np.percentile(v, q)), 1) if v else None
+        with self._lock:
+            return {"etapa": self.nome, "processados": self.processados,
+                    "descartados": self.descartados, "erros": self.erros,
+                    "fila_p50_ms": pct(self.esperas_ms, 50), "fila_p95_ms": pct(self.esperas_ms, 95),
+                    "p50_ms": pct(self.latencias_ms, 50), "p95_ms": pct(self.latencias_ms, 95),
+                    "profundidade_media": round(float(np.mean(self.profundidades)), 2)
+                                          if self.profundidades else 0.0,
+                    "profundidade_max": max(self.profundidades, default=0)}
+
+def resumo(etapas):
+    linhas = ["[LOG] Etapas da conversa (espera na fila | processamento | fila):"]
+    for st in etapas:
+        m = st.metricas()
+        linhas.append(f"  {m['etapa']:<12} n={m['processados']:<3} fila p50 {m['fila_p50_ms']} / "
+                      f"p95 {m['fila_p95_ms']} ms | p50 {m['p50_ms']} / p95 {m['p95_ms']} ms | "
+                      f"profundidade média {m['profundidade_media']} máx {m['profundidade_max']}"
+                      f" | descartados {m['descartados']} erros {m['erros']}")
+    return "\n".join(linhas)
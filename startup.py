@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inicialização em paralelo dos componentes (modelos, TTS, microfone)
+- Cada componente é uma função de carga com dependências opcionais; todos
+  começam juntos em threads (o PyTorch e a leitura de disco soltam o GIL)
+- wait(nome) bloqueia só até AQUELE componente ficar pronto, então o laço
+  principal começa a ouvir assim que o microfone e o detector estão prontos
+- Linha do tempo: início, duração, RSS ao terminar e pico de RSS do processo
+  durante a carga de cada componente (amostrado em segundo plano)
+"""
+
+import os, sys, json, time, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+STARTUP_SAMPLE_S = 0.05
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource   # sem /proc: usa o pico
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class StartupOrchestrator:
+    """
+    `add(nome, carregar, deps)` registra; `start()` dispara tudo;
+    `wait(nome)` devolve o resultado de `carregar()` (ou relança o erro dele).
+    """
+    def __init__(self, sample_s=STARTUP_SAMPLE_S):
+        self.sample_s = sample_s
+        self._componentes = {}        # nome -> (carregar, deps)
+        self._futures = {}
+        self._eventos = {}            # nome -> {"inicio_s", "fim_s", "rss_mb", "pico_rss_mb", "erro"}
+        self._pico_kb = 0
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self._fim = threading.Event()
+        self._pool = None
+        self.t0 = None
+
+    def add(self, nome, carregar, deps=()):
+        assert self.t0 is None, "registre os componentes antes de start()"
+        self._componentes[nome] = (carregar, tuple(deps))
+        return self
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self._pico_kb = rss_kb()
+        threading.Thread(target=self._amostrar, name="startup-rss", daemon=True).start()
+        # uma thread por componente: quem espera dependência não tira a vez de ninguém
+        self._pool = ThreadPoolExecutor(max(1, len(self._componentes)), thread_name_prefix="startup")
+        self._futures = {nome: Future() for nome in self._componentes}
+        self._pendentes = len(self._componentes)
+        for nome in self._componentes:
+            self._pool.submit(self._carregar, nome)
+        self._pool.shutdown(wait=False)
+        return self
+
+    def _amostrar(self):
+        while not self._fim.is_set():
+            kb = rss_kb()
+            with self._lock:
+                self._pico_kb = max(self._pico_kb, kb)
+                for ev in self._eventos.values():
+                    if ev["fim_s"] is None:
+                        ev["_pico_kb"] = max(ev["_pico_kb"], kb)
+            self._fim.wait(self.sample_s)
+
+    def _carregar(self, nome):
+        carregar, deps = self._componentes[nome]
+        future = self._futures[nome]
+        try:
+            for d in deps:
+                self._futures[d].result()
+        except Exception as e:
+            self._terminou()
+            future.set_exception(RuntimeError(f"{nome}: dependência '{d}' falhou ({e})"))
+            return
+        kb = rss_kb()
+        with self._lock:
+            self._eventos[nome] = {"inicio_s": time.perf_counter() - self.t0, "fim_s": None,
+                                   "_pico_kb": kb, "erro": None}
+        try:
+            resultado, erro = carregar(), None
+        except Exception as e:
+            resultado, erro = None, e
+        kb = rss_kb()
+        with self._lock:
+            ev = self._eventos[nome]
+            ev["fim_s"] = time.perf_counter() - self.t0
+            ev["rss_mb"] = round(kb / 1024, 1)
+            ev["pico_rss_mb"] = round(max(ev.pop("_pico_kb"), kb) / 1024, 1)
+            ev["erro"] = None if erro is None else str(erro)
+        estado = "pronto" if erro is None else f"FALHOU ({erro})"
+        print(f"[SETUP] {nome}: {estado} em {ev['fim_s'] - ev['inicio_s']:.1f}s "
+              f"(t={ev['fim_s']:.1f}s, RSS {ev['rss_mb']:.0f} MB)")
+        self._terminou()
+        if erro is None:
+            future.set_result(resultado)
+        else:
+            future.set_exception(erro)
+
+    def _terminou(self):
+        # antes de liberar quem espera: wait_all() só volta com o resumo impresso
+        with self._lock:
+            self._pendentes -= 1
+            ultimo = self._pendentes == 0
+        if ultimo:
+            self._fim.set()
+            print(self.resumo())
+
+    def wait(self, nome, timeout=None):
+        return self._futures[nome].result(timeout)
+
+    def wait_all(self, timeout=None):
+        for nome in self._futures:
+            self.wait(nome, timeout)
+
+    def ready(self, nome):
+        f = self._futures.get(nome)
+        return f is not None and f.done() and f.exception() is None
+
+    def timeline(self):
+        with self._lock:
+            linhas = [{"componente": nome,
+                       **{k: (round(v, 3) if isinstance(v, float) else v)
+                          for k, v in ev.items() if not k.startswith("_")}}
+                      for nome, ev in self._eventos.items()]
+        return sorted(linhas, key=lambda l: l["inicio_s"])
+
+    def resumo(self):
+        linhas = self.timeline()
+        total = max((l["fim_s"] or 0 for l in linhas), default=0.0)
+        partes = ["[SETUP] Linha do tempo da inicialização:"]
+        for l in linhas:
+            dur = (l["fim_s"] or 0) - l["inicio_s"]
+            partes.append(f"  {l['componente']:<18} {l['inicio_s']:6.2f}s -> {l['fim_s'] or 0:6.2f}s"
+                          f"  ({dur:5.2f}s)  RSS {l.get('rss_mb', 0):7.0f} MB"
+                          f"  pico {l.get('pico_rss_mb', 0):7.0f} MB" + ("  ERRO" if l["erro"] else ""))
+        partes.append(f"  total {total:.2f}s | pico de RSS do processo {self._pico_kb / 1024:.0f} MB")
+        return "\n".join(partes)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "pid": os.getpid(),
+                       "pico_rss_mb": round(self._pico_kb / 1024, 1),
+                       "componentes": self.timeline()}, f, indent=2, ensure_ascii=False)
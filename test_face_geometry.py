@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Traços tesselados (face_geometry.py) contra os carimbos de círculo antigos:
+cada expressão desenhada pelos dois jeitos só pode diferir na borda do traço.
+Quadros de transição (MorphCache): só o retângulo do rosto, memória limitada.
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+import unipface
+
+SIZE = (1600, 1200)
+EDGE_PX = 2             # distância da borda do traço de referência tolerada
+DIFF_MIN = 48           # diferença (0-255) abaixo disso é só anti-aliasing
+MAX_EDGE_FRAC = 0.10    # pixels diferentes / pixels do traço de referência
+
+# ----- implementação de referência (antes do face_geometry) -----
+def ref_stroke_quad_bezier(surf, p0, p1, p2, width, color, steps=180):
+    rad = max(1, int(round(width / 2)))
+    for i in range(steps + 1):
+        t = i / steps
+        x = (1 - t)**2 * p0[0] + 2*(1 - t)*t*p1[0] + t**2*p2[0]
+        y = (1 - t)**2 * p0[1] + 2*(1 - t)*t*p1[1] + t**2*p2[1]
+        unipface.aa_filled_circle(surf, x, y, rad, color)
+
+def ref_stroke_line_caps(surf, x1, y1, x2, y2, w, color):
+    steps = max(6, int(max(abs(x2 - x1), abs(y2 - y1)) / 2))
+    rad = max(1, int(round(w / 2)))
+    for i in range(steps + 1):
+        t = i / steps
+        x = x1 + (x2 - x1) * t
+        y = y1 + (y2 - y1) * t
+        unipface.aa_filled_circle(surf, x, y, rad, color)
+
+def desenhar(name):
+    surf = pygame.Surface(SIZE)
+    unipface.draw_expression(surf, name)
+    return pygame.surfarray.array3d(surf).astype(np.int16)
+
+def borda(mask, r=EDGE_PX):
+    """Pixels a até `r` de uma fronteira de `mask` (dilatação xor erosão)."""
+    pad = np.pad(mask, r, mode="edge")
+    h, w = mask.shape
+    janelas = [pad[dy:dy + h, dx:dx + w] for dy in range(2 * r + 1) for dx in range(2 * r + 1)]
+    return np.logical_or.reduce(janelas) & ~np.logical_and.reduce(janelas)
+
+@pytest.fixture(scope="module", autouse=True)
+def pygame_init():
+    pygame.init()
+    yield
+    pygame.quit()
+
+@pytest.mark.parametrize("name", sorted(unipface.EXPRESSION_KEYFRAMES))
+def test_traco_difere_so_na_borda(name, monkeypatch):
+    novo = desenhar(name)
+    monkeypatch.setattr(unipface, "stroke_quad_bezier", ref_stroke_quad_bezier)
+    monkeypatch.setattr(unipface, "stroke_line_caps", ref_stroke_line_caps)
+    ref = desenhar(name)
+
+    fundo = np.array(unipface.BG, dtype=np.int16)
+    traco = np.abs(ref - fundo).max(axis=2) >= 128
+    diff = np.abs(novo - ref).max(axis=2) >= DIFF_MIN
+
+    fora_da_borda = diff & ~borda(traco)
+    assert not fora_da_borda.any(), f"{fora_da_borda.sum()} pixels diferentes longe da borda"
+    assert diff.sum() <= MAX_EDGE_FRAC * max(traco.sum(), 1)
+
+@pytest.mark.parametrize("name", sorted(unipface.EXPRESSION_KEYFRAMES))
+def test_expressao_cabe_no_retangulo_do_rosto(name):
+    rect = unipface.face_rect(SIZE)
+    img = np.abs(desenhar(name) - np.array(unipface.BG, dtype=np.int16)).max(axis=2) > 0
+    img[rect.left:rect.right, rect.top:rect.bottom] = False
+    assert not img.any(), f"{img.sum()} pixels do rosto fora de {rect}"
+
+def test_morph_cache_limitado_em_bytes():
+    assert unipface.MorphCache(max_mb=1).frame("happy_open", "wink", 0, SIZE) is None
+    morphs = unipface.MorphCache(max_mb=64)
+    morphs.prepare(SIZE)
+    quadro = morphs.frame("happy_open", "wink", 0, SIZE)
+    assert quadro.get_size() == morphs.rect.size
+    for src in unipface.EXPRESSION_KEYFRAMES:
+        for i in range(morphs.frames):
+            morphs.frame(src, "angry", i, SIZE)
+    assert 0 < morphs._bytes <= morphs.max_bytes
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Regressões do motor de intenções (intent_engine.py) com a tabela real.
+Fala comum não pode virar comando; erros reais do ASR ainda casam.
+"""
+
+import os
+import pytest
+from intent_engine import IntentEngine
+
+INTENTS = IntentEngine.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json"))
+
+@pytest.mark.parametrize("texto", [
+    "a casa está cheia",       # cheia -> chega (stop)
+    "chego amanhã",            # chego -> chega
+    "foi uma conteste difícil",
+    "calma, por favor",        # calma -> chama
+    "quanto custa isso",       # quanto -> quarto
+    "vá para o quanto antes",
+    "ele andou bem",           # andou -> mandou
+    "o presente chegou",       # presente -> apresente
+    "a casa está cega",
+])
+def test_fala_comum_nao_vira_comando(texto):
+    assert INTENTS.parse(texto) == (None, {})
+
+@pytest.mark.parametrize("texto, intent, slots", [
+    ("vá para a cozinha", "navigate", {"room": "cozinha"}),
+    ("vá para a cozinh", "navigate", {"room": "cozinha"}),      # letra faltando
+    ("me acompanar", "follow_person", {}),
+    ("estou decepcionad", "make_sad", {}),
+    ("conte umas piadas", "joke", {}),                          # variante explícita
+    ("estop", "stop", {}),
+    ("pare agora", "stop", {}),
+])
+def test_comandos_e_erros_do_asr(texto, intent, slots):
+    assert INTENTS.parse(texto) == (intent, slots)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Worker de síntese do TTSEngine (unipface.py), sem rede e sem tela:
+- o quadro não engasga enquanto uma frase longa é sintetizada
+- say_now() passa na frente até de um pre-warm em andamento
+- sem mixer (pygame.mixer.init falhou) a fala não fica presa em speaking()
+"""
+
+import os, time, asyncio
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+import unipface
+
+FRAMES = 60
+
+def sintetizador_lento(segundos, lentas=("frase longa",)):
+    """Fonte no lugar do Edge-TTS: demora `segundos` (parte bloqueando o worker) e não entrega áudio."""
+    async def source(text):
+        if text in lentas:
+            for _ in range(10):
+                time.sleep(segundos / 20)          # trecho síncrono, como um decodificador
+                await asyncio.sleep(segundos / 20)
+        return
+        yield b""
+    return source
+
+@pytest.fixture(autouse=True)
+def sem_cache_em_disco(monkeypatch):
+    """O TTSEngine não cria o cache padrão (~/.cache/unipface_tts); quem precisa usa tmp_path."""
+    monkeypatch.setattr(unipface, "ENABLE_TTS_CACHE", False)
+
+@pytest.fixture
+def tela():
+    pygame.mixer.pre_init(frequency=unipface.AUDIO_FREQ)
+    pygame.init()
+    screen = pygame.display.set_mode((400, 300))
+    yield screen
+    pygame.quit()
+
+def medir_quadros(screen, tts, sprites, n=FRAMES):
+    """Intervalo entre quadros (ms) de um render() igual ao do loop principal."""
+    clock = pygame.time.Clock()
+    size = screen.get_size()
+    def render():
+        screen.blit(sprites.get("happy_open", size), (0, 0))
+        pygame.display.flip()
+        tts.iterate()
+    intervalos = []
+    t_ant = time.perf_counter()
+    for _ in range(n):
+        render()
+        clock.tick(unipface.FPS_TARGET)
+        agora = time.perf_counter()
+        intervalos.append((agora - t_ant) * 1000)
+        t_ant = agora
+    return np.asarray(intervalos[1:])
+
+def test_quadros_estaveis_durante_sintese_lenta(tela):
+    tts = unipface.TTSEngine(stream_source=sintetizador_lento(2.0))
+    sprites = unipface.FaceSpriteCache()
+    base = medir_quadros(tela, tts, sprites)
+
+    tts.say("frase longa")
+    durante = medir_quadros(tela, tts, sprites)
+    assert tts.busy(), "a síntese deveria continuar durante toda a medição"
+
+    periodo = 1000 / unipface.FPS_TARGET
+    assert np.percentile(durante, 95) <= max(np.percentile(base, 95), periodo) * 1.5
+    assert durante.max() < periodo * 3
+
+def test_say_now_preempta_prewarm(tela, tmp_path):
+    chamadas = []
+    lenta = sintetizador_lento(2.0, lentas=("pre-warm lento",))
+    async def source(text):
+        chamadas.append(text)
+        async for chunk in lenta(text):
+            yield chunk
+    tts = unipface.TTSEngine(stream_source=source)
+    tts.cache = unipface.TTSPhraseCache(cache_dir=str(tmp_path))   # o pre-warm precisa de cache
+    tts.prewarm(["pre-warm lento"])
+    time.sleep(0.2)                                 # pre-warm já em andamento no worker
+
+    t0 = time.perf_counter()
+    tts.say_now("já")
+    seq, gen, kind, snd, env, final = tts._ready.get(timeout=1.0)
+    assert time.perf_counter() - t0 < 0.5
+    assert gen == tts._generation and final
+
+    deadline = time.time() + 5
+    while chamadas.count("pre-warm lento") < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    assert chamadas.count("pre-warm lento") == 2    # o pre-warm voltou para a fila
+
+def test_sem_mixer_nao_fica_falando(tela, monkeypatch):
+    def sem_audio(*args, **kwargs):
+        raise pygame.error("sem dispositivo de áudio")
+    monkeypatch.setattr(pygame.mixer, "get_init", lambda: None)
+    monkeypatch.setattr(pygame.mixer, "init", sem_audio)
+    monkeypatch.setattr(unipface.TTSEngine, "_probe_pytts", lambda self: False)
+    tts = unipface.TTSEngine(stream_source=sintetizador_lento(0.0))
+    assert tts._channel is None and not tts.edge_ok   # nem sobe o worker do Edge
+    tts.say("oi")
+    tts.iterate()
+    assert not tts.busy()
+
+    # bloco que chega sem canal (ex.: mixer caiu) encerra a fala em vez de prendê-la
+    tts._pending.add(1)
+    tts._ready.put((1, tts._generation, "edge", None, None, False))
+    tts.iterate()
+    assert tts._utt_seq is None and not tts.speaking() and not tts.busy()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rastreamento de latência por frase (unipface.py e whisper_speech.py)
+- Cada frase ganha um ID; cada etapa marca um instante (perf_counter):
+  capture_start, capture_end, asr_done, nlu_done, tts_done, audio_out
+- mark() só põe uma tupla num deque (barato, sem I/O nem JSON no thread
+  quente); uma thread escreve o JSONL em lote a cada TRACE_FLUSH_S
+- Relatório: p50/p95/p99 por etapa a partir de um ou mais JSONL
+
+Uso:
+    python tracing.py latencia_unipface.jsonl latencia_whisper_speech.jsonl --out latencia.json
+"""
+
+import os, sys, json, time, atexit, argparse, itertools, threading
+from collections import deque, defaultdict
+import numpy as np
+
+TRACE_FLUSH_S    = 1.0
+TRACE_BUFFER_MAX = 10000     # eventos em memória se a escrita atrasar (os mais antigos saem)
+
+# etapa do relatório: (nome, evento inicial, evento final)
+ETAPAS = [
+    ("captura",     "capture_start", "capture_end"),   # fala da pessoa + fim de frase do VAD
+    ("asr",         "capture_end",   "asr_done"),
+    ("nlu",         "asr_done",      "nlu_done"),      # intenção ou QA
+    ("tts",         "nlu_done",      "tts_done"),      # síntese (1º bloco pronto)
+    ("saida_audio", "tts_done",      "audio_out"),     # até o 1º som sair
+    ("resposta",    "capture_end",   "audio_out"),     # o que a pessoa percebe
+]
+
+class Tracer:
+    """`start()` → ID; `mark(id, evento, t=None, **attrs)`; sem `path`, não faz nada."""
+    def __init__(self, path, fonte="", flush_s=TRACE_FLUSH_S):
+        self.path = path
+        self.flush_s = flush_s
+        self._buf = deque(maxlen=TRACE_BUFFER_MAX)
+        self._ids = itertools.count(1)
+        self._prefixo = f"{fonte or 'trace'}-{os.getpid()}-{int(time.time())}"
+        self._perf0, self._wall0 = time.perf_counter(), time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        return f"{self._prefixo}-{next(self._ids)}" if self.path else None
+
+    def mark(self, uid, evento, t=None, **attrs):
+        if uid is None or not self.path:
+            return
+        self._buf.append((uid, evento, time.perf_counter() if t is None else t, attrs))
+        if self._thread is None:
+            self._iniciar()
+
+    def _iniciar(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tracer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_s):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            linhas = []
+            while self._buf:
+                uid, evento, t, attrs = self._buf.popleft()
+                linhas.append(json.dumps({"id": uid, "evento": evento, "t": round(t, 6),
+                                          "wall": round(self._wall0 + t - self._perf0, 6), **attrs},
+                                         ensure_ascii=False))
+            if not linhas:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(linhas) + "\n")
+            except OSError as e:
+                print(f"[TRACE] falha ao gravar {self.path}: {e}", file=sys.stderr)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+# ===================== RELATÓRIO =====================
+def carregar_frases(paths):
+    """{id: {evento: t}} (primeira ocorrência de cada evento)."""
+    frases = defaultdict(dict)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for linha in f:
+                if not linha.strip():
+                    continue
+                ev = json.loads(linha)
+                frases[ev["id"]].setdefault(ev["evento"], ev["t"])
+    return frases
+
+def relatorio(frases):
+    por_fonte = defaultdict(list)
+    for uid, eventos in frases.items():
+        por_fonte[uid.split("-", 1)[0]].append(eventos)
+    saida = {}
+    for fonte, lista in sorted(por_fonte.items()):
+        etapas = {}
+        for nome, ini, fim in ETAPAS:
+            ms = [(e[fim] - e[ini]) * 1000 for e in lista if ini in e and fim in e]
+            etapas[nome] = {"n": len(ms),
+                            **{f"p{q}_ms": round(float(np.percentile(ms, q)), 1) if ms else None
+                               for q in (50, 95, 99)}}
+        saida[fonte] = {"frases": len(lista), "etapas": etapas}
+    return saida
+
+def main():
+    ap = argparse.ArgumentParser(description="Relatório de latência por etapa (JSONL do tracing)")
+    ap.add_argument("arquivos", nargs="+")
+    ap.add_argument("--out", default="", help="arquivo JSON (padrão: stdout)")
+    args = ap.parse_args()
+    rel = relatorio(carregar_frases(args.arquivos))
+    for fonte, r in rel.items():
+        print(f"[TRACE] {fonte}: {r['frases']} frases", file=sys.stderr)
+        for nome, e in r["etapas"].items():
+            print(f"  {nome:<12} n={e['n']:<4} p50 {e['p50_ms']} | p95 {e['p95_ms']} | p99 {e['p99_ms']} ms",
+                  file=sys.stderr)
+    text = json.dumps(rel, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,21 @@
 UNIP Face — rosto reativo com wake word, TTS e ASR
 - Wake word: "UNIP" (interrupção global)
 - Preferência: Edge-TTS (online), fallback: pyttsx3 (offline)
-- ASR: SpeechRecognition (Google Web Speech) com auto-escolha de microfone externo
+- ASR: Vosk offline (incremental, pt-BR) ou Google Web Speech; auto-escolha de microfone externo
 - Janela em segunda tela (sem borda), render Pygame, expressões vetoriais suaves
 """
 
-import os, sys, math, random, time, threading, queue, re, tempfile, asyncio
+import os, sys, math, random, time, threading, queue, re, asyncio, io, json, hashlib
+from collections import OrderedDict, deque
+from fractions import Fraction
+import numpy as np
 import pygame
 from pygame import gfxdraw
+from face_geometry import CURVE_SEGMENTS, quad_bezier_points, line_points, stroke_points
+from keyword_spotter import KeywordSpotter
+from intent_engine import IntentEngine
+import vad
+from tracing import Tracer
 
 # ===================== CORES =====================
 BG   = (30, 39, 52)
@@ -21,6 +29,12 @@ RED  = (248, 82, 82)
 EXPRESSIONS = ["happy_open", "smile_eyes", "wink"]  # ciclo automático quando IDLE
 INTERVAL_SECONDS = 1.2
 FPS_TARGET = 45
+RENDER_ON_CHANGE = True          # só redesenha quando a expressão muda
+IDLE_FPS = 5                     # modo econômico após um tempo sem interação
+IDLE_AFTER_SECONDS = 10
+MORPH_MS = 180                   # duração da transição entre expressões (0 = instantânea)
+MORPH_FRAMES = 6                 # quadros intermediários pré-renderizados por transição
+MORPH_CACHE_MB = 128             # teto de memória dos quadros de transição (LRU)
 OVERSAMPLE = 1.25
 FACE_SCALE = 1.30
 
@@ -45,6 +59,30 @@ PYTTSX3_RATE   = 170
 PYTTSX3_VOLUME = 1.0
 VOICE_ID_OVERRIDE = ""  # opcional: ID SAPI5 para forçar
 
+AUDIO_FREQ = 24000   # mesma taxa do MP3 do Edge-TTS: mixer não reamostra os blocos
+
+# Cache de frases (memória LRU + disco), chave: (texto, voz, rate, pitch, motor)
+ENABLE_TTS_CACHE    = True
+TTS_CACHE_DIR       = os.path.join(os.path.expanduser("~"), ".cache", "unipface_tts")
+TTS_CACHE_MEM_ITEMS = 32
+TTS_CACHE_MEM_MB    = 8
+TTS_CACHE_DISK_MB   = 64
+TTS_PREWARM         = True    # sintetiza as frases fixas em segundo plano ao iniciar
+
+# Streaming: toca em blocos de quadros MP3 completos conforme chegam
+TTS_STREAM_MIN_BYTES      = 3000   # ~0,5 s a 48 kbps antes de decodificar um bloco
+TTS_STREAM_OVERLAP_FRAMES = 4      # quadros anteriores repassados ao decodificador (bit reservoir)
+
+# Prioridades da fila de síntese (menor = primeiro)
+TTS_PRIO_NOW     = 0          # say_now(): confirmação da wake word, "ai"
+TTS_PRIO_NORMAL  = 1
+TTS_PRIO_PREWARM = 2
+
+# Lip sync (só Edge-TTS: precisa do áudio decodificado)
+ENABLE_LIPSYNC  = True
+LIPSYNC_LEVELS  = 4      # sprites de boca: 0=quase fechada … N-1="talking" aberta
+LIPSYNC_HOP_MS  = 20     # resolução do envelope de amplitude
+
 # Frases padrão
 INTRO_DELAY_MS = 2000
 INTRO_PHRASE   = "Olá! Eu sou o seu assistente. Diga 'UNIP' para falar comigo."
@@ -54,24 +92,52 @@ DIDNT_GET_IT   = "Desculpe, não entendi. Pode repetir?"
 
 # ===================== ASR CONFIG =====================
 ENABLE_ASR          = True
-ASR_ENERGY          = 300     # sensibilidade
-ASR_PAUSE           = 0.6
+ASR_ENERGY          = 300     # sensibilidade inicial; depois segue o ruído do microfone
+ASR_END_MS          = 350     # silêncio que fecha a frase (VAD; antes pause_threshold=0.6 s)
 ASR_TIMEOUT         = 5
-ASR_PHRASE_TIMEOUT  = 5
+ASR_PHRASE_TIMEOUT  = 12      # só limite de segurança: o VAD fecha a frase
+ASR_LANGUAGE        = "pt-BR"
+
+# Backend: "vosk" (offline, incremental), "google" (online) ou "auto"
+ASR_BACKEND         = "auto"
+ASR_VOSK_MODEL      = os.path.abspath("modelo_vosk_ptbr")   # ex.: vosk-model-small-pt-0.3
+ASR_SAMPLE_RATE     = 16000
+ASR_CHUNK           = 4000      # amostras por bloco entregue ao Vosk (250 ms)
 
 # Wake word
 WAKE_WORDS          = ["unip"]
 COMMAND_WINDOW_MS   = 7000
 
+# Detector leve da wake word (NumPy): com exemplos em palavras_chave/unip/*.wav
+# o microfone só vai para o reconhecedor depois que o "unip" é detectado
+ENABLE_KWS          = True
+ASR_KWS_DIR         = os.path.abspath("palavras_chave")
+ASR_KWS_CHUNK       = 1600      # 100 ms por bloco no detector
+
+# Supressão de ruído em fluxo (noise_suppression.py), por reconhecedor;
+# o perfil de ruído é aprendido nos silêncios do próprio microfone
+ASR_DENOISE_KWS     = False
+ASR_DENOISE_ASR     = False
+
 MIC_PREFERRED_HINTS = ["usb", "external", "headset", "mic", "microfone", "logitech", "hyperx", "fifine"]
 
+# ===================== TRACING =====================
+# Latência por frase (captura → ASR → intenção → TTS → 1º áudio) em JSONL;
+# desligado por padrão; liga com UNIPFACE_TRACE=latencia_unipface.jsonl.
+# Relatório: python tracing.py latencia_unipface.jsonl
+TRACE_FILE = os.path.abspath(os.environ["UNIPFACE_TRACE"]) if os.environ.get("UNIPFACE_TRACE") else ""
+tracer = Tracer(TRACE_FILE, fonte="unipface")
+
 # ===================== VIEWBOX =====================
 VW, VH = 800.0, 600.0
 VCX, VCY = VW / 2, VH / 2
 
 # ===================== UTIL DESENHO =====================
 def to_screen(surface, x, y):
-    W, H = surface.get_size()
+    return to_screen_size(surface.get_size(), x, y)
+
+def to_screen_size(size, x, y):
+    W, H = size
     s_base = min(W / VW, H / VH)
     s = s_base * FACE_SCALE
     cx, cy = W / 2, H / 2
@@ -83,101 +149,274 @@ def aa_filled_circle(surf, x, y, r, color):
     gfxdraw.filled_circle(surf, int(round(x)), int(round(y)), int(round(r)), color)
     gfxdraw.aacircle(surf, int(round(x)), int(round(y)), int(round(r)), color)
 
-def stroke_quad_bezier(surf, p0, p1, p2, width, color, steps=180):
-    rad = max(1, int(round(width / 2)))
-    for i in range(steps + 1):
-        t = i / steps
-        x = (1 - t)**2 * p0[0] + 2*(1 - t)*t*p1[0] + t**2*p2[0]
-        y = (1 - t)**2 * p0[1] + 2*(1 - t)*t*p1[1] + t**2*p2[1]
-        aa_filled_circle(surf, x, y, rad, color)
+def stroke_quad_bezier(surf, p0, p1, p2, width, color, steps=CURVE_SEGMENTS):
+    stroke_points(surf, quad_bezier_points(p0, p1, p2, steps), width, color)
 
 def stroke_line_caps(surf, x1, y1, x2, y2, w, color):
-    steps = max(6, int(max(abs(x2 - x1), abs(y2 - y1)) / 2))
-    rad = max(1, int(round(w / 2)))
-    for i in range(steps + 1):
-        t = i / steps
-        x = x1 + (x2 - x1) * t
-        y = y1 + (y2 - y1) * t
-        aa_filled_circle(surf, x, y, rad, color)
+    stroke_points(surf, line_points(x1, y1, x2, y2), w, color)
 
 # ===================== PARTES DO ROSTO =====================
-def eyes_default(surface, s):
-    for cx in (240, 560):
-        x, y, _ = to_screen(surface, cx, 250)
-        aa_filled_circle(surface, x, y, 60 * s, CYAN)
-
-def eyes_color(surface, s, color):
-    for cx in (240, 560):
-        x, y, _ = to_screen(surface, cx, 250)
-        aa_filled_circle(surface, x, y, 60 * s, color)
-
-def eyes_smile_arcs(surface, s):
-    p0 = to_screen(surface, 180, 250)
-    p1 = to_screen(surface, 240, 210)
-    p2 = to_screen(surface, 300, 250)
-    stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), 20 * s, CYAN)
-    p0 = to_screen(surface, 500, 250)
-    p1 = to_screen(surface, 560, 210)
-    p2 = to_screen(surface, 620, 250)
-    stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), 20 * s, CYAN)
-
-def eye_wink_right(surface, s):
-    x, y, _ = to_screen(surface, 240, 250)
-    aa_filled_circle(surface, x, y, 60 * s, CYAN)
-    p0 = to_screen(surface, 520, 250)
-    p1 = to_screen(surface, 560, 235)
-    p2 = to_screen(surface, 600, 250)
-    stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), 20 * s, CYAN)
-
-def mouth_smile(surface, s):
-    p0 = to_screen(surface, 310, 400)
-    p1 = to_screen(surface, 400, 470)
-    p2 = to_screen(surface, 490, 400)
-    stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), 30 * s, CYAN)
-
-def mouth_sad(surface, s):
-    p0 = to_screen(surface, 310, 400)
-    p1 = to_screen(surface, 400, 330)
-    p2 = to_screen(surface, 490, 400)
-    stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), 30 * s, CYAN)
-
-def mouth_flat_red(surface, s):
-    x1, y1, _ = to_screen(surface, 325, 400)
-    x2, y2, _ = to_screen(surface, 475, 400)
-    stroke_line_caps(surface, x1, y1, x2, y2, 30 * s, RED)
-
-def mouth_talking_flat_top_round_bottom(surface, s):
-    (x1, y1, _ ) = to_screen(surface, 330, 390)
-    (x2, y2, _ ) = to_screen(surface, 470, 470)
-    w = int(round(x2 - x1)); h = int(round(y2 - y1))
-    rect = pygame.Rect(int(round(x1)), int(round(y1)), w, h)
-    r = int(round(28 * to_screen(surface, 1, 1)[2]))
-    pygame.draw.rect(surface, CYAN, rect, border_radius=0,
-                     border_top_left_radius=0, border_top_right_radius=0,
-                     border_bottom_left_radius=r, border_bottom_right_radius=r)
+# Cada expressão é descrita como geometria parametrizada (coordenadas do viewbox):
+# o mesmo conjunto de partes em todas, partes ausentes com tamanho 0.
+# Assim qualquer par (de, para) pode ser interpolado número a número.
+def _disc(cx, cy, r, color=CYAN):
+    return ("disc", (cx, cy, r), color)
+
+def _curve(p0, p1, p2, w, color=CYAN):
+    return ("curve", (*p0, *p1, *p2, w), color)
+
+def _line(x1, y1, x2, y2, w, color=CYAN):
+    return ("line", (x1, y1, x2, y2, w), color)
+
+def _box(x1, y1, x2, y2, r, color=CYAN):
+    # boca "falando": topo reto, base arredondada
+    return ("box", (x1, y1, x2, y2, r), color)
+
+FACE_PARTS_HIDDEN = {
+    "eye_l":      _disc(240, 250, 0),
+    "eye_r":      _disc(560, 250, 0),
+    "arc_l":      _curve((180, 250), (240, 210), (300, 250), 0),
+    "arc_r":      _curve((500, 250), (560, 210), (620, 250), 0),
+    "brow_l":     _line(200, 160, 280, 180, 0),
+    "brow_r":     _line(520, 180, 600, 160, 0),
+    "mouth":      _curve((310, 400), (400, 400), (490, 400), 0),
+    "mouth_line": _line(325, 400, 475, 400, 0),
+    "mouth_box":  _box(330, 390, 470, 390, 28),
+}
+
+EXPRESSION_KEYFRAMES = {
+    "happy_open": {
+        "eye_l": _disc(240, 250, 60), "eye_r": _disc(560, 250, 60),
+        "mouth": _curve((310, 400), (400, 470), (490, 400), 30),
+    },
+    "sad": {
+        "eye_l": _disc(240, 250, 60), "eye_r": _disc(560, 250, 60),
+        "mouth": _curve((310, 400), (400, 330), (490, 400), 30),
+    },
+    "angry": {
+        "eye_l": _disc(240, 250, 60, RED), "eye_r": _disc(560, 250, 60, RED),
+        "brow_l": _line(200, 160, 280, 180, 12, RED),
+        "brow_r": _line(520, 180, 600, 160, 12, RED),
+        "mouth_line": _line(325, 400, 475, 400, 30, RED),
+    },
+    "smile_eyes": {
+        "arc_l": _curve((180, 250), (240, 210), (300, 250), 20),
+        "arc_r": _curve((500, 250), (560, 210), (620, 250), 20),
+        "mouth": _curve((310, 400), (400, 470), (490, 400), 30),
+    },
+    "wink": {
+        "eye_l": _disc(240, 250, 60),
+        "arc_r": _curve((520, 250), (560, 235), (600, 250), 20),
+        "mouth": _curve((330, 400), (400, 450), (470, 400), 30),
+    },
+    "talking": {
+        "eye_l": _disc(240, 250, 60), "eye_r": _disc(560, 250, 60),
+        "mouth_box": _box(330, 390, 470, 470, 28),
+    },
+}
+
+# Bocas do lip sync: "talking_0" (quase fechada) … "talking_{N-1}" (= "talking")
+for _lvl in range(LIPSYNC_LEVELS):
+    _open = (_lvl + 1) / LIPSYNC_LEVELS
+    EXPRESSION_KEYFRAMES[f"talking_{_lvl}"] = {
+        "eye_l": _disc(240, 250, 60), "eye_r": _disc(560, 250, 60),
+        "mouth_box": _box(330, 390, 470, 390 + 80 * _open, 28),
+    }
+
+def _face_bounds():
+    """Caixa (espaço virtual) que contém todas as partes de todas as expressões."""
+    xs, ys = [], []
+    for kf in [FACE_PARTS_HIDDEN, *EXPRESSION_KEYFRAMES.values()]:
+        for kind, v, _ in kf.values():
+            if kind == "disc":
+                cx, cy, r = v
+                xs += [cx - r, cx + r]; ys += [cy - r, cy + r]
+            else:
+                pad = 0 if kind == "box" else v[-1] / 2   # último valor: largura do traço
+                xs += [x + d for x in v[0:-1:2] for d in (-pad, pad)]
+                ys += [y + d for y in v[1:-1:2] for d in (-pad, pad)]
+    return min(xs), min(ys), max(xs), max(ys)
 
-def draw_expression(surface, name):
+# interpolar keyframes nunca sai desta caixa (tudo é linear nos parâmetros)
+FACE_BOUNDS = _face_bounds()
+
+def face_rect(size, pad=3):
+    """
+    Retângulo do rosto na tela de `size` (com folga para o anti-aliasing).
+    As bordas caem em múltiplos de `q` pixels, onde q * OVERSAMPLE é inteiro:
+    o recorte reduzido fica idêntico à mesma região do sprite de tela cheia.
+    """
+    q = Fraction(OVERSAMPLE).limit_denominator(16).denominator
+    x0, y0, _ = to_screen_size(size, FACE_BOUNDS[0], FACE_BOUNDS[1])
+    x1, y1, _ = to_screen_size(size, FACE_BOUNDS[2], FACE_BOUNDS[3])
+    left, top = (int(x0) - pad) // q * q, (int(y0) - pad) // q * q
+    right, bottom = -(-(int(x1) + pad + 1) // q) * q, -(-(int(y1) + pad + 1) // q) * q
+    return pygame.Rect(left, top, right - left, bottom - top).clip(pygame.Rect((0, 0), size))
+
+def is_talking(name):
+    return bool(name) and name.startswith("talking")
+
+def expression_keyframe(name):
+    kf = dict(FACE_PARTS_HIDDEN)
+    kf.update(EXPRESSION_KEYFRAMES.get(name, {}))
+    return kf
+
+def lerp_keyframe(a, b, t):
+    """Interpola dois keyframes (geometria e cores) em t ∈ [0, 1]."""
+    out = {}
+    for part, (kind, va, ca) in a.items():
+        _, vb, cb = b[part]
+        out[part] = (kind,
+                     tuple(x + (y - x) * t for x, y in zip(va, vb)),
+                     tuple(int(round(x + (y - x) * t)) for x, y in zip(ca, cb)))
+    return out
+
+def draw_keyframe(surface, kf):
     surface.fill(BG)
     _, _, s = to_screen(surface, 0, 0)
-    if name == "happy_open":
-        eyes_default(surface, s); mouth_smile(surface, s)
-    elif name == "sad":
-        eyes_default(surface, s); mouth_sad(surface, s)
-    elif name == "angry":
-        eyes_color(surface, s, RED)
-        x1,y1,_ = to_screen(surface,200,160); x2,y2,_ = to_screen(surface,280,180)
-        stroke_line_caps(surface,x1,y1,x2,y2,12*s,RED)
-        x1,y1,_ = to_screen(surface,520,180); x2,y2,_ = to_screen(surface,600,160)
-        stroke_line_caps(surface,x1,y1,x2,y2,12*s,RED)
-        mouth_flat_red(surface, s)
-    elif name == "smile_eyes":
-        eyes_smile_arcs(surface, s); mouth_smile(surface, s)
-    elif name == "wink":
-        eye_wink_right(surface, s)
-        p0 = to_screen(surface,330,400); p1 = to_screen(surface,400,450); p2 = to_screen(surface,470,400)
-        stroke_quad_bezier(surface,(p0[0],p0[1]),(p1[0],p1[1]),(p2[0],p2[1]),30*s,CYAN)
-    elif name == "talking":
-        eyes_default(surface, s); mouth_talking_flat_top_round_bottom(surface, s)
+    for kind, v, color in kf.values():
+        if kind == "disc":
+            cx, cy, r = v
+            if r * s < 0.5: continue
+            x, y, _ = to_screen(surface, cx, cy)
+            aa_filled_circle(surface, x, y, r * s, color)
+        elif kind == "curve":
+            if v[6] * s < 1: continue
+            p0 = to_screen(surface, v[0], v[1])
+            p1 = to_screen(surface, v[2], v[3])
+            p2 = to_screen(surface, v[4], v[5])
+            stroke_quad_bezier(surface, (p0[0], p0[1]), (p1[0], p1[1]), (p2[0], p2[1]), v[6] * s, color)
+        elif kind == "line":
+            if v[4] * s < 1: continue
+            x1, y1, _ = to_screen(surface, v[0], v[1])
+            x2, y2, _ = to_screen(surface, v[2], v[3])
+            stroke_line_caps(surface, x1, y1, x2, y2, v[4] * s, color)
+        elif kind == "box":
+            (x1, y1, _) = to_screen(surface, v[0], v[1])
+            (x2, y2, _) = to_screen(surface, v[2], v[3])
+            w = int(round(x2 - x1)); h = int(round(y2 - y1))
+            if w < 1 or h < 1: continue
+            rect = pygame.Rect(int(round(x1)), int(round(y1)), w, h)
+            r = min(int(round(v[4] * s)), h)
+            pygame.draw.rect(surface, color, rect, border_radius=0,
+                             border_top_left_radius=0, border_top_right_radius=0,
+                             border_bottom_left_radius=r, border_bottom_right_radius=r)
+
+def draw_expression(surface, name):
+    draw_keyframe(surface, expression_keyframe(name))
+
+def render_keyframe(kf, size, rect=None):
+    """
+    Desenha o keyframe em superfície sobreamostrada e reduz para `size`.
+    Com `rect`, só esse recorte da tela é reduzido e devolvido.
+    """
+    w, h = size
+    hi = pygame.Surface((int(w * OVERSAMPLE), int(h * OVERSAMPLE)))
+    draw_keyframe(hi, kf)
+    if rect is not None:
+        hi = hi.subsurface(pygame.Rect(int(rect.x * OVERSAMPLE), int(rect.y * OVERSAMPLE),
+                                       int(rect.w * OVERSAMPLE), int(rect.h * OVERSAMPLE)).clip(hi.get_rect()))
+        w, h = rect.size
+    sprite = pygame.transform.smoothscale(hi, (w, h))
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert()   # mesmo formato da tela → blit mais rápido
+    return sprite
+
+def render_expression(name, size):
+    return render_keyframe(expression_keyframe(name), size)
+
+# ===================== CACHE DE SPRITES =====================
+class FaceSpriteCache:
+    """
+    Guarda cada expressão já renderizada e reduzida ao tamanho da janela.
+    Só mantém o tamanho/escala atual: ao mudar (resize, UP/DOWN), descarta o
+    resto em vez de acumular sprites de tela cheia — o loop só faz blit.
+    """
+    def __init__(self):
+        self._sprites = {}
+        self._atual = None          # (tamanho, FACE_SCALE, OVERSAMPLE)
+
+    def get(self, name, size):
+        atual = (tuple(size), FACE_SCALE, OVERSAMPLE)
+        if atual != self._atual:
+            self._sprites.clear()
+            self._atual = atual
+        sprite = self._sprites.get(name)
+        if sprite is None:
+            sprite = render_expression(name, size)
+            self._sprites[name] = sprite
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+
+class MorphCache:
+    """
+    Quadros intermediários de cada transição (de, para). Cada quadro guarda só
+    o retângulo do rosto (`rect`; fora dele a tela é fundo), num LRU limitado
+    a MORPH_CACHE_MB. prepare() renderiza de antemão as transições do ciclo
+    ocioso ao abrir a janela e a cada mudança de tamanho/escala; as demais são
+    renderizadas na primeira vez que são pedidas (no máximo um quadro por tick).
+    Se nem uma transição inteira cabe no teto, frame() devolve None (troca direta).
+    """
+    def __init__(self, max_mb=MORPH_CACHE_MB, frames=MORPH_FRAMES):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.frames = frames
+        self.rect = None
+        self._seqs = OrderedDict()  # (de, para) -> [quadro ou None]
+        self._bytes = 0
+        self._atual = None          # (tamanho, FACE_SCALE, OVERSAMPLE)
+
+    def _ajustar(self, size):
+        atual = (tuple(size), FACE_SCALE, OVERSAMPLE)
+        if atual != self._atual:
+            self.clear()
+            self._atual = atual
+            self.rect = face_rect(size)
+            return True
+        return False
+
+    def prepare(self, size, pairs=None):
+        """Novo tamanho/escala: descarta tudo e pré-renderiza `pairs` (padrão: ciclo ocioso) até o teto."""
+        if not self._ajustar(size):
+            return
+        if pairs is None:
+            pairs = [(a, b) for a in EXPRESSIONS for b in EXPRESSIONS if a != b]
+        por_quadro = self._quadro_bytes()
+        for src, dst in pairs:
+            if self._bytes + self.frames * por_quadro > self.max_bytes:
+                break
+            for i in range(self.frames):
+                self.frame(src, dst, i, size)
+
+    def _quadro_bytes(self):
+        return self.rect.w * self.rect.h * 4
+
+    def frame(self, src, dst, i, size):
+        self._ajustar(size)
+        if self.frames * self._quadro_bytes() > self.max_bytes:
+            return None
+        key = (src, dst)
+        seq = self._seqs.get(key)
+        if seq is None:
+            seq = self._seqs[key] = [None] * self.frames
+        else:
+            self._seqs.move_to_end(key)
+        if seq[i] is None:
+            t = (i + 1) / (self.frames + 1)
+            t = t * t * (3 - 2 * t)   # suaviza início e fim
+            kf = lerp_keyframe(expression_keyframe(src), expression_keyframe(dst), t)
+            seq[i] = render_keyframe(kf, size, self.rect)
+            self._bytes += self._quadro_bytes()
+            while self._bytes > self.max_bytes:     # a transição em uso é a mais recente
+                _, old = self._seqs.popitem(last=False)
+                self._bytes -= self._quadro_bytes() * sum(f is not None for f in old)
+        return seq[i]
+
+    def clear(self):
+        self._seqs.clear()
+        self._bytes = 0
+        self._atual = None
 
 # ===================== POSICIONAMENTO NA TELA 2 =====================
 def _windows_monitor_rects():
@@ -238,20 +477,215 @@ def create_on_display(display_index=1, borderless=True):
     print(f"[INFO] Janela na tela {display_index} (SDL): pos=({x},{y}) size=({w}x{h})")
     return screen
 
+# ===================== LIP SYNC =====================
+def audio_envelope_levels(samples, rate, hop_ms=LIPSYNC_HOP_MS, levels=LIPSYNC_LEVELS):
+    """
+    Envelope RMS (vetorizado) quantizado em `levels` aberturas de boca,
+    um valor a cada `hop_ms` de áudio. Calculado uma vez por fala.
+    """
+    x = np.asarray(samples, dtype=np.float32)
+    if x.ndim > 1:
+        x = x.mean(axis=1)
+    hop = max(1, int(rate * hop_ms / 1000))
+    n = -(-len(x) // hop)
+    if n == 0:
+        return np.zeros(0, dtype=np.int8)
+    x = np.pad(x, (0, n * hop - len(x)))
+    rms = np.sqrt(np.mean(x.reshape(n, hop) ** 2, axis=1))
+    ref = np.percentile(rms, 95)
+    if ref <= 0:
+        return np.zeros(n, dtype=np.int8)
+    return np.clip(rms / ref * levels, 0, levels - 1).astype(np.int8)
+
+# ===================== CACHE DE FRASES (TTS) =====================
+class TTSPhraseCache:
+    """
+    Áudio já sintetizado, em dois níveis: LRU em memória + arquivos em disco.
+    O disco é limitado por tamanho (remove os arquivos usados há mais tempo).
+    """
+    def __init__(self, cache_dir=TTS_CACHE_DIR, mem_items=TTS_CACHE_MEM_ITEMS,
+                 disk_max_bytes=TTS_CACHE_DISK_MB * 1024 * 1024,
+                 mem_max_bytes=TTS_CACHE_MEM_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.mem_items = mem_items
+        self.mem_max_bytes = mem_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+            except Exception as e:
+                print("[TTS-CACHE] disco indisponível:", e)
+                self.cache_dir = ""
+
+    @staticmethod
+    def key(text, voice, rate, pitch, engine):
+        raw = json.dumps([text, voice, rate, pitch, engine], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".mp3")
+
+    def _remember(self, key, data):
+        with self._lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_bytes -= len(old)
+            self._mem[key] = data
+            self._mem_bytes += len(data)
+            while len(self._mem) > 1 and (len(self._mem) > self.mem_items
+                                          or self._mem_bytes > self.mem_max_bytes):
+                self._mem_bytes -= len(self._mem.popitem(last=False)[1])
+
+    def get(self, key):
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                return data
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)   # mtime = último uso (ordem de remoção)
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data, persist=True):
+        self._remember(key, data)
+        if not (self.cache_dir and persist):
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._evict_disk()
+        except OSError as e:
+            if VERBOSE_LOG: print("[TTS-CACHE] falha ao gravar:", e)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".mp3"):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+def known_phrases():
+    """Todas as frases fixas que o rosto pode falar (para pré-aquecer o cache)."""
+    return [INTRO_PHRASE, LISTENING_PROMPT, OUCH_PHRASE, DIDNT_GET_IT] + INTENTS.known_replies()
+
+# ===================== MP3 EM BLOCOS =====================
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2/2.5
+}
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def _mp3_header(buf, pos):
+    """(tamanho do quadro, amostras, taxa) do cabeçalho Layer III em `pos`, ou None."""
+    b0, b1, b2 = buf[pos], buf[pos + 1], buf[pos + 2]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    ver, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+    br_i, sr_i, pad = b2 >> 4, (b2 >> 2) & 3, (b2 >> 1) & 1
+    if ver == 1 or layer != 1 or br_i in (0, 15) or sr_i == 3:
+        return None
+    mpeg1 = ver == 3
+    br = _MP3_BITRATES[1 if mpeg1 else 2][br_i] * 1000
+    sr = _MP3_RATES[ver][sr_i]
+    return ((144 if mpeg1 else 72) * br // sr + pad, 1152 if mpeg1 else 576, sr)
+
+def _mp3_frames(buf):
+    pos, n = 0, len(buf)
+    while pos + 3 <= n:
+        h = _mp3_header(buf, pos)
+        if h is None:
+            pos += 1                 # ressincroniza
+            continue
+        if pos + h[0] > n:
+            return
+        yield pos, h
+        pos += h[0]
+
+def mp3_complete_frames(buf):
+    """(início, fim) do trecho de `buf` formado só por quadros MP3 completos."""
+    start = end = 0
+    for i, (pos, h) in enumerate(_mp3_frames(buf)):
+        if i == 0:
+            start = pos
+        end = pos + h[0]
+    return start, end
+
+def mp3_tail_offset(buf, count):
+    """Posição em `buf` onde começam os últimos `count` quadros MP3."""
+    frames = list(_mp3_frames(buf))[-count:] if count > 0 else []
+    return frames[0][0] if frames else len(buf)
+
+def mp3_duration_samples(buf, rate):
+    """Duração dos quadros de `buf`, em amostras na taxa `rate` do mixer."""
+    return int(round(sum(h[1] / h[2] for _, h in _mp3_frames(buf)) * rate))
+
 # ===================== TTS (EDGE + FALLBACK) =====================
 class TTSEngine:
     """
     Abstrai Edge-TTS (preferencial) com fallback para pyttsx3.
     Usa pygame.mixer para tocar o áudio gerado (MP3).
     """
-    def __init__(self, prefer_edge=True):
+    def __init__(self, prefer_edge=True, stream_source=None):
         self.prefer_edge = prefer_edge
         self.edge_ok = False
         self.pytts_ok = False
         self.speaking_flag = False
+        self._lipsync = None      # envelope da fala atual (níveis por LIPSYNC_HOP_MS)
+        self.cache = TTSPhraseCache() if ENABLE_TTS_CACHE else None
+        self.stream_source = stream_source or self._edge_tts_stream   # async texto -> blocos MP3
+        self._persist = set()     # frases fixas: vão para o disco; o resto só em memória
+        # fila do worker: (prioridade, seq, geração, texto, tocar?)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._generation = 0      # say_now() incrementa → tudo anterior é descartado
+        self._pending = set()     # falas pedidas e ainda não tocadas
+        self._ready = queue.Queue()
+        self._current = None
+        self._emitted = False     # o job atual já entregou algum bloco?
+        # reprodução em blocos: (seq, geração, tipo, Sound, envelope, último?)
+        self._channel = None
+        self._segments = deque()
+        self._held = None         # bloco da próxima fala, esperando a atual acabar
+        self._utt_seq = None      # fala em reprodução
+        self._utt_final = False
+        self._utt_t0 = None
+        self._utt_started_ms = 0.0
+        self._submitted = {}      # seq -> instante do pedido (tempo até o 1º áudio)
+        self._trace_synth = {}    # seq -> ID do trace: síntese ainda não entregou o 1º bloco
+        self._trace_audio = {}    # seq -> ID do trace: 1º áudio ainda não saiu
+        self._pytts_trace = None
+        self.last_ttfa_ms = None
+        self.ttfa_ms = deque(maxlen=100)
         self._init_audio()
 
-        if self.prefer_edge:
+        if self._channel is None:
+            self.pytts_ok = self._probe_pytts()   # sem mixer não há onde tocar o Edge-TTS
+        elif stream_source is not None:
+            self.edge_ok = True                # fonte local (testes/soak): dispensa o edge_tts
+        elif self.prefer_edge:
             self.edge_ok = self._probe_edge()
             if not self.edge_ok:
                 self.pytts_ok = self._probe_pytts()
@@ -260,13 +694,18 @@ class TTSEngine:
             if not self.pytts_ok:
                 self.edge_ok = self._probe_edge()
 
+        if self.edge_ok:
+            self._start_worker()
+
         if VERBOSE_LOG:
             print(f"[TTS] edge_ok={self.edge_ok}  pyttsx3_ok={self.pytts_ok}")
 
     def _init_audio(self):
         try:
             if not pygame.mixer.get_init():
-                pygame.mixer.init()
+                pygame.mixer.init(frequency=AUDIO_FREQ)
+            pygame.mixer.set_reserved(1)       # canal 0 só para a fala
+            self._channel = pygame.mixer.Channel(0)
         except Exception as e:
             print("[AUDIO] Falha ao iniciar pygame.mixer:", e)
 
@@ -319,58 +758,302 @@ class TTSEngine:
 
     def _set_speaking(self, v:bool):
         self.speaking_flag = v
+        if v and self._pytts_trace is not None:
+            # pyttsx3 sintetiza e toca junto: as duas marcas no início da fala
+            tracer.mark(self._pytts_trace, "tts_done", engine="pyttsx3")
+            tracer.mark(self._pytts_trace, "audio_out")
+            self._pytts_trace = None
 
     def speaking(self):
-        if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
+        if self._utt_seq is not None:
+            return True                             # fala em andamento (mesmo entre blocos)
+        if self._channel is not None and self._channel.get_busy():
             return True
         return bool(self.speaking_flag)
 
+    def mouth_level(self):
+        """Abertura da boca para a posição atual da reprodução, ou None."""
+        env = self._lipsync
+        if env is None or not len(env) or self._utt_t0 is None:
+            return None
+        i = int((time.perf_counter() - self._utt_t0) * 1000) // LIPSYNC_HOP_MS
+        return int(env[min(max(i, 0), len(env) - 1)])
+
+    def _decode_segment(self, data, overlap=0):
+        """
+        Decodifica um trecho de quadros MP3 completos em Sound + envelope.
+        Os primeiros `overlap` bytes (últimos quadros do bloco anterior) entram
+        só para o reservatório de bits do decodificador e são cortados da saída.
+        Roda no worker (via _emit): Sound/sndarray só criam buffers; tocar, enfileirar
+        e parar o canal ficam no thread principal (_pump_audio).
+        """
+        snd = pygame.mixer.Sound(file=io.BytesIO(data))   # BytesIO compartilha o bytes
+        env = None
+        if overlap or ENABLE_LIPSYNC:
+            rate = pygame.mixer.get_init()[0]
+            samples = pygame.sndarray.array(snd)
+            if overlap:
+                samples = samples[mp3_duration_samples(memoryview(data)[:overlap], rate):]
+                snd = pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+            if ENABLE_LIPSYNC:
+                env = audio_envelope_levels(samples, rate)
+        return snd, env
+
     def iterate(self):
+        """Chamado a cada quadro no thread principal: toca o que o worker já decodificou."""
         try:
             if getattr(self, "_pytts_loop_started", False):
                 self._pytts.iterate()
         except Exception:
             pass
+        self._pump_audio()
 
-    async def _edge_tts_to_file(self, text, out_path):
+    async def _edge_tts_stream(self, text):
         import edge_tts
         communicate = edge_tts.Communicate(text, EDGE_TTS_VOICE, rate=EDGE_TTS_RATE, pitch=EDGE_TTS_PITCH)
-        with open(out_path, "wb") as f:
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    f.write(chunk["data"])
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+    # ----- worker de síntese (thread próprio com loop asyncio permanente) -----
+    def _start_worker(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop_ready = threading.Event()
+        self._worker = threading.Thread(target=self._worker_main, name="tts-worker", daemon=True)
+        self._worker.start()
+        self._loop_ready.wait()
+
+    def _worker_main(self):
+        asyncio.set_event_loop(self._loop)
+        self._jobs = asyncio.PriorityQueue()
+        self._loop.call_soon(self._loop_ready.set)
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception:
+            pass
 
-    def say(self, text):
-        if not ENABLE_TTS or not text:
+    async def _serve(self):
+        while True:
+            prio, seq, gen, text, play = await self._jobs.get()
+            if play and gen != self._generation:
+                continue                            # cancelado antes de começar
+            self._current = asyncio.ensure_future(self._produce(seq, gen, text, play))
+            self._emitted = False
+            try:
+                await self._current
+            except asyncio.CancelledError:
+                if not play:                        # pre-warm cede a vez e volta para a fila
+                    self._jobs.put_nowait((prio, seq, gen, text, play))
+                continue                            # preemptado por say_now()
+            except Exception as e:
+                if play and self._emitted:
+                    # parte da fala já foi entregue: encerra a fala aqui em vez de
+                    # repeti-la inteira no pyttsx3 (e de deixá-la aberta para sempre)
+                    print("[Edge-TTS] falhou no meio da fala:", e)
+                    self._ready.put((seq, gen, "edge", None, None, True))
+                else:
+                    print("[Edge-TTS] falhou, tentando pyttsx3:", e)
+                    if play:
+                        self._ready.put((seq, gen, "pytts", text, None, True))
+            finally:
+                self._current = None
+
+    async def _produce(self, seq, gen, text, play):
+        """
+        Frase em cache: entrega de uma vez. Senão, decodifica e entrega em blocos
+        de quadros MP3 completos conforme chegam, para a fala começar no 1º bloco.
+        Tudo em memória: nenhum arquivo temporário por fala.
+        """
+        key = TTSPhraseCache.key(text, EDGE_TTS_VOICE, EDGE_TTS_RATE, EDGE_TTS_PITCH, "edge")
+        data = self.cache.get(key) if self.cache is not None else None
+        if data is not None:
+            if play:
+                self._emit(seq, gen, data, 0, True)
             return
-        if self.edge_ok:
+        chunks = []             # blocos recebidos, unidos uma única vez para o cache
+        pending = bytearray()   # [quadros de sobreposição][quadros novos ainda não tocados]
+        overlap = 0             # bytes de sobreposição no início de `pending`
+        async for chunk in self.stream_source(text):
+            chunks.append(chunk)
+            if not play:
+                continue
+            pending += chunk
+            if len(pending) - overlap >= TTS_STREAM_MIN_BYTES:
+                start, end = mp3_complete_frames(pending)
+                if end - max(start, overlap) > 0:
+                    self._emit(seq, gen, bytes(pending[start:end]), max(overlap - start, 0), False)
+                    # mantém só os últimos quadros como sobreposição do próximo bloco
+                    keep = mp3_tail_offset(memoryview(pending)[start:end], TTS_STREAM_OVERLAP_FRAMES)
+                    del pending[:start + keep]
+                    overlap = end - start - keep
+        if play:
+            self._emit(seq, gen, bytes(pending), overlap, True)
+        if chunks and self.cache is not None:
+            self.cache.put(key, b"".join(chunks), persist=text in self._persist)
+
+    def _emit(self, seq, gen, data, overlap, final):
+        snd = env = None
+        if len(data) > overlap:
             try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
-                    tmp_path = tmp.name
-                asyncio.run(self._edge_tts_to_file(text, tmp_path))
-                self._set_speaking(True)
-                pygame.mixer.music.load(tmp_path)
-                pygame.mixer.music.play()
-                return
+                snd, env = self._decode_segment(data, overlap)
             except Exception as e:
-                print("[Edge-TTS] falhou, tentando pyttsx3:", e)
+                if VERBOSE_LOG: print("[TTS] bloco de áudio inválido:", e)
+        tracer.mark(self._trace_synth.pop(seq, None), "tts_done", engine="edge")
+        self._emitted = True
+        self._ready.put((seq, gen, "edge", snd, env, final))
+
+    def _cancel_current(self):
+        # say_now() não espera nem o pre-warm em andamento
+        if self._current is not None:
+            self._current.cancel()
+
+    def _submit(self, text, prio, play=True, trace=None):
+        with self._lock:
+            self._seq += 1
+            seq, gen = self._seq, self._generation
+            if play:
+                self._pending.add(seq)
+                self._submitted[seq] = time.perf_counter()
+                if trace is not None:
+                    self._trace_synth[seq] = self._trace_audio[seq] = trace
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, (prio, seq, gen, text, play))
+
+    def _discard(self, seq):
+        with self._lock:
+            self._pending.discard(seq)
+            self._submitted.pop(seq, None)
+            self._trace_synth.pop(seq, None)
+            self._trace_audio.pop(seq, None)
+
+    # ----- reprodução (thread principal) -----
+    def _pump_audio(self):
+        # 1) blocos prontos da fala atual; a próxima fala espera esta terminar
+        while True:
+            item = self._held
+            self._held = None
+            if item is None:
+                try:
+                    item = self._ready.get_nowait()
+                except queue.Empty:
+                    break
+            seq, gen, kind, payload, env, final = item
+            if gen != self._generation:
+                continue
+            if kind == "pytts":
+                if self._utt_seq is not None:
+                    self._held = item               # respeita a ordem: espera a fala atual
+                    break
+                self._pytts_trace = self._trace_audio.get(seq)
+                self._discard(seq)
+                if self.pytts_ok:
+                    try:
+                        self._pytts.say(payload)
+                    except Exception as e:
+                        print("[pyttsx3] erro em say():", e)
+                continue
+            if self._utt_seq is None:
+                self._utt_seq, self._utt_final = seq, False
+                self._utt_t0, self._utt_started_ms = None, 0.0
+                self._lipsync = None
+            elif seq != self._utt_seq:
+                self._held = item
+                break
+            if payload is not None:
+                self._segments.append(payload)
+                if env is not None:
+                    self._lipsync = env if self._lipsync is None else np.concatenate((self._lipsync, env))
+            self._utt_final = final
+
+        if self._utt_seq is None:
+            return
+        if self._channel is None:
+            # sem mixer o bloco não tem onde tocar: encerra a fala em vez de
+            # deixar speaking()/busy() presos em True
+            self._segments.clear()
+            self._end_utterance()
+            return
+
+        # 2) alimenta o canal (um tocando + um na fila do SDL)
+        if self._segments and not self._channel.get_busy():
+            snd = self._segments.popleft()
+            now = time.perf_counter()
+            if self._utt_t0 is None:
+                t_req = self._submitted.get(self._utt_seq)
+                if t_req is not None:
+                    self.last_ttfa_ms = (now - t_req) * 1000
+                    self.ttfa_ms.append(self.last_ttfa_ms)
+                    if VERBOSE_LOG: print(f"[TTS] 1º áudio em {self.last_ttfa_ms:.0f} ms")
+                tracer.mark(self._trace_audio.pop(self._utt_seq, None), "audio_out", t=now)
+            # após um atraso do worker, realinha o relógio do lip sync
+            self._utt_t0 = now - self._utt_started_ms / 1000
+            self._utt_started_ms += snd.get_length() * 1000
+            self._channel.play(snd)
+        elif self._segments and self._channel.get_queue() is None:
+            snd = self._segments.popleft()
+            self._utt_started_ms += snd.get_length() * 1000
+            self._channel.queue(snd)
+
+        # 3) fim da fala: tudo recebido e tocado
+        if self._utt_final and not self._segments and not self._channel.get_busy():
+            self._end_utterance()
+
+    def _end_utterance(self):
+        self._discard(self._utt_seq)
+        self._utt_seq = None
+        self._utt_t0 = None
+        self._lipsync = None
+
+    def _stop_audio(self):
+        self._held = None
+        self._segments.clear()
+        self._utt_seq = None
+        self._utt_t0 = None
+        self._lipsync = None
+        if self._channel is not None:
+            self._channel.stop()
+
+    def busy(self):
+        """Falando ou com fala ainda na fila/sintetizando."""
+        return bool(self._pending) or self.speaking()
+
+    def prewarm(self, phrases):
+        """Coloca as frases fixas na fila do worker com a menor prioridade."""
+        if not (ENABLE_TTS and self.edge_ok and self.cache is not None):
+            return
+        for text in phrases:
+            self._persist.add(text)
+            self._submit(text, TTS_PRIO_PREWARM, play=False)
+
+    def say(self, text, trace=None):
+        """`trace`: ID da frase no tracing (marca tts_done e audio_out)."""
+        if not ENABLE_TTS or not text:
+            return
+        if self.edge_ok:
+            self._submit(text, TTS_PRIO_NORMAL, trace=trace)
+            return
         if self.pytts_ok:
             try:
+                self._pytts_trace = trace
                 self._pytts.say(text)
             except Exception as e:
                 print("[pyttsx3] erro em say():", e)
 
     def say_now(self, text):
+        """Interrompe a fala atual, descarta a fila e fala `text` primeiro."""
         if not ENABLE_TTS or not text:
             return
         if self.edge_ok:
-            try:
-                if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()
-                self.say(text)
-                return
-            except Exception:
-                pass
+            with self._lock:
+                self._generation += 1
+                self._pending.clear()
+                self._submitted.clear()
+                self._trace_synth.clear()
+                self._trace_audio.clear()
+            clear_queue(self._ready)
+            self._loop.call_soon_threadsafe(self._cancel_current)
+            self._stop_audio()
+            self._submit(text, TTS_PRIO_NOW)
+            return
         if self.pytts_ok:
             try:
                 self._pytts.stop()
@@ -378,6 +1061,76 @@ class TTSEngine:
             except Exception as e:
                 print("[pyttsx3] erro em say_now():", e)
 
+# ===================== ASR (backends) =====================
+class ASRPartial(str):
+    """Transcrição parcial (ainda pode mudar). O loop principal só age sobre as finais."""
+
+class ASRFinal(str):
+    """Transcrição final; `trace` é o ID da frase no tracing (ou None)."""
+    def __new__(cls, text, trace=None):
+        s = super().__new__(cls, text)
+        s.trace = trace
+        return s
+
+class GoogleASRBackend:
+    """Google Web Speech via SpeechRecognition: uma frase inteira por requisição (online)."""
+    name = "google"
+    streaming = False
+
+    def __init__(self, language=ASR_LANGUAGE):
+        import speech_recognition as sr
+        self._sr = sr
+        self._r = sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, audio):
+        try:
+            return self._r.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+
+class VoskASRBackend:
+    """
+    Reconhecimento offline e incremental (Vosk/Kaldi). O modelo pt-BR é
+    carregado uma vez; o áudio é entregue em blocos conforme chega e o
+    próprio Vosk detecta o fim da frase.
+    """
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=ASR_VOSK_MODEL, rate=ASR_SAMPLE_RATE):
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+        SetLogLevel(-1)
+        t0 = time.perf_counter()
+        self._model = Model(model_path)
+        self._rec = KaldiRecognizer(self._model, rate)
+        self.rate = rate
+        if VERBOSE_LOG:
+            print(f"[ASR] Modelo Vosk carregado em {time.perf_counter() - t0:.1f}s: {model_path}")
+
+    def accept(self, pcm):
+        """Entrega um bloco PCM16 mono. Retorna (parcial, final); um dos dois vazio."""
+        if self._rec.AcceptWaveform(bytes(pcm)):
+            return "", json.loads(self._rec.Result()).get("text", "")
+        return json.loads(self._rec.PartialResult()).get("partial", ""), ""
+
+    def flush(self):
+        """Fecha a frase atual (fim do áudio) e retorna o texto final."""
+        return json.loads(self._rec.FinalResult()).get("text", "")
+
+def make_asr_backend(kind=ASR_BACKEND):
+    """'vosk', 'google' ou 'auto' (Vosk se o pacote e o modelo existirem; senão Google)."""
+    if kind in ("vosk", "auto"):
+        try:
+            if kind == "auto" and not os.path.isdir(ASR_VOSK_MODEL):
+                raise FileNotFoundError(ASR_VOSK_MODEL)
+            return VoskASRBackend()
+        except Exception as e:
+            if kind == "vosk":
+                raise
+            if VERBOSE_LOG: print("[ASR] Vosk indisponível, usando Google:", e)
+    return GoogleASRBackend()
+
 # ===================== ASR (thread) =====================
 def _choose_mic_index(hints=MIC_PREFERRED_HINTS):
     """Tenta escolher um microfone externo por nome; senão retorna None (default)."""
@@ -406,113 +1159,205 @@ class ASRThread(threading.Thread):
         self.out_q = out_queue
         self._stop = threading.Event()
         self._mic_index = None
+        self.mic = None                  # MicStream: um só stream aberto, buffer circular
+        self.backend_name = None
 
     def run(self):
         if not self.enable:
             return
         try:
             import speech_recognition as sr
+            from mic_stream import MicStream
         except Exception as e:
             print("[ASR] SpeechRecognition não disponível:", e)
             return
+        try:
+            backend = make_asr_backend()     # modelo offline carregado uma vez, aqui
+        except Exception as e:
+            print("[ASR] Backend indisponível:", e)
+            return
+        self.backend_name = backend.name
 
-        r = sr.Recognizer()
-        r.energy_threshold = ASR_ENERGY
-        r.pause_threshold = ASR_PAUSE
-
+        spotter = None
+        if ENABLE_KWS:
+            spotter = KeywordSpotter.from_dir(ASR_KWS_DIR, palavras=WAKE_WORDS, rate=ASR_SAMPLE_RATE)
         self._mic_index = _choose_mic_index()
-
+        if VERBOSE_LOG:
+            print(f"[ASR] Backend: {backend.name} | wake word: "
+                  f"{'detector leve' if spotter else 'pelo reconhecedor'}")
         try:
-            with sr.Microphone(device_index=self._mic_index) as mic:
-                if VERBOSE_LOG:
-                    print(f"[ASR] Mic ativo: {self._mic_index} | Ajustando ao ruído...")
-                r.adjust_for_ambient_noise(mic, duration=1)
-                if VERBOSE_LOG: print("[ASR] Pronto. Ouvindo...")
-                while not self._stop.is_set():
-                    try:
-                        audio = r.listen(mic, timeout=ASR_TIMEOUT, phrase_time_limit=ASR_PHRASE_TIMEOUT)
-                        text = ""
-                        try:
-                            text = r.recognize_google(audio, language="pt-BR")
-                        except sr.UnknownValueError:
-                            text = ""
-                        except Exception as e:
-                            if VERBOSE_LOG: print("[ASR] Erro:", e)
-                            text = ""
-                        if text:
-                            if VERBOSE_LOG: print("[ASR] Ouvi:", text)
-                            self.out_q.put(text)
-                    except sr.WaitTimeoutError:
-                        continue
-                    except Exception as e:
-                        if VERBOSE_LOG: print("[ASR] Captura erro:", e)
-                        time.sleep(0.2)
+            self.mic = MicStream(self._mic_index, rate=ASR_SAMPLE_RATE, chunk=ASR_KWS_CHUNK,
+                                 energy=ASR_ENERGY).start()
         except Exception as e:
             print("[ASR] Microfone indisponível:", e)
+            return
+        if VERBOSE_LOG: print(f"[ASR] Mic ativo: {self._mic_index}")
+        try:
+            if spotter:
+                self._run_gated(sr, backend, spotter)
+            elif backend.streaming:
+                self._run_streaming(sr, backend)
+            else:
+                self._run_phrases(sr, backend)
+        finally:
+            self.mic.close()
+
+    def _emit(self, text, trace=None):
+        if VERBOSE_LOG: print("[ASR] Ouvi:", text)
+        tracer.mark(trace, "asr_done")
+        self.out_q.put(ASRFinal(text, trace))
+
+    def _trace_capture(self, mic, ep):
+        """
+        Abre o trace da frase com o início e o fim da fala vistos pelo VAD,
+        convertidos de posição no buffer circular para perf_counter.
+        """
+        trace = tracer.start()
+        if trace is None:
+            return None
+        now, head = time.perf_counter(), self.mic.position()
+        base = mic.stream.pos - ep.position      # amostra do buffer onde o `ep` começou
+        def t(pos):
+            return now - (head - base - pos) / ASR_SAMPLE_RATE
+        if ep.speech_start is not None:
+            tracer.mark(trace, "capture_start", t(ep.speech_start))
+        end = ep.closed_at if ep.closed_at is not None else ep.position
+        tracer.mark(trace, "capture_end", t(end), backend=self.backend_name)
+        return trace
+
+    def _floor_db(self, mic):
+        # áudio filtrado tem outro piso de ruído: o VAD estima o seu
+        return None if mic.denoised else self.mic.noise_floor_db
+
+    def _endpointer(self, mic):
+        return vad.Endpointer(ASR_SAMPLE_RATE, end_ms=ASR_END_MS, max_s=ASR_PHRASE_TIMEOUT,
+                              floor_db=self._floor_db(mic))
+
+    def _run_streaming(self, sr, backend):
+        """Lê o microfone em blocos e transcreve enquanto a pessoa fala."""
+        with self.mic.source(denoise=ASR_DENOISE_ASR) as mic:
+            if VERBOSE_LOG: print("[ASR] Ouvindo...")
+            last_partial = ""
+            ep = self._endpointer(mic)
+            while not self._stop.is_set():
+                try:
+                    data = mic.stream.read(ASR_CHUNK)
+                    partial, final = backend.accept(data)
+                except Exception as e:
+                    if VERBOSE_LOG: print("[ASR] Captura erro:", e)
+                    time.sleep(0.2)
+                    continue
+                if ep.push(data) and not final:
+                    final = backend.flush()     # o VAD fechou a frase antes do Vosk
+                trace = self._trace_capture(mic, ep) if final else None
+                if final or ep.done:
+                    ep = self._endpointer(mic)
+                if final:
+                    last_partial = ""
+                    self._emit(final, trace)
+                elif partial and partial != last_partial:
+                    last_partial = partial
+                    self.out_q.put(ASRPartial(partial))
+
+    def _run_phrases(self, sr, backend):
+        """Grava uma frase inteira (fechada pelo VAD) e manda para o backend."""
+        with self.mic.source(denoise=ASR_DENOISE_ASR) as mic:
+            if VERBOSE_LOG: print("[ASR] Ouvindo...")
+            while not self._stop.is_set():
+                try:
+                    self._command_phrase(sr, backend, mic)
+                except Exception as e:
+                    if VERBOSE_LOG: print("[ASR] Captura erro:", e)
+                    time.sleep(0.2)
+
+    def _run_gated(self, sr, backend, spotter):
+        """
+        Só o detector leve ouve continuamente; após a wake word, uma única
+        frase de comando vai para o backend e o detector volta a escutar.
+        """
+        with self.mic.source(denoise=ASR_DENOISE_KWS) as mic:
+            if VERBOSE_LOG: print("[ASR] Aguardando a wake word...")
+            while not self._stop.is_set():
+                try:
+                    hit = spotter.push(mic.stream.read(ASR_KWS_CHUNK))
+                except Exception as e:
+                    if VERBOSE_LOG: print("[ASR] Captura erro:", e)
+                    time.sleep(0.2)
+                    continue
+                if not hit:
+                    continue
+                if VERBOSE_LOG: print(f"[ASR] Wake word '{hit[0]}' (distância {hit[1]:.2f})")
+                self.out_q.put(hit[0])
+                # o comando começa onde a wake word terminou, com o filtro do ASR
+                cmd = self.mic.source(start=mic.stream.pos, denoise=ASR_DENOISE_ASR)
+                try:
+                    if backend.streaming:
+                        self._command_streaming(backend, cmd)
+                    else:
+                        self._command_phrase(sr, backend, cmd)
+                except Exception as e:
+                    if VERBOSE_LOG: print("[ASR] Captura erro:", e)
+                mic.stream.pos = max(mic.stream.pos, cmd.stream.pos)
+                spotter.reset()
+
+    def _command_streaming(self, backend, mic):
+        deadline = time.time() + COMMAND_WINDOW_MS / 1000.0
+        last_partial = ""
+        ep = self._endpointer(mic)
+        while not self._stop.is_set() and (ep.in_speech or time.time() < deadline):
+            data = mic.stream.read(ASR_KWS_CHUNK)
+            closed = ep.push(data)
+            partial, final = backend.accept(data)
+            if final:
+                self._emit(final, self._trace_capture(mic, ep))
+                return
+            if partial and partial != last_partial:
+                last_partial = partial
+                self.out_q.put(ASRPartial(partial))
+            if closed:
+                break
+        tail = backend.flush()
+        if tail:
+            self._emit(tail, self._trace_capture(mic, ep))
+
+    def _command_phrase(self, sr, backend, mic):
+        pcm, ep = vad.listen(mic, timeout_s=ASR_TIMEOUT, max_s=ASR_PHRASE_TIMEOUT,
+                             end_ms=ASR_END_MS, floor_db=self._floor_db(mic))
+        if pcm is None:
+            return
+        trace = self._trace_capture(mic, ep)
+        try:
+            text = backend.transcribe(sr.AudioData(pcm, ASR_SAMPLE_RATE, 2))
+        except Exception as e:
+            if VERBOSE_LOG: print("[ASR] Erro:", e)
+            text = ""
+        if text:
+            self._emit(text, trace)
 
     def stop(self):
         self._stop.set()
 
 # ===================== NLU SIMPLES =====================
-def parse_intent(text):
-    if not text: return (None, {})
-    t = text.lower()
-
-    if re.search(r"\b(pare|parar|stop|chega)\b", t):
-        return ("stop", {})
-
-    if "me siga" in t or "siga-me" in t or "me acompanha" in t or "me acompanhar" in t:
-        return ("follow_person", {})
-
-    m = re.search(r"vá\s+para\s+a?\s*(cozinha|sala|quarto|banheiro|garagem|entrada)", t)
-    if m:
-        return ("navigate", {"room": m.group(1)})
-
-    if "quem é você" in t or "quem e você" in t or "se apresente" in t or "como você se chama" in t:
-        return ("introduce", {})
-
-    if "piada" in t:
-        return ("joke", {})
+# Intenções, frases, cômodos e respostas ficam em intents.json (novos comandos
+# não mexem no código); o motor compila tudo uma vez (intent_engine.py).
+INTENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json")
+INTENTS = IntentEngine.from_file(INTENTS_FILE)
+ROOMS = INTENTS.slots.get("room", [])
 
-    if "como você está" in t or "tudo bem" in t or "como vai" in t:
-        return ("status", {})
-
-    if any(k in t for k in ["triste", "chateado", "poxa", "pena", "decepcionado"]):
-        return ("make_sad", {})
-    if any(k in t for k in ["feliz", "contente", "legal", "bom trabalho", "mandou bem"]):
-        return ("make_happy", {})
-
-    return (None, {})
+def parse_intent(text):
+    return INTENTS.parse(text)
 
 def handle_intent(intent, slots):
-    if intent == "stop":
-        return ("Ok, parando por agora.", "happy_open")
-    if intent == "follow_person":
-        return ("Certo, vou te acompanhar. Fique à minha frente, por favor.", "smile_eyes")
-    if intent == "navigate":
-        room = slots.get("room","")
-        return (f"Indo para a {room}.", "wink")
-    if intent == "introduce":
-        return ("Eu sou um assistente de serviço. Posso conversar, seguir você e executar tarefas simples.", "talking")
-    if intent == "joke":
-        return ("Por que o robô foi ao médico? Porque ele estava com parafusos soltos!", "smile_eyes")
-    if intent == "status":
-        return ("Estou bem e pronto para ajudar!", "happy_open")
-    if intent == "make_sad":
-        return ("Sinto muito por isso. Vou tentar melhorar.", "sad")
-    if intent == "make_happy":
-        return ("Que bom ouvir isso! Obrigado!", "happy_open")
-    return (None, None)
+    return INTENTS.reply(intent, slots)
+
+_WAKE_RE = re.compile("|".join(re.escape(w) for w in WAKE_WORDS), re.IGNORECASE)
 
 def contains_wake_word(text):
     t = (text or "").lower()
     return any(w in t for w in WAKE_WORDS)
 
 def strip_wake(text):
-    t = text
-    for w in WAKE_WORDS:
-        t = re.sub(w, "", t, flags=re.IGNORECASE)
-    return t.strip()
+    return _WAKE_RE.sub("", text).strip()
 
 def clear_queue(q):
     try:
@@ -523,15 +1368,20 @@ def clear_queue(q):
 
 # ===================== LOOP PRINCIPAL =====================
 def main():
+    pygame.mixer.pre_init(frequency=AUDIO_FREQ)
     pygame.init()
     pygame.display.set_caption("Rosto Interativo — UNIP Wake Word + Edge-TTS")
     screen = create_on_display(TARGET_DISPLAY, borderless=BORDERLESS_SECONDARY)
 
     clock = pygame.time.Clock()
     pygame.mouse.set_visible(False)
+    sprites = FaceSpriteCache()
+    morphs = MorphCache()
 
     # TTS
     tts = TTSEngine(prefer_edge=USE_EDGE_TTS_FIRST)
+    if TTS_PREWARM:
+        tts.prewarm(known_phrases())
 
     # ASR
     asr_q = queue.Queue()
@@ -554,6 +1404,12 @@ def main():
     last_ouch_ms = -999999
     OUCH_COOLDOWN_MS = 1200
 
+    last_drawn = None          # expressão atualmente na tela (alvo da transição)
+    morph_from = None          # origem da transição em andamento
+    morph_start = 0
+    need_redraw = True
+    last_activity_ms = start_ms
+
     running = True
     try:
         while running:
@@ -561,6 +1417,8 @@ def main():
 
             # Eventos de janela/teclado/toque
             for e in pygame.event.get():
+                need_redraw = True          # expose/resize/escala etc.
+                last_activity_ms = now
                 if e.type == pygame.QUIT:
                     running = False
                 elif e.type == pygame.KEYDOWN:
@@ -570,8 +1428,10 @@ def main():
                         current = random.choice(EXPRESSIONS); last_ms = now
                     elif e.key == pygame.K_UP:
                         globals()['FACE_SCALE'] = min(1.70, FACE_SCALE + 0.05)
+                        sprites.clear(); morphs.clear()
                     elif e.key == pygame.K_DOWN:
                         globals()['FACE_SCALE'] = max(0.80, FACE_SCALE - 0.05)
+                        sprites.clear(); morphs.clear()
                 elif e.type in (pygame.MOUSEBUTTONDOWN, pygame.FINGERDOWN):
                     angry_until = now + ANGRY_DURATION_MS
                     if now - last_ouch_ms >= OUCH_COOLDOWN_MS:
@@ -589,8 +1449,13 @@ def main():
                 heard = asr_q.get_nowait()
             except queue.Empty:
                 pass
+            if isinstance(heard, ASRPartial):
+                last_activity_ms = now          # alguém está falando: mantém o FPS cheio
+                heard = None
 
             if heard:
+                last_activity_ms = now
+                trace = getattr(heard, "trace", None)
                 # ======== UNIP = interrupção global ========
                 if contains_wake_word(heard):
                     tts.say_now(LISTENING_PROMPT)   # para fala atual e confirma escuta
@@ -601,11 +1466,12 @@ def main():
                         # UNIP + comando na mesma frase
                         intent, slots = parse_intent(remainder)
                         reply, expr = handle_intent(intent, slots)
+                        tracer.mark(trace, "nlu_done", intent=intent)
                         if not reply:
                             reply = DIDNT_GET_IT
                             expr  = "sad"
                             sad_until = now + SAD_DURATION_MS
-                        tts.say(reply)
+                        tts.say(reply, trace=trace)
                         current = expr or "happy_open"
                         state = STATE_EXEC                 # ao terminar de falar → IDLE
                     else:
@@ -625,14 +1491,15 @@ def main():
                         # tenta entender como comando
                         intent, slots = parse_intent(heard)
                         reply, expr = handle_intent(intent, slots)
+                        tracer.mark(trace, "nlu_done", intent=intent)
                         if not reply:
                             if not said_fallback_this_window:
-                                tts.say(DIDNT_GET_IT)
+                                tts.say(DIDNT_GET_IT, trace=trace)
                                 said_fallback_this_window = True
                                 sad_until = now + SAD_DURATION_MS
                             # continua em AWAKE até expirar ou ouvir UNIP
                         else:
-                            tts.say(reply)
+                            tts.say(reply, trace=trace)
                             current = expr or "happy_open"
                             state = STATE_EXEC
 
@@ -645,14 +1512,15 @@ def main():
                 state = STATE_IDLE
 
             # terminou de falar? se estava EXEC, volta a IDLE
-            if state == STATE_EXEC and not tts.speaking():
+            if state == STATE_EXEC and not tts.busy():
                 state = STATE_IDLE
 
             # Prioridade visual: angry > falando > sad > idle/atual
             if now < angry_until:
                 expr_to_draw = "angry"
             elif tts.speaking():
-                expr_to_draw = "talking"
+                level = tts.mouth_level()
+                expr_to_draw = "talking" if level is None else f"talking_{level}"
             elif now < sad_until:
                 expr_to_draw = "sad"
             else:
@@ -661,22 +1529,50 @@ def main():
                     last_ms = now
                 expr_to_draw = current
 
-            # Render
-            w, h = screen.get_size()
-            hi = pygame.Surface((int(w * OVERSAMPLE), int(h * OVERSAMPLE)))
-            draw_expression(hi, expr_to_draw)
-            pygame.transform.smoothscale(hi, (w, h), screen)
-            pygame.display.flip()
+            if state != STATE_IDLE or is_talking(expr_to_draw):
+                last_activity_ms = now
+
+            # Nova expressão → transição a partir da que está na tela
+            if expr_to_draw != last_drawn:
+                # bocas do lip sync trocam direto, sem transição
+                lipsync = is_talking(last_drawn) and is_talking(expr_to_draw)
+                morph_from = last_drawn if MORPH_MS > 0 and not lipsync else None
+                morph_start = now
+                last_drawn = expr_to_draw
+                need_redraw = True
+
+            # Render (sprites/quadros em cache: só desenha na primeira vez)
+            size = screen.get_size()
+            morphs.prepare(size)
+            frame = None
+            if morph_from is not None:
+                i = (now - morph_start) * MORPH_FRAMES // MORPH_MS
+                if i < MORPH_FRAMES:
+                    frame = morphs.frame(morph_from, expr_to_draw, i, size)
+                else:
+                    morph_from = None
+                need_redraw = True
+            if need_redraw or not RENDER_ON_CHANGE:
+                if frame is not None:
+                    screen.fill(BG)         # o quadro da transição só cobre o rosto
+                    screen.blit(frame, morphs.rect.topleft)
+                else:
+                    screen.blit(sprites.get(expr_to_draw, size), (0, 0))
+                pygame.display.flip()
+                need_redraw = False
 
             # Mantém pyttsx3 fluindo (se em fallback)
             tts.iterate()
 
-            clock.tick_busy_loop(FPS_TARGET)
+            # tick() dorme em vez de girar a CPU; sem interação cai para IDLE_FPS
+            idle = (now - last_activity_ms) >= int(IDLE_AFTER_SECONDS * 1000)
+            clock.tick(IDLE_FPS if idle and morph_from is None else FPS_TARGET)
     finally:
         try:
             if ENABLE_ASR: asr_thread.stop()
         except Exception:
             pass
+        tracer.close()
         pygame.quit()
 
 if __name__ == "__main__":
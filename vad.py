@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detector de atividade de voz (VAD) para fechar frases
+- Energia por quadro de 10–30 ms calculada vetorizada (um reshape + einsum por bloco)
+- Voz = energia acima do piso de ruído + margem; o piso acompanha o ambiente
+- Histerese: a fala só começa após VAD_START_MS de voz seguida e só termina
+  após VAD_END_MS de silêncio (hangover) → latência de fim de fala configurável
+- Substitui pause_threshold/phrase_time_limit: comando curto ("pare") fecha logo,
+  pergunta longa não é cortada (max_s é só um limite de segurança)
+"""
+
+import math
+import numpy as np
+
+VAD_FRAME_MS     = 20
+VAD_START_MS     = 60       # voz contínua para considerar que a fala começou
+VAD_END_MS       = 400      # silêncio que fecha a frase (latência de fim de fala)
+VAD_MARGIN_DB    = 9.0      # quanto acima do piso de ruído conta como voz
+VAD_PRE_ROLL_MS  = 250      # áudio guardado antes do início detectado
+VAD_MAX_S        = 15.0
+
+def frame_levels_db(x, frame):
+    """Energia média (dB, escala PCM16) de cada quadro completo de `x`."""
+    n = len(x) // frame
+    f = np.asarray(x[:n * frame], dtype=np.float32).reshape(n, frame)
+    return 10 * np.log10(np.einsum("ij,ij->i", f, f) / frame + 1e-9)
+
+class Endpointer:
+    """
+    Recebe o áudio em blocos (`push`) e diz quando a frase terminou.
+    Posições em amostras desde o primeiro push: speech_start, speech_end, closed_at.
+    """
+    def __init__(self, rate=16000, frame_ms=VAD_FRAME_MS, start_ms=VAD_START_MS,
+                 end_ms=VAD_END_MS, margin_db=VAD_MARGIN_DB, max_s=VAD_MAX_S, floor_db=None):
+        self.rate = rate
+        self.frame = rate * frame_ms // 1000
+        self.start_frames = max(1, math.ceil(start_ms / frame_ms))
+        self.end_frames = max(1, math.ceil(end_ms / frame_ms))
+        self.margin_db = margin_db
+        self.max_samples = int(max_s * rate)
+        self.floor_db = floor_db
+        self.speech_start = None
+        self.speech_end = None
+        self.closed_at = None
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._pos = 0                # amostras já enquadradas
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    @property
+    def position(self):
+        """Amostras já analisadas."""
+        return self._pos
+
+    @property
+    def in_speech(self):
+        return self.speech_start is not None and self.closed_at is None
+
+    @property
+    def done(self):
+        return self.closed_at is not None
+
+    def push(self, pcm):
+        """Bloco PCM16 (bytes ou int16). Retorna True quando a frase fecha."""
+        if self.done:
+            return True
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+        buf = np.concatenate((self._pending, pcm)) if len(self._pending) else pcm
+        levels = frame_levels_db(buf, self.frame)
+        self._pending = buf[len(levels) * self.frame:]
+        if not len(levels):
+            return False
+        if self.floor_db is None:
+            self.floor_db = float(levels.min())
+        voiced = levels > self.floor_db + self.margin_db
+
+        for k, v in enumerate(voiced):
+            pos = self._pos + (k + 1) * self.frame
+            if self.speech_start is None:
+                # piso de ruído: desce rápido, sobe devagar (só fora da fala)
+                lv = float(levels[k])
+                self.floor_db += (0.3 if lv < self.floor_db else 0.02) * (lv - self.floor_db)
+                self._voiced_run = self._voiced_run + 1 if v else 0
+                if self._voiced_run >= self.start_frames:
+                    self.speech_start = pos - self._voiced_run * self.frame
+                    self.speech_end = pos
+                    self._silent_run = 0
+                continue
+            if v:
+                self._silent_run = 0
+                self.speech_end = pos
+            else:
+                self._silent_run += 1
+            if self._silent_run >= self.end_frames or pos - self.speech_start >= self.max_samples:
+                self.closed_at = pos
+                break
+        self._pos += len(levels) * self.frame
+        return self.done
+
+def listen(source, timeout_s=5.0, max_s=VAD_MAX_S, end_ms=VAD_END_MS,
+           pre_roll_ms=VAD_PRE_ROLL_MS, floor_db=None):
+    """
+    Lê `source.stream` (PCM16 mono) até o VAD fechar a frase.
+    Retorna (pcm bytes da frase, Endpointer) ou (None, Endpointer) se ninguém
+    falou em `timeout_s` (None: espera indefinidamente).
+    """
+    rate, chunk = source.SAMPLE_RATE, source.CHUNK
+    ep = Endpointer(rate, end_ms=end_ms, max_s=max_s, floor_db=floor_db)
+    pre_roll = int(pre_roll_ms * rate / 1000)
+    audio = bytearray()
+    offset = 0                       # amostras já descartadas do início de `audio`
+    while True:
+        data = source.stream.read(chunk)
+        audio += data
+        if ep.push(data):
+            break
+        if ep.speech_start is None:
+            if timeout_s is not None and ep.position >= timeout_s * rate:
+                return None, ep
+            # sem fala ainda: guarda só o pre-roll
+            extra = len(audio) // 2 - (pre_roll + chunk)
+            if extra > 0:
+                del audio[:extra * 2]
+                offset += extra
+    start = max(0, ep.speech_start - pre_roll - offset)
+    return bytes(audio[start * 2:(ep.closed_at - offset) * 2]), ep
@@ -1,88 +1,351 @@
-import speech_recognition as sr
-from transformers import pipeline, AutoTokenizer, AutoModelForQuestionAnswering
 import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, CancelledError, InvalidStateError
 import pyttsx3
 
-# Importações para filtro de ruído mantidas, caso queira reativar no futuro
 import numpy as np
-import noisereduce as nr
+
+from keyword_spotter import KeywordSpotter, KWS_AUDIO_S
+from mic_stream import MicStream
+import vad
+from qa_context import ContextStore
+from qa_cache import AnswerCache
+from startup import StartupOrchestrator
+from stage_pipeline import Stage, resumo as resumo_etapas
+from tracing import Tracer
 
 # --- PARTE 1: CONFIGURAÇÃO DOS MODELOS DE IA ---
+# Nada pesado é carregado no import: criar_inicializacao() (PARTE 3) carrega QA,
+# os dois Whisper, o TTS e o microfone em paralelo (startup.py), e cada etapa
+# do laço espera só pelo componente de que precisa.
 
 # 1a. Configuração do Modelo de Perguntas e Respostas (QA)
 PASTA_MODELO_RELATIVA = "modelo_qa_offline"
 PASTA_MODELO_ABSOLUTA = os.path.abspath(PASTA_MODELO_RELATIVA)
+USAR_QA_INT8 = True    # usa <pasta>/qa_int8.pt se existir (gerado por quantizar_qa.py)
+tokenizer = model = None     # preenchidos por carregar_qa()
+
+_torch_lock = threading.Lock()
+
+def importar_torch():
+    """
+    O torch só é importado pelas cargas em paralelo (QA, Whisper), nunca no
+    import deste módulo; o 1º import dele não pode rodar em dois threads ao mesmo tempo.
+    """
+    with _torch_lock:
+        import torch
+    return torch
 
-print("[SETUP] Carregando o modelo de Perguntas e Respostas (QA)...")
-print(f"  -> Procurando o modelo em: {PASTA_MODELO_ABSOLUTA}")
-
-try:
-    print("  -> Carregando tokenizer...")
-    tokenizer = AutoTokenizer.from_pretrained(PASTA_MODELO_ABSOLUTA)
-    print("  -> Carregando modelo principal...")
-    model = AutoModelForQuestionAnswering.from_pretrained(PASTA_MODELO_ABSOLUTA)
-    print("  -> Montando o pipeline final...")
-    qa_pipeline = pipeline("question-answering", model=model, tokenizer=tokenizer)
-    print("  -> Modelo de QA carregado com sucesso! (100% OFFLINE)")
-
-except Exception as e:
-    print(f"[ERRO CRÍTICO] Não foi possível carregar o modelo da pasta '{PASTA_MODELO_ABSOLUTA}'.")
-    print(f"   -> DETALHE DO ERRO: {e}")
-    exit()
-
-# 1b. Configuração do Reconhecedor de Voz
-r = sr.Recognizer()
+def carregar_qa():
+    global tokenizer, model
+    importar_torch()
+    from transformers import AutoTokenizer   # imports lentos: ficam fora do caminho do microfone
+    from quantizar_qa import carregar_modelo_qa   # traz o torch
+    print(f"[SETUP] Carregando o modelo de QA de: {PASTA_MODELO_ABSOLUTA}")
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(PASTA_MODELO_ABSOLUTA)
+        model, variante_qa = carregar_modelo_qa(PASTA_MODELO_ABSOLUTA, usar_int8=USAR_QA_INT8)
+    except Exception as e:
+        raise RuntimeError(f"Não foi possível carregar o modelo da pasta "
+                           f"'{PASTA_MODELO_ABSOLUTA}': {e}") from e
+    print(f"  -> Modelo de QA ({variante_qa}) carregado com sucesso! (100% OFFLINE)")
+    base_de_contexto(contextos_gerais)     # indexa já no setup, não na 1ª pergunta
+    return model
+
+# 1b. Configuração do Reconhecimento de Voz (Whisper)
 MODELO_WHISPER_ATIVACAO = "tiny"
 MODELO_WHISPER_PERGUNTA = "small.en"
+WHISPER_TAXA = 16000                                   # taxa que o Whisper espera
+WHISPER_THREADS_CPU = (int(os.environ.get("WHISPER_THREADS_CPU", 0))   # avaliação em lote divide os núcleos
+                       or max(1, (os.cpu_count() or 2) - 1))   # deixa um núcleo para o resto
+
+
+class WhisperModelPool:
+    """
+    Modelos Whisper residentes: cada modelo é carregado UMA vez, aquecido com
+    uma inferência em silêncio (a 1ª pergunta já tem a latência de regime) e
+    usado direto com arrays NumPy, sem ida e volta por WAV do AudioData.
+    Criar o pool é barato: torch/whisper só são importados (e os threads do
+    torch configurados) no primeiro carregar().
+    """
+    def __init__(self, nomes=(), threads=WHISPER_THREADS_CPU, device="cpu"):
+        self.threads = threads
+        self.device = device
+        self.modelos = {}
+        self._torch_pronto = False
+        self._lock = threading.Lock()
+        for nome in nomes:
+            self.carregar(nome)
+
+    def _configurar_torch(self):
+        with self._lock:
+            if self._torch_pronto:
+                return
+            torch = importar_torch()
+            torch.set_num_threads(self.threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # só pode ser definido antes do primeiro uso paralelo do torch
+            self._torch_pronto = True
+
+    def carregar(self, nome):
+        """Carrega e aquece `nome` (pode rodar em paralelo com outros carregamentos)."""
+        self._configurar_torch()
+        import whisper   # import lento: fica fora do import do módulo
+        t0 = time.perf_counter()
+        modelo = whisper.load_model(nome, device=self.device)
+        t1 = time.perf_counter()
+        self.modelos[nome] = modelo
+        self.transcrever(nome, np.zeros(WHISPER_TAXA, dtype=np.float32), language="english")
+        print(f"[SETUP] Whisper '{nome}': carregado em {t1 - t0:.1f}s, "
+              f"aquecido em {time.perf_counter() - t1:.1f}s ({self.threads} threads)")
+        return modelo
+
+    def transcrever(self, nome, audio, language="english"):
+        """`audio`: float32 mono a 16 kHz, em [-1, 1]. Falha na decodificação: ""."""
+        # temperatura padrão (com fallback): áudio ruidoso ainda tem outra chance
+        try:
+            resultado = self.modelos[nome].transcribe(audio, language=language, fp16=False)
+        except Exception as e:
+            print(f"[ERRO NO WHISPER] '{nome}' não conseguiu transcrever este trecho: {e}")
+            return ""
+        return resultado["text"].strip()
+
+
+def pcm_para_array(pcm):
+    """PCM16 mono 16 kHz (bytes) -> float32 em [-1, 1]."""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def audio_para_array(audio):
+    """AudioData -> float32 mono 16 kHz (PCM direto, sem gerar WAV)."""
+    return pcm_para_array(audio.get_raw_data(convert_rate=WHISPER_TAXA, convert_width=2))
 
-print(f"[SETUP] Modelo de ativação ('wake word') carregado: '{MODELO_WHISPER_ATIVACAO}'")
-print(f"[SETUP] Modelo de pergunta principal carregado: '{MODELO_WHISPER_PERGUNTA}'")
 
-# <-- AJUSTE: REMOVIDA A CONFIGURAÇÃO GLOBAL DO TTS. ELA AGORA É FEITA DENTRO DA FUNÇÃO speak()
+whisper_pool = WhisperModelPool()   # os dois modelos são carregados em criar_inicializacao()
+
+# 1c. Serviço de fala: criado logo após a definição de SpeechService (PARTE 2)
 
 
 # --- PARTE 2: FUNÇÃO DE PERGUNTAS E RESPOSTAS ---
-def responder_com_base_no_contexto(contextos: list, pergunta: str):
+# Os contextos são divididos em trechos, tokenizados e indexados (BM25) uma vez;
+# cada pergunta só roda o modelo nos trechos mais relevantes (qa_context.py).
+# Perguntas repetidas (ou quase, após normalizar) saem do cache (qa_cache.py).
+_base_contexto = None
+cache_respostas = AnswerCache()
+
+def base_de_contexto(contextos: list):
+    """ContextStore dos `contextos` (refeito só quando a lista muda)."""
+    global _base_contexto
+    if _base_contexto is None or _base_contexto.contextos != tuple(contextos):
+        t0 = time.perf_counter()
+        _base_contexto = ContextStore(contextos, tokenizer, model)
+        print(f"[SETUP] Base de contexto: {len(_base_contexto.trechos)} trechos indexados "
+              f"em {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return _base_contexto
+
+def responder_com_base_no_contexto(contextos: list, pergunta: str, usar_cache=True):
     print("\n--- INÍCIO DO LOG DE PROCESSAMENTO (QA) ---")
     print(f"[LOG] Pergunta recebida: '{pergunta}'")
-    contexto_completo = " ".join(contextos)
-    resultado = qa_pipeline(question=pergunta, context=contexto_completo)
+    resultado = cache_respostas.buscar(contextos, pergunta) if usar_cache else None
+    if resultado is not None:
+        print(f"[LOG] Resposta do cache ({cache_respostas.resumo()})")
+    else:
+        resultado = base_de_contexto(contextos).responder(pergunta)
+        if usar_cache:
+            cache_respostas.guardar(contextos, pergunta, resultado)
     resposta = resultado['answer']
     confianca = resultado['score']
-    print(f"[LOG] Resposta extraída: '{resposta}' (Confiança: {confianca:.4f})")
+    print(f"[LOG] Resposta extraída: '{resposta}' (Confiança: {confianca:.4f}, trecho {resultado['trecho']})")
     print("--- FIM DO LOG DE PROCESSAMENTO (QA) ---")
     if confianca > 0.1:
         return resposta
     else:
         return "I could not find a reliable answer for that in my context."
 
-# <-- AJUSTE PRINCIPAL: A LÓGICA DO MOTOR DE FALA FOI MOVIDA PARA DENTRO DA FUNÇÃO
-def speak(text):
+# --- SERVIÇO DE FALA (TTS) ---
+FALA_PASSO_S = 0.01    # passo do laço do pyttsx3: atraso máximo para parar no barge-in
+
+class SpeechService:
     """
-    Converte um texto em fala.
-    O motor é inicializado e finalizado a cada chamada para garantir que funcione
-    corretamente dentro de um loop.
+    Motor de fala persistente: o pyttsx3 é inicializado UMA vez, num thread
+    próprio (o motor só é usado pelo thread que o criou), e a voz em inglês
+    é resolvida uma única vez. Cada pedido entra numa fila e devolve um Future,
+    então o loop principal pode continuar ouvindo enquanto o robô fala.
+    `interromper()` corta a fala atual e descarta a fila (barge-in): só cancela
+    os Futures; quem para o motor é o próprio thread da fala, que roda o laço
+    do pyttsx3 aos passos (startLoop(False) + iterate()) em vez de runAndWait().
     """
-    try:
-        print(f"\n<< ROBOT SPEAKING: '{text}'")
-        
-        # 1. Inicializa uma nova instância do motor de TTS
-        tts_engine = pyttsx3.init()
-        
-        # 2. Procura e configura a voz em inglês
-        voices = tts_engine.getProperty('voices')
-        english_voice = next((voice for voice in voices if 'EN-US' in voice.id), None)
-        if english_voice:
-            tts_engine.setProperty('voice', english_voice.id)
-        
-        # 3. Coloca o texto na fila para ser falado
-        tts_engine.say(text)
-        
-        # 4. Processa a fila, fala e aguarda a conclusão
-        tts_engine.runAndWait()
-        
-    except Exception as e:
-        print(f"[ERRO NO TTS] Não foi possível falar: {e}")
+    def __init__(self, voice_hint="EN-US"):
+        self.voice_hint = voice_hint
+        self.voice_id = None
+        self.stats = []           # por fala: espera na fila, início da fala, total (ms)
+        self.falando = False
+        self._atual = None        # Future da fala em andamento (pendente até terminar)
+        self._fim = threading.Event()
+        self._nome = None         # nome da fala em andamento nos callbacks do pyttsx3
+        self._falas = 0
+        self._requests = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech-service", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _init_engine(self):
+        t0 = time.perf_counter()
+        engine = pyttsx3.init()
+        if self.voice_id is None:
+            voices = engine.getProperty('voices')
+            english_voice = next((voice for voice in voices if self.voice_hint in voice.id), None)
+            self.voice_id = english_voice.id if english_voice else ""
+        if self.voice_id:
+            engine.setProperty('voice', self.voice_id)
+        engine.connect('started-utterance', self._on_started)
+        engine.connect('finished-utterance', self._on_finished)
+        engine.startLoop(False)
+        print(f"[SETUP] Motor de fala pronto em {(time.perf_counter() - t0) * 1000:.0f} ms "
+              f"(voz: '{self.voice_id or 'padrão'}')")
+        return engine
+
+    def _on_started(self, name):
+        if name == self._nome:
+            self._started_at = time.perf_counter()
+
+    def _on_finished(self, name, completed):
+        # o finished-utterance de uma fala parada pode chegar já durante a próxima
+        if name == self._nome:
+            self._fim.set()
+
+    def _reiniciar(self, engine):
+        """
+        Motor travado: reinicia o laço do mesmo motor. pyttsx3.init() devolveria
+        este mesmo objeto (cache por driver), já em loop, e o startLoop falharia.
+        """
+        try:
+            engine.stop()
+            engine.endLoop()
+        except Exception:
+            pass
+        engine.startLoop(False)
+        return engine
+
+    def _falar(self, engine, text, future):
+        """Fala `text` neste thread; False se `future` foi cancelado no meio (barge-in)."""
+        self._falas += 1
+        self._nome = f"fala-{self._falas}"
+        self._fim.clear()
+        engine.say(text, self._nome)
+        while not self._fim.is_set():
+            if future.cancelled():
+                engine.stop()
+                self._nome = None
+                return False
+            engine.iterate()
+            time.sleep(FALA_PASSO_S)
+        return True
+
+    def _run(self):
+        try:
+            engine = self._init_engine()
+        except Exception as e:
+            print(f"[ERRO NO TTS] Não foi possível iniciar o motor de fala: {e}")
+            engine = None
+        self._ready.set()
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            text, future, queued_at = item
+            # o Future fica pendente durante a fala: interromper() ainda pode cancelá-lo
+            self._atual = future
+            if future.cancelled():
+                continue
+            try:
+                if engine is None:
+                    raise RuntimeError("motor de fala indisponível")
+                t0 = time.perf_counter()
+                self._started_at = None
+                self.falando = True
+                try:
+                    completa = self._falar(engine, text, future)
+                finally:
+                    self.falando = False
+                    self._atual = None
+                if not completa:
+                    print(f"[LOG] TTS: fala interrompida após {(time.perf_counter() - t0) * 1000:.0f} ms")
+                    continue
+                t1 = time.perf_counter()
+                started = self._started_at or t1
+                st = {"started_at": started,
+                      "queue_ms": (t0 - queued_at) * 1000,
+                      "start_ms": (started - t0) * 1000,
+                      "total_ms": (t1 - t0) * 1000}
+                self.stats.append(st)
+                print(f"[LOG] TTS: fila {st['queue_ms']:.0f} ms | início da fala "
+                      f"{st['start_ms']:.0f} ms | total {st['total_ms']:.0f} ms")
+                try:
+                    future.set_result(st)
+                except InvalidStateError:
+                    pass                           # cancelada junto com o fim da fala
+            except Exception as e:
+                print(f"[ERRO NO TTS] Não foi possível falar: {e}")
+                try:
+                    future.set_exception(e)
+                except InvalidStateError:
+                    pass
+                if engine is not None:
+                    try:
+                        engine = self._reiniciar(engine)
+                    except Exception:
+                        engine = None
+        if engine is not None:
+            try:
+                engine.endLoop()
+            except Exception:
+                pass
+
+    def speak(self, text, on_done=None):
+        """Enfileira `text` e retorna um Future (resolvido ao terminar de falar)."""
+        future = Future()
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        self._requests.put((text, future, time.perf_counter()))
+        return future
+
+    def interromper(self):
+        """Cancela as falas na fila e para a atual; devolve quantas foram cortadas."""
+        n = 0
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:                 # shutdown pedido: mantém
+                self._requests.put(None)
+                break
+            n += int(item[1].cancel())
+        atual = self._atual
+        if atual is not None and atual.cancel():
+            n += 1                           # o thread da fala vê e para o motor
+        return n
+
+    def shutdown(self, wait=True):
+        self._requests.put(None)
+        if wait:
+            self._thread.join()
+
+def speak(text, on_done=None):
+    """
+    Converte um texto em fala sem bloquear: a fala vai para o serviço
+    persistente e esta função retorna um Future imediatamente.
+    """
+    print(f"\n<< ROBOT SPEAKING: '{text}'")
+    return speech_service.speak(text, on_done=on_done)
+
+speech_service = None     # criado por iniciar_fala(): só o modo interativo fala
 
 
 # --- PARTE 3: CONTEXTOS PARA O ROBÔ ---
@@ -92,72 +355,305 @@ context_identity = "Your name is UD-H1."
 contextos_gerais = [context_robot_A_en, context_robot_B_en, context_identity]
 palavrachave = "Start"
 
-# --- PARTE 4: LOOP PRINCIPAL SEM SUPRESSÃO DE RUÍDO ---
-print(f"\n[INFO] Sistema pronto! Diga '{palavrachave}' para ativar.")
-print("A sessão será encerrada após 6 perguntas.")
-print("=======================================================")
+# Detector leve da palavra de ativação: roda continuamente só com NumPy e o
+# Whisper "tiny" só é chamado (para confirmar) depois de uma detecção.
+# Sem exemplos gravados em palavras_chave/start/*.wav, volta ao Whisper direto.
+PASTA_PALAVRAS_CHAVE = os.path.abspath("palavras_chave")
+KWS_CONFIRMAR_COM_WHISPER = True
+spotter = None            # criado por carregar_detector()
+
+def carregar_detector():
+    global spotter
+    spotter = KeywordSpotter.from_dir(PASTA_PALAVRAS_CHAVE, palavras=[palavrachave.lower()], rate=WHISPER_TAXA)
+    if spotter:
+        print(f"[SETUP] Detector de palavra de ativação: {sum(map(len, spotter.templates.values()))} exemplos em {PASTA_PALAVRAS_CHAVE}")
+    return spotter
+
+# Microfone: um único stream aberto a sessão inteira, num buffer circular.
+# O piso de ruído (usado pelo VAD) acompanha o ambiente continuamente, então
+# não há mais a calibração de 1 s (adjust_for_ambient_noise) antes de cada escuta.
+microfone = None          # criado por iniciar_microfone()
+
+# Fim da frase pelo VAD (em vez de pause_threshold/phrase_time_limit fixos):
+# a pergunta fecha VAD_FIM_DE_FALA_MS após a última palavra; o máximo é só segurança
+VAD_FIM_DE_FALA_MS = 500
+VAD_PERGUNTA_MAX_S = 20
+
+# Supressão de ruído em fluxo (noise_suppression.py), ligada por reconhecedor.
+# O perfil de ruído é aprendido nos silêncios e mantido a sessão inteira.
+# Meça com bench_denoise.py antes de ligar: nem todo ruído melhora o WER.
+SUPRESSAO_RUIDO_ATIVACAO = False
+SUPRESSAO_RUIDO_PERGUNTA = False
+
+def piso_vad(source):
+    """Piso de ruído do microfone para o VAD (o áudio filtrado tem outro piso)."""
+    return None if source.denoised else microfone.noise_floor_db
+
+def esperar_palavra_chave(source, parar):
+    """Lê o microfone em blocos até o detector acusar a palavra de ativação."""
+    spotter.reset()
+    while not parar.is_set():
+        deteccao = spotter.push(source.stream.read(source.CHUNK))
+        if deteccao and deteccao[0] == palavrachave.lower():
+            return deteccao
+    return None
 
-question_count = 0
 MAX_QUESTIONS = 6
 
-while question_count < MAX_QUESTIONS:
-    print(f"\n({question_count + 1}/{MAX_QUESTIONS}) Aguardando a palavra de ativação ('{palavrachave}')...")
-    texto_detectado = ""
-    try:
-        with sr.Microphone() as source:
-            r.adjust_for_ambient_noise(source, duration=1)
-            audio_ativacao = r.listen(source, phrase_time_limit=2)
-            
+# Linha do tempo da inicialização em JSON (vazio: só imprime)
+ARQUIVO_LINHA_DO_TEMPO = ""
+# Latência por pergunta (captura → Whisper → QA → fala) em JSONL; desligada por
+# padrão, liga com WHISPER_SPEECH_TRACE=latencia_whisper_speech.jsonl.
+# Relatório: python tracing.py latencia_whisper_speech.jsonl
+ARQUIVO_LATENCIA = (os.path.abspath(os.environ["WHISPER_SPEECH_TRACE"])
+                    if os.environ.get("WHISPER_SPEECH_TRACE") else "")
+tracer = Tracer(ARQUIVO_LATENCIA, fonte="whisper_speech")
+inicializacao = None
+
+def iniciar_fala():
+    global speech_service
+    speech_service = SpeechService()
+    return speech_service
+
+def iniciar_microfone():
+    global microfone
+    microfone = MicStream(rate=WHISPER_TAXA).start()
+    return microfone
+
+def criar_inicializacao(servicos=True):
+    """
+    Dispara a carga de tudo em paralelo. Sem `servicos` (avaliação em lote),
+    só os modelos: nada de microfone nem de fala.
+    """
+    global inicializacao
+    ini = StartupOrchestrator()
+    ini.add("qa", carregar_qa)
+    ini.add("whisper_ativacao", lambda: whisper_pool.carregar(MODELO_WHISPER_ATIVACAO))
+    ini.add("whisper_pergunta", lambda: whisper_pool.carregar(MODELO_WHISPER_PERGUNTA))
+    ini.add("detector", carregar_detector)
+    if servicos:
+        ini.add("tts", iniciar_fala)
+        ini.add("microfone", iniciar_microfone)
+    inicializacao = ini.start()
+    return ini
+
+# --- PARTE 4: LOOP PRINCIPAL EM ETAPAS (stage_pipeline.py) ---
+# A thread principal só escuta: palavra de ativação e recorte da pergunta.
+# Transcrição, QA e fala rodam cada uma na sua thread, ligadas por filas
+# limitadas, então a escuta continua enquanto o robô pensa e fala.
+# Com BARGE_IN, uma nova ativação corta a fala e descarta o que estava em
+# andamento; sem ele, a nova pergunta entra na fila atrás da resposta atual.
+BARGE_IN = True
+ESPERA_ATIVACAO_S = 1.0   # de quanto em quanto a escuta confere se deve encerrar
+
+class Conversa:
+    """Etapas transcrição -> QA -> fala e o estado que elas compartilham."""
+    def __init__(self, ini):
+        self.ini = ini
+        self.geracao = 0
+        self.respondidas = 0
+        self.encerrar = threading.Event()
+        geracao = lambda: self.geracao
+        self.ativacao = Stage("ativacao", None)        # só métricas (thread principal)
+        self.pergunta = Stage("pergunta", None)
+        self.fala = Stage("fala", self.falar, geracao=geracao)
+        self.qa = Stage("qa", self.responder, self.fala, geracao=geracao)
+        self.asr = Stage("transcricao", self.transcrever, self.qa, geracao=geracao)
+        self.etapas = [self.ativacao, self.pergunta, self.asr, self.qa, self.fala]
+
+    def start(self):
+        for st in (self.fala, self.qa, self.asr):
+            st.start()
+        return self
+
+    def transcrever(self, turno):
+        self.ini.wait("whisper_pergunta")
+        t_asr = time.perf_counter()
+        turno["pergunta"] = whisper_pool.transcrever(MODELO_WHISPER_PERGUNTA, pcm_para_array(turno.pop("pcm")))
+        tracer.mark(turno["trace"], "asr_done", modelo=MODELO_WHISPER_PERGUNTA)
+        print(f"[LOG] Fim da fala -> transcrição: {(time.perf_counter() - turno['t_fim_fala']) * 1000:.0f} ms "
+              f"(VAD {turno['vad_ms']:.0f} ms, Whisper {(time.perf_counter() - t_asr) * 1000:.0f} ms)")
+        print(f"\n>> VOCÊ PERGUNTOU: '{turno['pergunta']}'")
+        if not turno["pergunta"].strip():
+            print("-> A pergunta reconhecida estava vazia. Tente novamente.")
+            return None
+        return turno
+
+    def responder(self, turno):
+        self.ini.wait("qa")
+        turno["resposta"] = responder_com_base_no_contexto(contextos=contextos_gerais,
+                                                           pergunta=turno["pergunta"])
+        tracer.mark(turno["trace"], "nlu_done")
+        print(f"\n<< RESPOSTA: '{turno['resposta']}'")
+        return turno
+
+    def falar(self, turno):
+        self.ini.wait("tts")
+        if self.respondidas >= MAX_QUESTIONS:
+            return None
+        futuro = speak(turno["resposta"])
+        etapas = turno.get("etapas", {})
+        print(f"[LOG] Turno {turno['id']}: fim da fala -> resposta "
+              f"{(time.perf_counter() - turno['t_fim_fala']) * 1000:.0f} ms ("
+              + ", ".join(f"{nome} {e['fila_ms']:.0f}+{e['ms']:.0f}" for nome, e in etapas.items())
+              + " ms fila+processamento)")
+        try:
+            st = futuro.result()     # a etapa de fala fica ocupada enquanto o robô fala
+        except CancelledError:
+            return None              # cortada por barge-in: não conta como respondida
+        except Exception:
+            st = None                # erro já registrado no TTS
+        self.respondidas += 1
+        if self.respondidas >= MAX_QUESTIONS:
+            self.encerrar.set()
+        if st is not None:
+            # pyttsx3 sintetiza e toca junto: as duas marcas no início da fala
+            tracer.mark(turno["trace"], "tts_done", t=st["started_at"], engine="pyttsx3")
+            tracer.mark(turno["trace"], "audio_out", t=st["started_at"])
+        return None
+
+    def ocupada(self):
+        return bool((speech_service and speech_service.falando)
+                    or any(st.ocupada or st.fila.qsize() for st in (self.asr, self.qa, self.fala)))
+
+    def barge_in(self):
+        """Nova ativação: tudo que estava em andamento fica obsoleto."""
+        self.geracao += 1
+        cortados = sum(st.ocupada for st in (self.asr, self.qa))   # terminam e são descartados adiante
+        cortados += sum(st.limpar() for st in (self.asr, self.qa, self.fala))
+        if speech_service is not None:
+            cortados += speech_service.interromper()
+        return cortados
+
+    def stop(self):
+        self.geracao += 1                 # o que ainda não foi falado não é mais respondido
+        for st in (self.asr, self.qa, self.fala):
+            st.stop(wait=True)
+
+def esperar_ativacao(conversa):
+    """(texto ouvido, posição do fim da ativação no buffer) ou None ao encerrar."""
+    with microfone.source(denoise=SUPRESSAO_RUIDO_ATIVACAO) as source:
+        if spotter:
+            deteccao = esperar_palavra_chave(source, conversa.encerrar)
+            if deteccao is None:
+                return None
+            fim_ativacao = source.stream.pos
+            atraso = microfone.position() - fim_ativacao      # áudio ainda não lido
+            t0 = time.perf_counter()
+            if KWS_CONFIRMAR_COM_WHISPER:
+                print(f"...Detector acusou (distância {deteccao[1]:.2f}), confirmando com o Whisper...")
+                conversa.ini.wait("whisper_ativacao")
+                audio_ativacao = microfone.recent(KWS_AUDIO_S, end=fim_ativacao)
+                texto = whisper_pool.transcrever(MODELO_WHISPER_ATIVACAO, audio_ativacao).lower()
+            else:
+                texto = palavrachave.lower()
+        else:
+            audio_ativacao = None
+            while audio_ativacao is None:
+                if conversa.encerrar.is_set():
+                    return None
+                audio_ativacao, _ = vad.listen(source, timeout_s=ESPERA_ATIVACAO_S, max_s=2,
+                                               floor_db=piso_vad(source))
+            fim_ativacao = source.stream.pos
+            atraso = microfone.position() - fim_ativacao
+            t0 = time.perf_counter()
             print("...Analisando palavra de ativação como inglês...")
-            texto_detectado = r.recognize_whisper(audio_ativacao, model=MODELO_WHISPER_ATIVACAO, language="english").lower()
-
-        if palavrachave.lower() in texto_detectado:
-            print(f"Palavra de ativação detectada! (Ouvi: '{texto_detectado}')")
-            print('\a')
-            print("Estou ouvindo sua pergunta agora...")
-            
-            with sr.Microphone() as source_pergunta:
-                r.adjust_for_ambient_noise(source_pergunta, duration=1)
-                audio_pergunta_ruidoso = r.listen(source_pergunta, timeout=5, phrase_time_limit=10)
-
-                if audio_pergunta_ruidoso.get_raw_data():
-                    
-                    print("Reconhecendo a pergunta com o modelo principal (sem filtro de ruído)...")
-                    # Usando o áudio original (audio_pergunta_ruidoso) para o reconhecimento
-                    comando_voz = r.recognize_whisper(audio_pergunta_ruidoso, model=MODELO_WHISPER_PERGUNTA, language="english")
-                    
-                    print(f"\n>> VOCÊ PERGUNTOU: '{comando_voz}'")
-
-                    if comando_voz and comando_voz.strip():
-                        resposta_final = responder_com_base_no_contexto(
-                            contextos=contextos_gerais,
-                            pergunta=comando_voz
-                        )
-                        print(f"\n<< RESPOSTA: '{resposta_final}'")
-                        speak(resposta_final)
-                        question_count += 1
-                    else:
-                        print("-> A pergunta reconhecida estava vazia. Tente novamente.")
+            texto = whisper_pool.transcrever(MODELO_WHISPER_ATIVACAO, pcm_para_array(audio_ativacao)).lower()
+    conversa.ativacao.registrar((time.perf_counter() - t0) * 1000, fila_ms=atraso * 1000 / WHISPER_TAXA,
+                                profundidade=atraso // microfone.chunk)
+    return texto, fim_ativacao
+
+def main():
+    ini = criar_inicializacao()
+    try:
+        # para ouvir a palavra de ativação basta o microfone e o detector, mais o
+        # QA (sem ele nenhuma pergunta teria resposta: a falha para aqui, não a
+        # cada pergunta); os Whisper terminam de carregar enquanto isso
+        ini.wait("microfone")
+        if not ini.wait("detector"):
+            ini.wait("whisper_ativacao")
+        ini.wait("qa")
+    except Exception as e:
+        print(f"[ERRO CRÍTICO] {e}")
+        return
+    print(f"[SETUP] Ouvindo após {time.perf_counter() - ini.t0:.1f}s")
+    print(f"\n[INFO] Sistema pronto! Diga '{palavrachave}' para ativar.")
+    print(f"A sessão será encerrada após {MAX_QUESTIONS} perguntas.")
+    print("=======================================================")
+
+    conversa = Conversa(ini).start()
+    turnos = 0
+    while not conversa.encerrar.is_set():
+        print(f"\n({conversa.respondidas + 1}/{MAX_QUESTIONS}) Aguardando a palavra de ativação ('{palavrachave}')...")
+        try:
+            ativacao = esperar_ativacao(conversa)
+            if ativacao is None:
+                break
+            texto_detectado, fim_ativacao = ativacao
+
+            if palavrachave.lower() in texto_detectado:
+                print(f"Palavra de ativação detectada! (Ouvi: '{texto_detectado}')")
+                if BARGE_IN and conversa.ocupada():
+                    print(f"[LOG] Barge-in: {conversa.barge_in()} item(ns) interrompido(s)")
+                print('\a')
+                print("Estou ouvindo sua pergunta agora...")
+
+                # a pergunta é lida do buffer a partir do fim da palavra de ativação:
+                # nada do que foi dito durante a confirmação se perde
+                with microfone.source(start=fim_ativacao, denoise=SUPRESSAO_RUIDO_PERGUNTA) as source_pergunta:
+                    audio_pergunta, vad_pergunta = vad.listen(
+                        source_pergunta, timeout_s=5, max_s=VAD_PERGUNTA_MAX_S,
+                        end_ms=VAD_FIM_DE_FALA_MS, floor_db=piso_vad(source_pergunta))
+
+                if audio_pergunta:
+                    vad_ms = (vad_pergunta.closed_at - vad_pergunta.speech_end) * 1000 / WHISPER_TAXA
+                    conversa.pergunta.registrar(vad_ms)
+                    turnos += 1
+                    # posições do VAD no buffer circular -> instantes (perf_counter)
+                    trace = tracer.start()
+                    agora, cabeca = time.perf_counter(), microfone.position()
+                    tracer.mark(trace, "capture_start",
+                                agora - (cabeca - fim_ativacao - vad_pergunta.speech_start) / WHISPER_TAXA)
+                    tracer.mark(trace, "capture_end",
+                                agora - (cabeca - fim_ativacao - vad_pergunta.closed_at) / WHISPER_TAXA)
+                    filtro = "com" if SUPRESSAO_RUIDO_PERGUNTA else "sem"
+                    print(f"Pergunta {turnos} gravada; reconhecendo com o modelo principal ({filtro} filtro de ruído)...")
+                    # bloqueia só se a transcrição estiver atrasada (fila cheia)
+                    conversa.asr.put({"id": turnos, "geracao": conversa.geracao, "pcm": audio_pergunta,
+                                      "vad_ms": vad_ms, "t_fim_fala": time.perf_counter() - vad_ms / 1000,
+                                      "trace": trace})
                 else:
                     print("-> Não detectei som para a pergunta. Tente novamente.")
 
-        elif texto_detectado.strip():
-            print(f"  (Ouvi: '{texto_detectado}', mas esperava por '{palavrachave}'...)")
-
-    except sr.UnknownValueError:
-        print("  (Não consegui entender o áudio captado.)")
-        pass
-    except sr.WaitTimeoutError:
-        print("  (Nenhum som detectado no tempo limite.)")
-        pass
-    except sr.RequestError as e:
-        print(f"-> Erro no motor Whisper; {e}")
-    except KeyboardInterrupt:
-        print("\n\nPrograma interrompido pelo usuário.")
-        break
-    except Exception as e:
-        print(f"[ERRO INESPERADO] Ocorreu um problema: {e}")
-        break
+            elif texto_detectado.strip():
+                print(f"  (Ouvi: '{texto_detectado}', mas esperava por '{palavrachave}'...)")
+
+        except KeyboardInterrupt:
+            print("\n\nPrograma interrompido pelo usuário.")
+            break
+        except Exception as e:
+            print(f"[ERRO INESPERADO] Ocorreu um problema: {e}")
+            break
+
+    # espera a última resposta terminar de ser falada antes de sair
+    conversa.stop()
+    microfone.close()
+    ini.wait("tts")
+    speech_service.shutdown(wait=True)
+    if ARQUIVO_LINHA_DO_TEMPO:
+        ini.save(ARQUIVO_LINHA_DO_TEMPO)
+    if speech_service.stats:
+        media_inicio = sum(st["start_ms"] for st in speech_service.stats) / len(speech_service.stats)
+        print(f"[LOG] TTS: {len(speech_service.stats)} falas, início médio da fala {media_inicio:.0f} ms")
+    print(f"[LOG] Cache de respostas: {cache_respostas.resumo()}")
+    print(resumo_etapas(conversa.etapas))
+    tracer.close()
+    if ARQUIVO_LATENCIA:
+        print(f"[LOG] Latência por pergunta em {ARQUIVO_LATENCIA} (relatório: python tracing.py {os.path.basename(ARQUIVO_LATENCIA)})")
+
+    print("\n=======================================================")
+    print(f"Limite de {MAX_QUESTIONS} perguntas atingido. Encerrando o programa.")
+
 
-print("\n=======================================================")
-print(f"Limite de {MAX_QUESTIONS} perguntas atingido. Encerrando o programa.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()